@@ -0,0 +1,132 @@
+"""Bytes transferidos y tiempo hasta el primer byte con y sin compresión.
+
+Crea N comidas en una base SQLite temporal (o en DATABASE_URL) y llama a los listados
+pesados dentro del proceso con distintos Accept-Encoding:
+
+    cd backend
+    python -m benchmarks.compression --rows 10000 --repeat 5
+
+Para cada endpoint y codificación informa el tamaño del cuerpo, el porcentaje ahorrado y
+la mediana del tiempo hasta el primer bloque del cuerpo (TTFB) y hasta el último. La fila
+"/meals/ (completo)" arma la misma respuesta de una vez (?fields= con todos los campos)
+para comparar con el envío por partes.
+"""
+import os
+import tempfile
+
+_TEMP_DB = None
+if "DATABASE_URL" not in os.environ:
+    _TEMP_DB = tempfile.NamedTemporaryFile(prefix="compression_", suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{_TEMP_DB}"
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from config.database import create_db_and_tables, create_session
+from main import app
+from models.meals import MealRead
+from models.patients import Patient
+from benchmarks.serialization import create_meals
+from utils.compression import brotli
+from utils.security import create_access_token
+
+ENCODINGS = ["identity", "gzip"] + (["br"] if brotli else [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medir el efecto de la compresión y del envío por partes")
+    parser.add_argument("--rows", type=int, default=10000, help="Cantidad de comidas del paciente")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones de cada medición (se informa la mediana)")
+    args = parser.parse_args()
+
+    try:
+        create_db_and_tables()
+        patient_id = create_meals(args.rows)
+        with create_session() as session:
+            email = session.get(Patient, patient_id).email
+        token = create_access_token({"sub": email, "user_type": "patient"})
+        run(token, args.repeat)
+    finally:
+        if _TEMP_DB:
+            os.remove(_TEMP_DB)
+
+
+def run(token: str, repeat: int):
+    all_fields = ",".join(MealRead.model_fields)
+    endpoints = [
+        ("/meals/", "/meals/"),
+        ("/meals/ (completo)", f"/meals/?fields={all_fields}"),
+        ("/exports/me (csv)", "/exports/me?dataset=meals&file_format=csv"),
+    ]
+    print(f"{'endpoint'.ljust(20)} {'codificación':<12} {'bytes':>10} {'ahorro':>7} {'TTFB ms':>8} {'total ms':>9}")
+    for name, path in endpoints:
+        identity_size = None
+        for encoding in ENCODINGS:
+            sizes, first_byte, total = [], [], []
+            for _ in range(repeat):
+                status, size, ttfb, elapsed = timed_call(path, token, encoding)
+                if status >= 400:
+                    raise SystemExit(f"{path} respondió {status}")
+                sizes.append(size)
+                first_byte.append(ttfb)
+                total.append(elapsed)
+            size = sizes[-1]
+            identity_size = identity_size or size
+            saved = 100 * (1 - size / identity_size)
+            print(f"{name.ljust(20)} {encoding:<12} {size:>10} {saved:>6.1f}% "
+                  f"{statistics.median(first_byte):>8.1f} {statistics.median(total):>9.1f}")
+
+
+def timed_call(path: str, token: str, accept_encoding: str):
+    """Petición dentro del proceso: (status, bytes del cuerpo, ms hasta el primer bloque, ms totales)"""
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"compression"),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"accept-encoding", accept_encoding.encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("compression", 80),
+    }
+    status = 0
+    size = 0
+    first_byte = None
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, size, first_byte
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(message["body"])
+
+    start = time.perf_counter()
+    asyncio.run(app(scope, receive, send))
+    end = time.perf_counter()
+    return status, size, ((first_byte or end) - start) * 1000, (end - start) * 1000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Límites de consultas SQL por endpoint.
+
+Crea un conjunto de datos con una forma conocida (10 comidas en un día, 50 plantillas,
+una dieta semanal de 28 comidas, etc.), llama a cada endpoint dentro del proceso y falla
+si alguno ejecuta más consultas que su límite o repite una misma consulta (N+1):
+
+    cd backend
+    python -m benchmarks.query_budgets
+
+Sin DATABASE_URL usa una base SQLite temporal. Con DATABASE_URL debe apuntar a una base
+descartable: el script agrega datos y no los elimina. Termina con código 1 si algún
+endpoint supera su límite, para poder usarlo antes de cada commit o en CI.
+"""
+import os
+import sys
+import tempfile
+
+_TEMP_DB = None
+if "DATABASE_URL" not in os.environ:
+    _TEMP_DB = tempfile.NamedTemporaryFile(prefix="query_budgets_", suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{_TEMP_DB}"
+
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Callable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import insert
+
+from config.database import create_db_and_tables, create_session
+from main import app
+from models.foods import Food
+from models.goals import Goal, GoalStatus, GoalType
+from models.ingredient_food import IngredientFood
+from models.ingredients import Ingredient
+from models.meals import Meal
+from models.notification import Notification, NotificationKind
+from models.patients import Patient
+from models.professionals import Professional
+from models.shopping_lists import ShoppingList
+from models.template_diets import TemplateDiet, TemplateDietMeal
+from models.water_intake import WaterIntake
+from models.weekly_diet_meals import DayOfWeek, MealOfDay, WeeklyDietMeals
+from models.weekly_diets import WeeklyDiets
+from models.weight_logs import WeightLog
+from utils import diet_adherence, food_profiles, goal_resolver, weekly_summary_cache
+from utils.metrics import collect_request_stats
+from utils.query_log import find_budget_problems
+from utils.security import create_access_token
+
+BUDGET_DOMAIN = "budget.health-companion.com"
+# Día (lunes) en el que se registran las comidas y el agua de los datos de prueba
+FIXTURE_DATE = date.today() - timedelta(days=date.today().weekday() + 7)
+
+
+class Fixture(NamedTuple):
+    patient_token: str
+    professional_token: str
+    patient_id: int
+    shopping_list_id: int
+    weekly_diet_id: int
+    template_diet_id: int
+
+
+class Budget(NamedTuple):
+    name: str
+    max_queries: int
+    method: str
+    path: Callable[[Fixture], str]
+    user: str = "patient"
+    body: Optional[Callable[[Fixture], dict]] = None
+    # Medir la primera llamada con las cachés del proceso vacías (camino sin caché)
+    cold: bool = False
+
+
+# Límite de consultas de cada endpoint para los datos de create_fixture.
+# Incluye la consulta de autenticación (buscar al usuario del token).
+BUDGETS = [
+    Budget("daily_nutrients (10 comidas)", 3, "GET",
+           lambda f: f"/nutrient-summary/daily?date={FIXTURE_DATE.isoformat()}"),
+    Budget("nutrient_summary_range (7 días)", 3, "GET",
+           lambda f: f"/nutrient-summary/range?start_date={FIXTURE_DATE.isoformat()}"
+                     f"&end_date={(FIXTURE_DATE + timedelta(days=6)).isoformat()}"),
+    Budget("meals", 2, "GET", lambda f: "/meals/"),
+    Budget("template_diets (50 plantillas)", 2, "GET", lambda f: "/template-diets/", user="professional"),
+    Budget("shopping_list_from_diet (28 comidas)", 6, "POST",
+           lambda f: f"/shopping-lists/{f.shopping_list_id}/items/from-diet",
+           body=lambda f: {"weekly_diet_id": f.weekly_diet_id}),
+    Budget("shopping_list_with_items", 4, "GET", lambda f: f"/shopping-lists/{f.shopping_list_id}"),
+    Budget("shopping_lists_include_items", 3, "GET", lambda f: "/shopping-lists/?fields=id,name&include=items"),
+    Budget("foods_include_ingredients", 2, "GET", lambda f: "/foods/?fields=id,food_name&include=ingredients"),
+    Budget("goals_progress (3 objetivos)", 5, "GET", lambda f: "/goals/my-goals/progress"),
+    Budget("patient_goals_progress (3 objetivos)", 6, "GET",
+           lambda f: f"/goals/patient/{f.patient_id}/progress", user="professional"),
+    Budget("weekly_summary (en caché)", 2, "GET",
+           lambda f: f"/patients/weekly-summary?start_date={FIXTURE_DATE.isoformat()}"),
+    Budget("notifications (20)", 2, "GET", lambda f: "/notifications/?limit=50"),
+    Budget("unread_count", 2, "GET", lambda f: "/notifications/unread-count"),
+    Budget("weekly_diet_meals (28 comidas)", 2, "GET", lambda f: f"/weekly-diets/{f.weekly_diet_id}/meals"),
+    # Los perfiles de las comidas quedan en caché con la primera llamada
+    Budget("weekly_diet_nutrition (28 comidas)", 3, "GET", lambda f: f"/weekly-diets/{f.weekly_diet_id}/nutrition",
+           user="professional"),
+    Budget("template_nutrition (4 comidas)", 3, "GET",
+           lambda f: f"/template-diets/{f.template_diet_id}/nutrition", user="professional"),
+    Budget("diet_adherence (en caché)", 1, "GET", lambda f: "/weekly-diets/adherence", user="professional"),
+    Budget("water_daily_summary (meta en caché)", 2, "GET",
+           lambda f: f"/water/daily-summary?target_date={FIXTURE_DATE.isoformat()}"),
+    Budget("patient_dashboard", 9, "GET", lambda f: f"/patients/dashboard?target_date={FIXTURE_DATE.isoformat()}"),
+    # Los mismos endpoints con caché, medidos en la primera llamada: detectan N+1 en el camino sin caché
+    Budget("daily_nutrients (sin caché)", 3, "GET",
+           lambda f: f"/nutrient-summary/daily?date={FIXTURE_DATE.isoformat()}", cold=True),
+    Budget("weekly_summary (sin caché)", 4, "GET",
+           lambda f: f"/patients/weekly-summary?start_date={FIXTURE_DATE.isoformat()}", cold=True),
+    Budget("weekly_diet_nutrition (sin caché)", 4, "GET",
+           lambda f: f"/weekly-diets/{f.weekly_diet_id}/nutrition", user="professional", cold=True),
+    Budget("template_nutrition (sin caché)", 4, "GET",
+           lambda f: f"/template-diets/{f.template_diet_id}/nutrition", user="professional", cold=True),
+    Budget("diet_adherence (sin caché)", 2, "GET", lambda f: "/weekly-diets/adherence", user="professional", cold=True),
+    Budget("water_daily_summary (sin caché)", 3, "GET",
+           lambda f: f"/water/daily-summary?target_date={FIXTURE_DATE.isoformat()}", cold=True),
+    Budget("patient_dashboard (sin caché)", 9, "GET",
+           lambda f: f"/patients/dashboard?target_date={FIXTURE_DATE.isoformat()}", cold=True),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificar los límites de consultas SQL por endpoint")
+    parser.add_argument("--only", nargs="+", help="Nombres (o prefijos) de los casos a ejecutar")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar las consultas de los casos que fallan")
+    args = parser.parse_args()
+
+    try:
+        create_db_and_tables()
+        fixture = create_fixture()
+        budgets = [b for b in BUDGETS if not args.only or any(b.name.startswith(name) for name in args.only)]
+        failures = run_budgets(fixture, budgets, args.verbose)
+    finally:
+        if _TEMP_DB:
+            os.remove(_TEMP_DB)
+
+    sys.exit(1 if failures else 0)
+
+
+def run_budgets(fixture: Fixture, budgets: List[Budget], verbose: bool = False) -> int:
+    """Llamar a cada endpoint y comparar sus consultas con el límite. Devuelve la cantidad de fallas."""
+    failures = 0
+    width = max(len(budget.name) for budget in budgets)
+    for budget in budgets:
+        token = fixture.patient_token if budget.user == "patient" else fixture.professional_token
+        path = budget.path(fixture)
+        body = budget.body(fixture) if budget.body else None
+
+        if budget.cold:
+            clear_caches()
+        else:
+            # Primera llamada sin medir: completa cachés y contadores que se crean a demanda
+            call(budget.method, path, token, body)
+
+        with collect_request_stats(record_statements=True) as stats:
+            status, _ = call(budget.method, path, token, body)
+        # Sin límite de tiempo: solo interesa la cantidad de consultas, que no depende de la máquina
+        problems = find_budget_problems(stats, max_queries=budget.max_queries, max_ms=float("inf"))
+        if status >= 400:
+            problems.insert(0, f"respuesta {status}")
+
+        print(f"{budget.name.ljust(width)}  {stats.query_count:>3} / {budget.max_queries:<3} {'FALLA' if problems else 'OK'}")
+        for problem in problems:
+            print(f"    {problem}")
+        if problems:
+            failures += 1
+            if verbose:
+                for statement, _ in stats.statements:
+                    print(f"      {' '.join(statement.split())}")
+
+    print(f"\n{len(budgets) - failures}/{len(budgets)} endpoints dentro del límite")
+    return failures
+
+
+def clear_caches():
+    """Vaciar las cachés en memoria del proceso, para medir el camino que consulta la base"""
+    for cache, lock in [
+        (goal_resolver._goals, goal_resolver._lock),
+        (weekly_summary_cache._summaries, weekly_summary_cache._lock),
+        (food_profiles._profiles, food_profiles._lock),
+        (diet_adherence._results, diet_adherence._lock),
+    ]:
+        with lock:
+            cache.clear()
+
+
+def call(method: str, path: str, token: str, body: Optional[dict] = None):
+    """Ejecutar una petición contra la aplicación ASGI dentro del proceso (sin servidor HTTP)"""
+    url = urlsplit(path)
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"query-budgets"), (b"authorization", f"Bearer {token}".encode())]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("query-budgets", 80),
+    }
+    messages = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            # Como un servidor real: después del cuerpo solo queda esperar una desconexión, que
+            # nunca llega (las respuestas por partes escuchan receive mientras se envían)
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    status = next(message["status"] for message in messages if message["type"] == "http.response.start")
+    content = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return status, content
+
+
+# ========== DATOS DE PRUEBA ==========
+
+def create_fixture() -> Fixture:
+    """Profesional y paciente con una cantidad conocida de datos en cada tabla"""
+    suffix = uuid.uuid4().hex[:8]
+    with create_session() as session:
+        professional = Professional(
+            email=f"pro-{suffix}@{BUDGET_DOMAIN}", first_name="Budget", last_name="Pro",
+            specialization="nutritionist", password_hash="-",
+        )
+        session.add(professional)
+        session.commit()
+        patient = Patient(
+            email=f"patient-{suffix}@{BUDGET_DOMAIN}", first_name="Budget", last_name="Patient",
+            weight=80, height=175, birth_date=date(1990, 1, 1), gender="female",
+            password_hash="-", professional_id=professional.id,
+        )
+        session.add(patient)
+        session.commit()
+
+        ingredients = [
+            Ingredient(name=f"Ingrediente {suffix} {index}", category="verdura", grams=100,
+                       calories_kcal=50 + index * 20, protein_g=2 + index, fat_g=1, carbs_g=10,
+                       iron_mg=0.5, calcium_mg=20, vitamin_c_mg=10)
+            for index in range(6)
+        ]
+        foods = [Food(food_name=f"Comida {suffix} {index}") for index in range(4)]
+        session.add_all(ingredients + foods)
+        session.commit()
+        session.execute(insert(IngredientFood), [
+            {"food_id": food.id, "ingredient_id": ingredients[(food_index + offset) % len(ingredients)].id, "grams": 100}
+            for food_index, food in enumerate(foods)
+            for offset in range(3)
+        ])
+
+        session.execute(insert(Meal), [
+            {
+                "meal_name": foods[index % len(foods)].food_name,
+                "grams": 200,
+                "meal_of_the_day": "lunch",
+                "timestamp": datetime.combine(FIXTURE_DATE, dt_time(8 + index)),
+                "food_id": foods[index % len(foods)].id,
+                "patient_id": patient.id,
+                "calories": 300,
+            }
+            for index in range(10)
+        ])
+        session.execute(insert(WaterIntake), [
+            {"amount_ml": 250, "intake_time": datetime.combine(FIXTURE_DATE, dt_time(8 + index)), "patient_id": patient.id}
+            for index in range(6)
+        ])
+        session.add(WeightLog(weight=80, timestamp=datetime.combine(FIXTURE_DATE, dt_time(7)), patient_id=patient.id))
+        session.execute(insert(Notification), [
+            {"patient_id": patient.id, "message": f"Aviso {index}", "is_read": index % 2 == 0,
+             "created_at": datetime.now(), "kind": NotificationKind.GENERAL, "repeat_count": 1}
+            for index in range(20)
+        ])
+
+        # Objetivos lejos de cumplirse, para que consultar el progreso no los complete
+        goal_owner = {"status": GoalStatus.ACTIVE, "patient_id": patient.id, "professional_id": professional.id}
+        session.execute(insert(Goal), [
+            {**goal_owner, "goal_type": GoalType.WEIGHT, "target_weight": 60, "start_date": FIXTURE_DATE,
+             "target_date": FIXTURE_DATE + timedelta(days=180)},
+            {**goal_owner, "goal_type": GoalType.CALORIES, "target_calories": 9000, "start_date": FIXTURE_DATE,
+             "target_date": None},
+            {**goal_owner, "goal_type": GoalType.WATER, "target_milliliters": 9000, "start_date": FIXTURE_DATE,
+             "target_date": None},
+        ])
+
+        for index in range(50):
+            template = TemplateDiet(name=f"Plantilla {index}", professional_id=professional.id)
+            session.add(template)
+            session.flush()
+            session.execute(insert(TemplateDietMeal), [
+                {"meal_name": foods[0].food_name, "day_of_week": DayOfWeek.lunes, "meal_of_the_day": meal_of_day,
+                 "food_id": foods[0].id, "template_diet_id": template.id}
+                for meal_of_day in MealOfDay
+            ])
+
+        weekly_diet = WeeklyDiets(week_start_date=FIXTURE_DATE, patient_id=patient.id, professional_id=professional.id)
+        session.add(weekly_diet)
+        session.flush()
+        session.execute(insert(WeeklyDietMeals), [
+            {"meal_name": foods[day_index % len(foods)].food_name, "day_of_week": day_of_week,
+             "meal_of_the_day": meal_of_day, "completed": False,
+             "food_id": foods[day_index % len(foods)].id, "weekly_diet_id": weekly_diet.id}
+            for day_index, day_of_week in enumerate(DayOfWeek)
+            for meal_of_day in MealOfDay
+        ])
+
+        shopping_list = ShoppingList(name="Lista de prueba", patient_id=patient.id)
+        session.add(shopping_list)
+        session.commit()
+
+        return Fixture(
+            patient_token=create_access_token({"sub": patient.email, "user_type": "patient"}),
+            professional_token=create_access_token({"sub": professional.email, "user_type": "professional"}),
+            patient_id=patient.id,
+            shopping_list_id=shopping_list.id,
+            weekly_diet_id=weekly_diet.id,
+            template_diet_id=template.id,
+        )
+
+
+if __name__ == "__main__":
+    main()
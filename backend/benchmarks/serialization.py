@@ -0,0 +1,122 @@
+"""Costo de serializar listados grandes: validación de FastAPI (response_model) vs. orjson por columnas.
+
+Crea N comidas en una base SQLite temporal (o en DATABASE_URL) y mide, por separado, la
+lectura y la serialización de cada camino:
+
+    cd backend
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+
+- response_model: objetos ORM validados con el modelo de respuesta y convertidos a JSON
+  como lo hace FastAPI (TypeAdapter + json.dumps de Starlette).
+- orjson: filas por columnas (utils.fast_json.select_read_columns) convertidas con orjson.
+"""
+import os
+import tempfile
+
+_TEMP_DB = None
+if "DATABASE_URL" not in os.environ:
+    _TEMP_DB = tempfile.NamedTemporaryFile(prefix="serialization_", suffix=".db", delete=False).name
+    os.environ["DATABASE_URL"] = f"sqlite:///{_TEMP_DB}"
+
+import argparse
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlmodel import select
+
+from config.database import create_db_and_tables, create_session
+from models.foods import Food
+from models.meals import Meal, MealRead
+from models.patients import Patient
+from utils.fast_json import rows_response, select_read_columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medir el costo de serialización de listados grandes")
+    parser.add_argument("--rows", type=int, default=10000, help="Cantidad de comidas a serializar")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones de cada medición (se informa la mediana)")
+    args = parser.parse_args()
+
+    try:
+        create_db_and_tables()
+        patient_id = create_meals(args.rows)
+        run(patient_id, args.rows, args.repeat)
+    finally:
+        if _TEMP_DB:
+            os.remove(_TEMP_DB)
+
+
+def run(patient_id: int, rows: int, repeat: int):
+    adapter = TypeAdapter(List[MealRead])
+
+    def fetch_orm(session):
+        return session.exec(select(Meal).where(Meal.patient_id == patient_id)).all()
+
+    def fetch_columns(session):
+        return session.execute(select_read_columns(Meal, MealRead).where(Meal.patient_id == patient_id)).all()
+
+    def serialize_orm(meals):
+        # Lo que hace FastAPI con response_model: validar cada fila y volcarla a JSON
+        content = adapter.dump_python(adapter.validate_python(meals, from_attributes=True), mode="json")
+        return JSONResponse(content).body
+
+    def serialize_columns(rows):
+        return rows_response(rows).body
+
+    results = [
+        ("response_model", fetch_orm, serialize_orm),
+        ("orjson", fetch_columns, serialize_columns),
+    ]
+    print(f"{rows} filas, mediana de {repeat} repeticiones (ms por 10k filas)\n")
+    print(f"{'camino'.ljust(16)} {'lectura':>10} {'serialización':>14} {'total':>10} {'bytes':>10}")
+    for name, fetch, serialize in results:
+        fetch_ms, serialize_ms, size = [], [], 0
+        for _ in range(repeat):
+            with create_session() as session:
+                start = time.perf_counter()
+                data = fetch(session)
+                fetched = time.perf_counter()
+                body = serialize(data)
+                done = time.perf_counter()
+            fetch_ms.append((fetched - start) * 1000)
+            serialize_ms.append((done - fetched) * 1000)
+            size = len(body)
+        scale = 10000 / rows
+        fetch_median = statistics.median(fetch_ms) * scale
+        serialize_median = statistics.median(serialize_ms) * scale
+        print(f"{name.ljust(16)} {fetch_median:>10.1f} {serialize_median:>14.1f} "
+              f"{fetch_median + serialize_median:>10.1f} {size:>10}")
+
+
+def create_meals(rows: int) -> int:
+    """Paciente con `rows` comidas registradas"""
+    suffix = uuid.uuid4().hex[:8]
+    with create_session() as session:
+        patient = Patient(
+            email=f"serialization-{suffix}@benchmark.health-companion.com", first_name="Bench", last_name="Serialization",
+            weight=70, height=170, birth_date=date(1990, 1, 1), gender="female", password_hash="-",
+        )
+        food = Food(food_name=f"Comida {suffix}")
+        session.add_all([patient, food])
+        session.commit()
+        start = datetime.now() - timedelta(days=rows // 5)
+        session.execute(insert(Meal), [
+            {
+                "meal_name": food.food_name, "grams": 150 + index % 100, "meal_of_the_day": "lunch",
+                "timestamp": start + timedelta(hours=index * 4.8), "food_id": food.id,
+                "patient_id": patient.id, "calories": 200 + index % 400,
+            }
+            for index in range(rows)
+        ])
+        session.commit()
+        return patient.id
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Tiempo de arranque de la API en procesos nuevos (lo que se paga en cada cold start o --reload).
+
+    cd backend
+    python -m benchmarks.startup_time --runs 5
+
+Informa la mediana de importar main.py y el detalle por paso de la última ejecución
+(utils.startup_profile). No inicia el servidor ni las tareas programadas.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = (
+    "import time; start = time.perf_counter(); import main; elapsed = time.perf_counter() - start; "
+    "from utils.startup_profile import startup_report; print(startup_report()); print(f'IMPORT_MS={elapsed * 1000:.1f}')"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medir el tiempo de arranque de la API")
+    parser.add_argument("--runs", type=int, default=5, help="Procesos a iniciar")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings, report = [], ""
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=backend_dir, capture_output=True, text=True, check=True,
+        )
+        output, _, import_ms = result.stdout.rpartition("IMPORT_MS=")
+        timings.append(float(import_ms))
+        report = output.strip()
+
+    print(report)
+    print(f"\nimport main: mediana {statistics.median(timings):.0f} ms, mínimo {min(timings):.0f} ms ({args.runs} procesos)")
+
+
+if __name__ == "__main__":
+    main()
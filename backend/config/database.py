@@ -1,4 +1,8 @@
+import hashlib
 import os
+from sqlalchemy import Column, Enum, Integer, String, Table, delete, inspect, insert, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 from sqlmodel import Session, SQLModel, create_engine
 
 from models.patients import Patient
@@ -8,14 +12,18 @@ from models.ingredients import Ingredient
 from models.ingredient_food import IngredientFood
 from models.meals import Meal
 from models.weekly_notes import WeeklyNote
+from models.goals import Goal
+from models.water_reminders import WaterReminder
 from models.weight_logs import WeightLog
-from models.notification import Notification
-from models.water_intake import WaterIntake
+from models.notification import Notification, NotificationArchive, NotificationCounter
+from models.water_intake import WaterIntake, WaterDailyTotal
 from models.shopping_lists import ShoppingList
 from models.shopping_list_items import ShoppingListItem
 from models.template_diets import TemplateDiet, TemplateDietMeal
 from models.weekly_diets import WeeklyDiets
 from models.weekly_diet_meals import WeeklyDietMeals
+from models.import_jobs import ImportJob
+from models.jobs import Job
 
 # Configuración de la base de datos según el entorno
 ENV = os.getenv("ENV", "development")
@@ -50,6 +58,70 @@ def create_session():
     return Session(engine)
 
 
+# Columnas agregadas a tablas que ya existían (create_all no modifica tablas existentes)
+ADDED_COLUMNS = {
+    "notifications": ["kind", "repeat_count"],
+}
+
+
+# Huella del esquema aplicado por última vez, para no revisar la base si los modelos no cambiaron
+schema_state = Table(
+    "schema_state",
+    SQLModel.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+)
+
+
 def create_db_and_tables():
     """Crear todas las tablas en la base de datos"""
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+    upgrade_existing_tables()
+    with engine.begin() as connection:
+        connection.execute(delete(schema_state))
+        connection.execute(insert(schema_state).values(id=1, fingerprint=schema_fingerprint()))
+
+
+def create_db_and_tables_if_changed() -> bool:
+    """Crear o actualizar las tablas solo si los modelos cambiaron desde la última vez.
+    Si no cambiaron, es una sola consulta. Devuelve True si se aplicaron cambios."""
+    try:
+        with engine.connect() as connection:
+            stored = connection.execute(select(schema_state.c.fingerprint).where(schema_state.c.id == 1)).scalar()
+    except SQLAlchemyError:
+        stored = None  # base nueva: la tabla schema_state todavía no existe
+
+    if stored == schema_fingerprint():
+        return False
+    create_db_and_tables()
+    return True
+
+
+def schema_fingerprint() -> str:
+    """Hash del DDL de todas las tablas e índices de los modelos"""
+    ddl = []
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        ddl.extend(sorted(str(CreateIndex(index).compile(dialect=engine.dialect)) for index in table.indexes))
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+
+def upgrade_existing_tables():
+    """Agregar a las tablas existentes las columnas e índices nuevos de los modelos"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table_name, column_names in ADDED_COLUMNS.items():
+            table = SQLModel.metadata.tables[table_name]
+            existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+            for column_name in column_names:
+                if column_name in existing_columns:
+                    continue
+                column = table.c[column_name]
+                if isinstance(column.type, Enum):
+                    # En Postgres el enum es un tipo propio que hay que crear antes
+                    column.type.create(connection, checkfirst=True)
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}"))
+
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
\ No newline at end of file
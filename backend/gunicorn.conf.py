@@ -0,0 +1,30 @@
+"""Configuración de gunicorn para producción: varios workers de uvicorn.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Las tareas programadas se ejecutan en un solo worker (ver utils/scheduler_leader.py).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# WEB_CONCURRENCY es la variable que usan Render y Heroku para la cantidad de procesos
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+# Las conexiones de /notifications/stream duran hasta STREAM_MAX_SECONDS: el timeout solo
+# aplica a workers bloqueados, no a peticiones largas, así que alcanza con un valor moderado
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Reiniciar cada worker tras una cantidad de peticiones para acotar el crecimiento de memoria
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# Confiar en los encabezados X-Forwarded-* del proxy de la plataforma (equivalente a --proxy-headers)
+forwarded_allow_ips = "*"
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
@@ -1,6 +1,15 @@
-from config.database import create_db_and_tables
+import sys
 
+from config.database import create_db_and_tables, create_db_and_tables_if_changed
+
+# Se ejecuta antes de iniciar la API (release/pre-deploy). Con --force revisa la base aunque
+# los modelos no hayan cambiado desde la última vez.
 if __name__ == "__main__":
-    print("Creating database tables...")
-    create_db_and_tables()
-    print("Database tables created successfully!") 
\ No newline at end of file
+    if "--force" in sys.argv:
+        print("Creating database tables...")
+        create_db_and_tables()
+        print("Database tables created successfully!")
+    elif create_db_and_tables_if_changed():
+        print("Database tables created or updated successfully!")
+    else:
+        print("Database schema is up to date")
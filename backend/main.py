@@ -1,68 +1,94 @@
+import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-import uvicorn
-from config.database import create_db_and_tables
-from apscheduler.schedulers.background import BackgroundScheduler
-
-# Importación de routers
-from routers.auth import router_auth
-from routers.patients import router_patients
-from routers.professionals import router_professionals
-from routers.meals import router_meals
-from routers.foods import router_foods
-from routers.ingredients import router_ingredients
-from routers.weight_logs import router_weight_logs
-from routers.weekly_summaries import router_weekly_summaries
-from routers.weekly_notes import router_weekly_notes
-from routers.weekly_diets import router_weekly_diets
-from routers.template_diets import router_template_diets
-from routers.goals import router_goals
-from routers.notification import router_notifications
-from routers.water_router import router_water
-from routers.water_reminders import router_water_reminders, send_scheduled_water_reminders
-from routers.nutrient_summary import router_nutrient_summary
-from routers.shopping_lists import router_shopping_lists
-
-
-
-from fastapi.middleware.cors import CORSMiddleware
+from importlib import import_module
+
+# Primero, para que el perfil de arranque mida también las importaciones siguientes
+from utils.startup_profile import startup_step, log_startup_report
+
+with startup_step("fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    import uvicorn
+with startup_step("config.database (modelos)"):
+    from config.database import create_db_and_tables
+with startup_step("utils (tareas y métricas)"):
+    from utils.jobs import JOB_RUNNER, JobRunner
+    from utils.compression import CompressionMiddleware
+    from utils.metrics import MetricsMiddleware
+    from utils.scheduled_tasks import create_scheduler
+    from utils.scheduler_leader import SchedulerLeader
+
+# Las tablas se crean con `python init_db.py` antes de iniciar (release/pre-deploy), no en cada arranque.
+# En desarrollo se puede volver a crearlas al iniciar con INIT_DB_ON_STARTUP=true.
+INIT_DB_ON_STARTUP = os.getenv("INIT_DB_ON_STARTUP", "false").lower() == "true"
+
+# Routers de la API: (módulo, nombre del router)
+ROUTERS = [
+    ("routers.auth", "router_auth"),
+    ("routers.patients", "router_patients"),
+    ("routers.professionals", "router_professionals"),
+    ("routers.meals", "router_meals"),
+    ("routers.foods", "router_foods"),
+    ("routers.ingredients", "router_ingredients"),
+    ("routers.weight_logs", "router_weight_logs"),
+    ("routers.weekly_summaries", "router_weekly_summaries"),
+    ("routers.weekly_notes", "router_weekly_notes"),
+    ("routers.weekly_diets", "router_weekly_diets"),
+    ("routers.template_diets", "router_template_diets"),
+    ("routers.goals", "router_goals"),
+    ("routers.notification", "router_notifications"),
+    ("routers.water_router", "router_water"),
+    ("routers.water_reminders", "router_water_reminders"),
+    ("routers.nutrient_summary", "router_nutrient_summary"),
+    ("routers.shopping_lists", "router_shopping_lists"),
+    ("routers.imports", "router_imports"),
+    ("routers.exports", "router_exports"),
+    ("routers.trends", "router_trends"),
+    ("routers.dashboard", "router_dashboard"),
+    ("routers.metrics", "router_metrics"),
+]
 
 @asynccontextmanager
 async def lifespan(app:FastAPI):
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(send_scheduled_water_reminders,"interval",minutes = 1)
-    scheduler.start()
+    if INIT_DB_ON_STARTUP:
+        with startup_step("create_db_and_tables"):
+            create_db_and_tables()
+
+    # Con JOB_RUNNER=worker las tareas programadas y la cola se ejecutan en worker.py
+    run_jobs = JOB_RUNNER == "api"
+    if run_jobs:
+        with startup_step("scheduler y cola de tareas"):
+            # Con varios workers, solo el líder ejecuta las tareas programadas
+            scheduler_leader = SchedulerLeader(create_scheduler)
+            job_runner = JobRunner()
+            scheduler_leader.start()
+            job_runner.start()
+
+    log_startup_report()
     yield
 
+    if run_jobs:
+        job_runner.stop()
+        scheduler_leader.stop()
+
 app = FastAPI(title="API de Nutrición y Salud",lifespan=lifespan)
 
-# Crear tablas en la base de datos
-create_db_and_tables()
-
-# Incluir routers
-app.include_router(router_auth)
-app.include_router(router_patients)
-app.include_router(router_professionals)
-app.include_router(router_meals)
-app.include_router(router_foods)
-app.include_router(router_ingredients)
-app.include_router(router_weight_logs)
-app.include_router(router_weekly_summaries)
-app.include_router(router_weekly_notes)
-app.include_router(router_weekly_diets)
-app.include_router(router_template_diets)
-app.include_router(router_goals)
-app.include_router(router_notifications)
-app.include_router(router_water)
-app.include_router(router_water_reminders)
-app.include_router(router_nutrient_summary)
-app.include_router(router_shopping_lists)
+# Incluir routers (cada importación se mide en el perfil de arranque)
+for module_name, router_name in ROUTERS:
+    with startup_step(module_name):
+        app.include_router(getattr(import_module(module_name), router_name))
 
 @app.get("/")
 async def root():
     return {"message": "API de Nutrición y Salud está en línea"}
 
 
+# Métricas de latencia y consultas SQL por ruta
+app.add_middleware(MetricsMiddleware)
+
+# Compresión gzip/brotli negociada con Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
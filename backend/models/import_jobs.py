@@ -0,0 +1,54 @@
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from sqlmodel import Field, SQLModel, Relationship
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from models.patients import Patient
+
+
+class ImportKind(str, Enum):
+    MEALS = "meals"
+    WEIGHTS = "weights"
+    WATER = "water"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    JSON = "json"  # arreglo JSON o un objeto JSON por línea (NDJSON)
+
+
+class ImportStatus(str, Enum):
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJobBase(SQLModel):
+    kind: ImportKind
+    file_format: ImportFormat
+    status: ImportStatus = ImportStatus.PROCESSING
+    rows_processed: int = 0  # filas leídas y confirmadas (punto de reanudación)
+    rows_imported: int = 0
+    rows_failed: int = 0
+    errors: Optional[str] = None  # primeros errores de validación, uno por línea
+
+
+class ImportJob(ImportJobBase, table=True):
+    __tablename__ = "import_jobs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    patient_id: int = Field(foreign_key="patients.id")
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    # Relaciones
+    patient: "Patient" = Relationship()
+
+
+class ImportJobRead(ImportJobBase):
+    id: int
+    patient_id: int
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,34 @@
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import SQLModel, Field
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(SQLModel, table=True):
+    """Tarea en segundo plano persistida en la base, ejecutada por utils.jobs.JobRunner"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Índice que usan los workers para reclamar la próxima tarea lista
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str  # nombre del handler en utils.jobs.JOB_HANDLERS
+    payload: dict = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    status: JobStatus = JobStatus.PENDING
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(default_factory=datetime.now)  # no se ejecuta antes de este momento
+    locked_at: Optional[datetime] = None
+    locked_by: Optional[str] = None  # worker que la está ejecutando
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
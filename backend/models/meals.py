@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, timezone
 from sqlmodel import Field, SQLModel, Relationship
 from pydantic import field_validator
@@ -94,4 +94,29 @@ class MealUpdate(SQLModel):
         valid_meals = ["breakfast", "lunch", "dinner", "snack"] 
         if value.lower() not in valid_meals:
             raise ValueError(f'Tipo de comida no válido. Debe ser uno de: {", ".join(valid_meals)}')
-        return value
\ No newline at end of file
+        return value
+
+class MealBatchCreate(SQLModel):
+    meals: List[MealCreate]
+
+    @field_validator('meals')
+    @classmethod
+    def validate_batch_size(cls, value):
+        if not value:
+            raise ValueError('Debe enviar al menos una comida')
+        if len(value) > 500:
+            raise ValueError('No se pueden registrar más de 500 comidas por lote')
+        return value
+
+
+class MealBatchItemResult(SQLModel):
+    index: int  # posición de la comida en el lote recibido
+    success: bool
+    meal: Optional[MealRead] = None
+    error: Optional[str] = None
+
+
+class MealBatchResponse(SQLModel):
+    created_count: int
+    failed_count: int
+    results: List[MealBatchItemResult]
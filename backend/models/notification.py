@@ -1,14 +1,51 @@
 from typing import Optional
 from datetime import datetime
+from enum import Enum
 from sqlmodel import SQLModel, Field, Relationship
 
+
+class NotificationKind(str, Enum):
+    WATER_REMINDER = "water_reminder"
+    WATER_GOAL = "water_goal"
+    GOAL = "goal"
+    DIET = "diet"
+    GENERAL = "general"
+
+
 class Notification(SQLModel, table=True):
     __tablename__ = "notifications"
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    patient_id: int = Field(foreign_key="patients.id")
+    patient_id: int = Field(foreign_key="patients.id", index=True)
     message: str
     is_read: bool = False
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+    kind: NotificationKind = Field(
+        default=NotificationKind.GENERAL,
+        sa_column_kwargs={"server_default": NotificationKind.GENERAL.name},
+    )
+    repeat_count: int = Field(default=1, sa_column_kwargs={"server_default": "1"})  # avisos idénticos agrupados en esta fila
+
+    patient: "Patient" = Relationship() # type: ignore
+
+
+class NotificationArchive(SQLModel, table=True):
+    """Notificaciones vencidas que se conservan como historial fuera de la tabla principal"""
+    __tablename__ = "notifications_archive"
+
+    id: int = Field(primary_key=True)  # mismo ID que tenía en notifications
+    patient_id: int = Field(foreign_key="patients.id", index=True)
+    message: str
+    is_read: bool
+    created_at: datetime
+    kind: NotificationKind
+    repeat_count: int = 1
+    archived_at: datetime = Field(default_factory=datetime.now)
+
+
+class NotificationCounter(SQLModel, table=True):
+    """Cantidad de notificaciones sin leer de cada paciente, mantenida en cada escritura"""
+    __tablename__ = "notification_counters"
 
-    patient: "Patient" = Relationship() # type: ignore
\ No newline at end of file
+    patient_id: int = Field(foreign_key="patients.id", primary_key=True)
+    unread_count: int = 0
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Literal
+from typing import Literal, Optional
+from datetime import date
 
 class MacroSummary(BaseModel):
     protein_g: float
@@ -19,7 +20,25 @@ class Alerts(BaseModel):
     vitamin_c: Literal["deficit", "within range", "excess"]
     calcium: Literal["deficit", "within range", "excess"]
 
+class NutrientRange(BaseModel):
+    min: float
+    max: float
+
+class NutrientTargets(BaseModel):
+    """Rangos recomendados del paciente para el período resumido (día o comida)"""
+    protein_g: NutrientRange
+    carbs_g: NutrientRange
+    fat_g: NutrientRange
+    iron_mg: NutrientRange
+    vitamin_c_mg: NutrientRange
+    calcium_mg: NutrientRange
+
 class NutrientSummaryResponse(BaseModel):
     total_macros: MacroSummary
     total_micros: MicroSummary
     alerts: Alerts
+    targets: Optional[NutrientTargets] = None
+
+class DailyNutrientSummary(NutrientSummaryResponse):
+    date: date
+    meals_without_ingredients: int = 0  # comidas del día sin ingredientes (no suman)
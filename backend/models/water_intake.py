@@ -1,5 +1,5 @@
 from typing import Optional
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from sqlmodel import Field, SQLModel, Relationship
 from pydantic import field_validator
 
@@ -50,6 +50,16 @@ class WaterIntake(WaterIntakeBase, table=True):
     patient: "Patient" = Relationship(back_populates="water_intakes")
 
 
+class WaterDailyTotal(SQLModel, table=True):
+    """Total de agua de un paciente en un día, actualizado al registrar ingestas (utils.water_totals)"""
+    __tablename__ = "water_daily_totals"
+
+    patient_id: int = Field(foreign_key="patients.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    total_ml: int = 0
+    goal_notified: bool = False  # ya se notificó que se alcanzó la meta diaria de este día
+
+
 class WaterIntakeCreate(WaterIntakeBase):
     patient_id: int
 
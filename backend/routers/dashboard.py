@@ -0,0 +1,78 @@
+from datetime import date, datetime, time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select
+
+from config.database import get_session
+from models.meals import Meal, MealRead
+from models.patients import Patient
+from routers.goals import calculate_goals_progress, load_active_goals
+from routers.nutrient_summary import build_daily_nutrient_summary
+from routers.water_router import build_daily_water_summary
+from schemas.dashboard import PatientDashboard
+from utils.goal_resolver import prime_active_goals
+from utils.notification_counters import get_unread_count
+from utils.nutrient_targets import get_nutrient_targets
+from utils.security import get_current_patient
+
+router_dashboard = APIRouter(
+    prefix="/patients",
+    tags=["Dashboard"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router_dashboard.get("/dashboard", response_model=PatientDashboard)
+def get_patient_dashboard(
+    *,
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient),
+    target_date: date = Query(default_factory=date.today, description="Fecha del resumen (por defecto hoy)"),
+):
+    """Resumen de agua, nutrientes, objetivos, notificaciones y comidas del día (solo pacientes).
+    Reemplaza las cinco consultas de la pantalla de inicio por una sola."""
+    patient_id = current_patient.id
+
+    # Datos compartidos por varias secciones: se cargan una sola vez
+    meals = [
+        MealRead.model_validate(meal)
+        for meal in session.exec(
+            select(Meal)
+            .where(
+                Meal.patient_id == patient_id,
+                Meal.timestamp >= datetime.combine(target_date, time.min),
+                Meal.timestamp <= datetime.combine(target_date, time.max),
+            )
+            .order_by(Meal.timestamp)
+        ).all()
+    ]
+    # Los objetivos activos se leen una vez: quedan como metas en caché (agua) y se pasan al progreso
+    active_goals = load_active_goals(session, patient_id)
+    prime_active_goals(session, patient_id, active_goals)
+
+    # Las secciones usan la sesión de la petición, una tras otra: son consultas cortas y así
+    # cada petición ocupa una sola conexión del pool
+    water = build_daily_water_summary(session, patient_id, target_date)
+    nutrients = _nutrients_section(session, meals, get_nutrient_targets(current_patient))
+    goals = calculate_goals_progress(session, patient_id, active_goals)
+
+    return PatientDashboard(
+        date=target_date,
+        water=water,
+        nutrients=nutrients,
+        goals=goals,
+        # Después de los objetivos, que pueden notificar los que se completaron
+        unread_notifications=get_unread_count(session, patient_id),
+        meals=meals,
+    )
+
+
+def _nutrients_section(session: Session, meals, targets):
+    if not meals:
+        return None
+    try:
+        return build_daily_nutrient_summary(session, meals, targets)
+    except HTTPException:
+        # Alguna comida sin ingredientes: /nutrient-summary/daily responde 404
+        return None
+
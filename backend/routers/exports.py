@@ -0,0 +1,212 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+
+from config.database import get_session, create_session
+from models.goals import Goal
+from models.meals import Meal
+from models.patients import Patient
+from models.professionals import Professional
+from models.water_intake import WaterIntake
+from models.weight_logs import WeightLog
+from utils.food_profiles import get_food_profiles
+from utils.security import get_current_patient, get_current_professional
+
+router_exports = APIRouter(
+    prefix="/exports",
+    tags=["Exports"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Filas que se traen por vez desde el cursor del servidor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+
+class ExportDataset(str, Enum):
+    MEALS = "meals"
+    NUTRIENTS = "nutrients"
+    WATER = "water"
+    WEIGHT = "weight"
+    GOALS = "goals"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+NUTRIENT_COLUMNS = ["protein_g", "carbs_g", "fat_g", "calcium_mg", "iron_mg", "vitamin_c_mg"]
+
+# Columnas, columna de paciente y columna temporal (para filtrar y ordenar) de cada conjunto de datos
+EXPORT_DATASETS = {
+    ExportDataset.MEALS: (
+        [Meal.id, Meal.patient_id, Meal.timestamp, Meal.meal_of_the_day, Meal.meal_name, Meal.grams, Meal.calories, Meal.food_id],
+        Meal.patient_id,
+        Meal.timestamp,
+    ),
+    ExportDataset.NUTRIENTS: (
+        [Meal.id, Meal.patient_id, Meal.timestamp, Meal.meal_of_the_day, Meal.meal_name, Meal.grams, Meal.food_id],
+        Meal.patient_id,
+        Meal.timestamp,
+    ),
+    ExportDataset.WATER: (
+        [WaterIntake.id, WaterIntake.patient_id, WaterIntake.intake_time, WaterIntake.amount_ml, WaterIntake.notes],
+        WaterIntake.patient_id,
+        WaterIntake.intake_time,
+    ),
+    ExportDataset.WEIGHT: (
+        [WeightLog.id, WeightLog.patient_id, WeightLog.timestamp, WeightLog.weight],
+        WeightLog.patient_id,
+        WeightLog.timestamp,
+    ),
+    ExportDataset.GOALS: (
+        [Goal.id, Goal.patient_id, Goal.goal_type, Goal.status, Goal.target_weight, Goal.target_calories,
+         Goal.target_milliliters, Goal.start_date, Goal.target_date, Goal.achieved_at, Goal.created_at],
+        Goal.patient_id,
+        Goal.start_date,
+    ),
+}
+
+
+@router_exports.get("/me")
+def export_my_data(
+    *,
+    current_patient: Patient = Depends(get_current_patient),
+    dataset: ExportDataset = Query(..., description="Datos a exportar: meals, nutrients, water, weight o goals"),
+    file_format: ExportFormat = Query(ExportFormat.CSV, description="Formato: csv o ndjson"),
+    start_date: Optional[date] = Query(None, description="Fecha de inicio (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Fecha de fin (YYYY-MM-DD)"),
+):
+    """Exportar datos del paciente actual"""
+    patient_filter = EXPORT_DATASETS[dataset][1] == current_patient.id
+    return build_export_response(dataset, file_format, patient_filter, start_date, end_date, f"patient_{current_patient.id}")
+
+
+@router_exports.get("/patient/{patient_id}")
+def export_patient_data(
+    *,
+    session: Session = Depends(get_session),
+    current_professional: Professional = Depends(get_current_professional),
+    patient_id: int = Path(..., description="ID del paciente"),
+    dataset: ExportDataset = Query(..., description="Datos a exportar: meals, nutrients, water, weight o goals"),
+    file_format: ExportFormat = Query(ExportFormat.CSV, description="Formato: csv o ndjson"),
+    start_date: Optional[date] = Query(None, description="Fecha de inicio (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Fecha de fin (YYYY-MM-DD)"),
+):
+    """Exportar datos de un paciente (solo profesionales asignados)"""
+    patient = session.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+    if patient.professional_id != current_professional.id:
+        raise HTTPException(status_code=403, detail="No tienes permisos para ver los datos de este paciente")
+
+    patient_filter = EXPORT_DATASETS[dataset][1] == patient_id
+    return build_export_response(dataset, file_format, patient_filter, start_date, end_date, f"patient_{patient_id}")
+
+
+@router_exports.get("/caseload")
+def export_caseload_data(
+    *,
+    current_professional: Professional = Depends(get_current_professional),
+    dataset: ExportDataset = Query(..., description="Datos a exportar: meals, nutrients, water, weight o goals"),
+    file_format: ExportFormat = Query(ExportFormat.CSV, description="Formato: csv o ndjson"),
+    start_date: Optional[date] = Query(None, description="Fecha de inicio (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Fecha de fin (YYYY-MM-DD)"),
+):
+    """Exportar datos de todos los pacientes asignados al profesional actual"""
+    caseload = select(Patient.id).where(Patient.professional_id == current_professional.id)
+    patient_filter = EXPORT_DATASETS[dataset][1].in_(caseload)
+    return build_export_response(dataset, file_format, patient_filter, start_date, end_date, f"professional_{current_professional.id}")
+
+
+def build_export_response(dataset, file_format, patient_filter, start_date, end_date, scope: str) -> StreamingResponse:
+    """Armar la respuesta que transmite la exportación a medida que se leen las filas"""
+    columns, _, time_column = EXPORT_DATASETS[dataset]
+    query = select(*columns).where(patient_filter)
+
+    # Las fechas se comparan como rangos para poder usar los índices por fecha/hora
+    if start_date:
+        query = query.where(time_column >= _range_start(time_column, start_date))
+    if end_date:
+        query = query.where(time_column < _range_start(time_column, end_date + timedelta(days=1)))
+    query = query.order_by(columns[1], time_column, columns[0])
+
+    filename = f"{dataset.value}_{scope}.{file_format.value}"
+    return StreamingResponse(
+        stream_export(dataset, file_format, query),
+        media_type=EXPORT_MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def stream_export(dataset: ExportDataset, file_format: ExportFormat, query):
+    """Generador que recorre la consulta con un cursor del servidor y emite el archivo por bloques.
+    Usa su propia sesión porque la respuesta se sigue enviando después de cerrar la de la petición."""
+    session = create_session()
+    try:
+        profiles = {}
+        if dataset == ExportDataset.NUTRIENTS:
+            # Perfil nutricional de todas las comidas involucradas, en una sola consulta
+            food_ids = session.execute(query.with_only_columns(Meal.food_id).distinct().order_by(None)).scalars().all()
+            profiles = get_food_profiles(session, food_ids)
+
+        result = session.exec(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        header = list(result.keys())
+        if dataset == ExportDataset.NUTRIENTS:
+            header += NUTRIENT_COLUMNS
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if file_format == ExportFormat.CSV else None
+        if writer:
+            writer.writerow(header)
+
+        for rows in result.partitions():
+            for row in rows:
+                values = list(row)
+                if dataset == ExportDataset.NUTRIENTS:
+                    profile = profiles.get(row.food_id, {})
+                    values += [profile.get(nutrient, 0.0) * row.grams for nutrient in NUTRIENT_COLUMNS]
+
+                if writer:
+                    writer.writerow([_export_value(value) for value in values])
+                else:
+                    record = {column: _export_value(value) for column, value in zip(header, values)}
+                    buffer.write(json.dumps(record, ensure_ascii=False))
+                    buffer.write("\n")
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        session.close()
+
+
+def _range_start(column, day: date):
+    """Límite de un rango de fechas según el tipo de la columna (date o datetime)"""
+    if column is Goal.start_date:
+        return day
+    return datetime.combine(day, time.min)
+
+
+def _export_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 from sqlmodel import Session, select
 from datetime import datetime
@@ -9,6 +9,12 @@ from models.patients import Patient
 from models.foods import Food, FoodCreate, FoodRead, FoodUpdate, FoodReadWithIngredients
 from models.ingredients import Ingredient
 from models.ingredient_food import IngredientFood, IngredientFoodCreate, IngredientFoodRead, AddIngredientsRequest
+from utils.fast_json import select_read_columns, stream_rows_response
+from utils.food_profiles import invalidate_food_profiles
+from utils.field_selection import (
+    FIELDS_DESCRIPTION, INCLUDE_DESCRIPTION, group_by_key, parse_fields, parse_include,
+    rows_to_dicts, select_fields, sparse_response
+)
 from utils.security import get_current_patient
 
 router_foods = APIRouter(
@@ -21,25 +27,33 @@ router_foods = APIRouter(
 def get_all_foods(
     *,
     session: Session = Depends(get_session),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=f"{INCLUDE_DESCRIPTION}: ingredients"),
 ):
     """Obtener todas las comidas precargadas"""
-    foods = session.exec(
-        select(Food).where(Food.patient_id == None)
-    ).all()
-    
-    return foods
+    selected = parse_fields(fields, FoodRead)
+    included = parse_include(include, ["ingredients"])
+    if selected is not None or included:
+        return read_foods_sparse(session, Food.patient_id == None, selected, included)
+
+    return stream_rows_response(select_read_columns(Food, FoodRead).where(Food.patient_id == None).order_by(Food.id))
 
 @router_foods.get("/custom", response_model=List[FoodRead])
 def get_custom_foods(
     session: Session = Depends(get_session),
     current_patient: Patient = Depends(get_current_patient),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=f"{INCLUDE_DESCRIPTION}: ingredients"),
 ):
     """Obtener todas las comidas personalizadas del usuario actual"""
-    foods = session.exec(
-        select(Food).where(Food.patient_id == current_patient.id)
-    ).all()
-    
-    return foods
+    selected = parse_fields(fields, FoodRead)
+    included = parse_include(include, ["ingredients"])
+    if selected is not None or included:
+        return read_foods_sparse(session, Food.patient_id == current_patient.id, selected, included)
+
+    return stream_rows_response(
+        select_read_columns(Food, FoodRead).where(Food.patient_id == current_patient.id).order_by(Food.id)
+    )
 
 @router_foods.get("/{food_id}/ingredients", response_model=FoodReadWithIngredients)
 def get_food_ingredients(
@@ -122,5 +136,25 @@ def add_ingredients_to_custom_food(
         session.add(link)
 
     session.commit()
+    # La receta cambió: el perfil nutricional guardado ya no vale
+    invalidate_food_profiles(food_id)
     session.refresh(food)
-    return JSONResponse(status_code=201, content={"message": "Food created successfully"})
\ No newline at end of file
+    return JSONResponse(status_code=201, content={"message": "Food created successfully"})
+
+# Función auxiliar para las lecturas con ?fields= / ?include=
+def read_foods_sparse(session: Session, condition, fields: Optional[List[str]], include: set):
+    """Comidas con solo los campos pedidos y, si se pide, sus ingredientes cargados en una sola consulta"""
+    fields = fields or list(FoodRead.model_fields)
+    rows = session.execute(select_fields(Food, fields, required=["id"]).where(condition)).all()
+    foods = rows_to_dicts(rows, fields)
+
+    if "ingredients" in include:
+        food_ids = [row.id for row in rows]
+        links = session.exec(
+            select(IngredientFood).where(IngredientFood.food_id.in_(food_ids))
+        ).all() if food_ids else []
+        ingredients_by_food = group_by_key(links, "food_id", IngredientFoodRead)
+        for row, food in zip(rows, foods):
+            food["ingredients"] = ingredients_by_food.get(row.id, [])
+
+    return sparse_response(foods)
@@ -12,6 +12,8 @@ from models.weight_logs import WeightLog
 from models.meals import Meal
 from models.water_intake import WaterIntake
 from utils.security import get_current_patient, get_current_professional
+from models.notification import NotificationKind
+from utils.goal_resolver import invalidate_active_goals
 from utils.notifications import create_notification
 
 
@@ -62,6 +64,7 @@ def create_goal(
     session.add(db_goal)
     session.commit()
     session.refresh(db_goal)
+    invalidate_active_goals(session, goal.patient_id)
     
     # Crear notificación para el paciente
     goal_type_messages = {
@@ -71,7 +74,7 @@ def create_goal(
     }
     
     message = goal_type_messages.get(goal.goal_type, "🎯 Tu nutricionista te ha asignado un nuevo objetivo.")
-    create_notification(session, goal.patient_id, message)
+    create_notification(session, goal.patient_id, message, NotificationKind.GOAL)
     session.commit()
     
     return db_goal
@@ -153,157 +156,7 @@ def get_my_goals_progress(
     current_patient = Depends(get_current_patient),
 ):
     """Obtener el progreso de mis objetivos activos (solo pacientes)"""
-    # Obtener objetivos activos
-    active_goals = session.exec(
-        select(Goal).where(
-            Goal.patient_id == current_patient.id,
-            Goal.status == GoalStatus.ACTIVE
-        )
-    ).all()
-    
-    if not active_goals:
-        return []
-    
-    progress_list = []
-    
-    for goal in active_goals:
-        progress = GoalProgress(goal=goal)
-        
-        # Calcular progreso de peso
-        if goal.goal_type in GoalType.WEIGHT and goal.target_weight:
-            # Obtener el peso más reciente
-            latest_weight = session.exec(
-                select(WeightLog)
-                .where(WeightLog.patient_id == current_patient.id)
-                .where(WeightLog.timestamp <= goal.target_date)
-                .order_by(WeightLog.timestamp.desc())
-                .limit(1)
-            ).first()
-            
-            if latest_weight:
-                progress.current_weight = latest_weight.weight
-                
-                # Calcular diferencia de peso (positivo = falta bajar, negativo = se pasó bajando)
-                progress.weight_progress_difference = latest_weight.weight - goal.target_weight
-                
-                # Verificar si se alcanzó el objetivo de peso (con tolerancia de 0.5kg)
-                progress.is_weight_achieved = abs(latest_weight.weight - goal.target_weight) <= 0.5
-        
-        # Calcular progreso de calorías (promedio entre start_date y target_date)
-        if goal.goal_type in GoalType.CALORIES and goal.target_calories:
-            # Definir el rango de fechas para el cálculo
-            start_date = goal.start_date
-            end_date = goal.target_date if goal.target_date else date.today()
-            
-            # Asegurar que no calculemos más allá de hoy
-            end_date = min(end_date, date.today())
-            
-            # Obtener calorías entre start_date y end_date
-            recent_meals = session.exec(
-                select(Meal)
-                .where(
-                    Meal.patient_id == current_patient.id,
-                    func.date(Meal.timestamp) >= start_date,
-                    func.date(Meal.timestamp) <= end_date
-                )
-            ).all()
-            
-            if recent_meals:
-                # Agrupar por día y sumar calorías
-                daily_calories = {}
-                for meal in recent_meals:
-                    meal_date = meal.timestamp.date()
-                    if meal_date not in daily_calories:
-                        daily_calories[meal_date] = 0
-                    daily_calories[meal_date] += meal.calories
-                
-                if daily_calories:
-                    avg_calories = sum(daily_calories.values()) / len(daily_calories)
-                    progress.current_daily_calories = int(avg_calories)
-                    
-                    # Calcular diferencia de calorías (positivo = exceso, negativo = déficit)
-                    progress.calories_progress_difference = int(avg_calories - goal.target_calories)
-                    
-                    # Verificar si se alcanzó el objetivo de calorías (con tolerancia del 5%)
-                    tolerance = goal.target_calories * 0.05
-                    progress.is_calories_achieved = abs(avg_calories - goal.target_calories) <= tolerance
-        
-        # Calcular progreso de hidratación (promedio diario de agua)
-        if goal.goal_type == GoalType.WATER and goal.target_milliliters:
-            # Definir el rango de fechas para el cálculo
-            start_date = goal.start_date
-            end_date = goal.target_date if goal.target_date else date.today()
-            
-            # Asegurar que no calculemos más allá de hoy
-            end_date = min(end_date, date.today())
-            
-            # Obtener consumo de agua entre start_date y end_date
-            water_intakes = session.exec(
-                select(WaterIntake)
-                .where(
-                    WaterIntake.patient_id == current_patient.id,
-                    func.date(WaterIntake.intake_time) >= start_date,
-                    func.date(WaterIntake.intake_time) <= end_date
-                )
-            ).all()
-            
-            if water_intakes:
-                # Agrupar por día y sumar mililitros
-                daily_water = {}
-                for intake in water_intakes:
-                    intake_date = intake.intake_time.date()
-                    if intake_date not in daily_water:
-                        daily_water[intake_date] = 0
-                    daily_water[intake_date] += intake.amount_ml
-                
-                if daily_water:
-                    avg_water = sum(daily_water.values()) / len(daily_water)
-                    progress.current_daily_water = int(avg_water)
-                    
-                    # Calcular diferencia de agua (positivo = exceso, negativo = déficit)
-                    progress.water_progress_difference = int(avg_water - goal.target_milliliters)
-                    
-                    # Verificar si se alcanzó el objetivo de agua (con tolerancia del 10%)
-                    tolerance = goal.target_milliliters * 0.10
-                    progress.is_water_achieved = abs(avg_water - goal.target_milliliters) <= tolerance
-        
-        # Verificar si el objetivo está completamente alcanzado
-        if goal.goal_type == GoalType.WEIGHT:
-            progress.is_fully_achieved = progress.is_weight_achieved or False
-        elif goal.goal_type == GoalType.CALORIES:
-            progress.is_fully_achieved = progress.is_calories_achieved or False
-        elif goal.goal_type == GoalType.WATER:
-            progress.is_fully_achieved = progress.is_water_achieved or False
-
-
-        # Si el objetivo está completamente alcanzado y aún está activo, marcar como completado
-        # Excepto si es de hidratación
-        if progress.is_fully_achieved and goal.status == GoalStatus.ACTIVE and not goal.goal_type == GoalType.WATER:
-            goal.status = GoalStatus.COMPLETED
-            goal.achieved_at = datetime.now()
-            goal.updated_at = datetime.now()
-            session.add(goal)
-            
-            # Crear notificación para el paciente
-            goal_type_messages = {
-                GoalType.WEIGHT: f"🎯 ¡Felicidades! Alcanzaste tu peso objetivo de {goal.target_weight} kg.",
-                GoalType.CALORIES: f"🎯 ¡Felicidades! Lograste tu meta de {goal.target_calories} kcal/día.",
-                GoalType.WATER: f"💧 ¡Felicidades! Cumpliste tu meta de hidratación de {goal.target_milliliters} ml/día.",
-            }
-
-            message = goal_type_messages.get(goal.goal_type, "🎯 ¡Felicidades! Alcanzaste tu objetivo.")
-            create_notification(session, goal.patient_id, message)
-            session.commit()
-            session.refresh(goal)
-
-        # Calcular días restantes
-        if goal.target_date:
-            days_remaining = (goal.target_date - date.today()).days
-            progress.days_remaining = max(days_remaining, 0)
-        
-        progress_list.append(progress)
-    
-    return progress_list
+    return calculate_goals_progress(session, current_patient.id)
 
 
 @router_goals.get("/patient/{patient_id}/progress", response_model=List[GoalProgress])
@@ -448,6 +301,7 @@ def update_goal(
     session.add(goal)
     session.commit()
     session.refresh(goal)
+    invalidate_active_goals(session, goal.patient_id)
     
     return goal
 
@@ -468,8 +322,10 @@ def delete_goal(
     if goal.professional_id != current_professional.id:
         raise HTTPException(status_code=403, detail="No tienes permisos para eliminar este objetivo")
     
+    patient_id = goal.patient_id
     session.delete(goal)
     session.commit()
+    invalidate_active_goals(session, patient_id)
     
     return {"message": "Objetivo eliminado exitosamente"}
 
@@ -497,5 +353,172 @@ def mark_goal_as_completed(
     session.add(goal)
     session.commit()
     session.refresh(goal)
+    invalidate_active_goals(session, goal.patient_id)
+    
+    return {"message": "Objetivo marcado como completado", "goal": goal}
+
+
+# Función auxiliar para calcular el progreso (también la usa el dashboard del paciente)
+def calculate_goals_progress(
+    session: Session, patient_id: int, active_goals: Optional[List[Goal]] = None
+) -> List[GoalProgress]:
+    """Progreso de los objetivos activos del paciente. Los objetivos alcanzados (excepto los
+    de hidratación) se marcan como completados y se notifica al paciente.
+    active_goals permite pasar los objetivos activos si ya se consultaron."""
+    # Obtener objetivos activos
+    if active_goals is None:
+        active_goals = load_active_goals(session, patient_id)
     
-    return {"message": "Objetivo marcado como completado", "goal": goal}
\ No newline at end of file
+    if not active_goals:
+        return []
+    
+    progress_list = []
+    
+    for goal in active_goals:
+        progress = GoalProgress(goal=goal)
+        
+        # Calcular progreso de peso
+        if goal.goal_type in GoalType.WEIGHT and goal.target_weight:
+            # Obtener el peso más reciente
+            latest_weight = session.exec(
+                select(WeightLog)
+                .where(WeightLog.patient_id == patient_id)
+                .where(WeightLog.timestamp <= goal.target_date)
+                .order_by(WeightLog.timestamp.desc())
+                .limit(1)
+            ).first()
+            
+            if latest_weight:
+                progress.current_weight = latest_weight.weight
+                
+                # Calcular diferencia de peso (positivo = falta bajar, negativo = se pasó bajando)
+                progress.weight_progress_difference = latest_weight.weight - goal.target_weight
+                
+                # Verificar si se alcanzó el objetivo de peso (con tolerancia de 0.5kg)
+                progress.is_weight_achieved = abs(latest_weight.weight - goal.target_weight) <= 0.5
+        
+        # Calcular progreso de calorías (promedio entre start_date y target_date)
+        if goal.goal_type in GoalType.CALORIES and goal.target_calories:
+            # Definir el rango de fechas para el cálculo
+            start_date = goal.start_date
+            end_date = goal.target_date if goal.target_date else date.today()
+            
+            # Asegurar que no calculemos más allá de hoy
+            end_date = min(end_date, date.today())
+            
+            # Obtener calorías entre start_date y end_date
+            recent_meals = session.exec(
+                select(Meal)
+                .where(
+                    Meal.patient_id == patient_id,
+                    func.date(Meal.timestamp) >= start_date,
+                    func.date(Meal.timestamp) <= end_date
+                )
+            ).all()
+            
+            if recent_meals:
+                # Agrupar por día y sumar calorías
+                daily_calories = {}
+                for meal in recent_meals:
+                    meal_date = meal.timestamp.date()
+                    if meal_date not in daily_calories:
+                        daily_calories[meal_date] = 0
+                    daily_calories[meal_date] += meal.calories
+                
+                if daily_calories:
+                    avg_calories = sum(daily_calories.values()) / len(daily_calories)
+                    progress.current_daily_calories = int(avg_calories)
+                    
+                    # Calcular diferencia de calorías (positivo = exceso, negativo = déficit)
+                    progress.calories_progress_difference = int(avg_calories - goal.target_calories)
+                    
+                    # Verificar si se alcanzó el objetivo de calorías (con tolerancia del 5%)
+                    tolerance = goal.target_calories * 0.05
+                    progress.is_calories_achieved = abs(avg_calories - goal.target_calories) <= tolerance
+        
+        # Calcular progreso de hidratación (promedio diario de agua)
+        if goal.goal_type == GoalType.WATER and goal.target_milliliters:
+            # Definir el rango de fechas para el cálculo
+            start_date = goal.start_date
+            end_date = goal.target_date if goal.target_date else date.today()
+            
+            # Asegurar que no calculemos más allá de hoy
+            end_date = min(end_date, date.today())
+            
+            # Obtener consumo de agua entre start_date y end_date
+            water_intakes = session.exec(
+                select(WaterIntake)
+                .where(
+                    WaterIntake.patient_id == patient_id,
+                    func.date(WaterIntake.intake_time) >= start_date,
+                    func.date(WaterIntake.intake_time) <= end_date
+                )
+            ).all()
+            
+            if water_intakes:
+                # Agrupar por día y sumar mililitros
+                daily_water = {}
+                for intake in water_intakes:
+                    intake_date = intake.intake_time.date()
+                    if intake_date not in daily_water:
+                        daily_water[intake_date] = 0
+                    daily_water[intake_date] += intake.amount_ml
+                
+                if daily_water:
+                    avg_water = sum(daily_water.values()) / len(daily_water)
+                    progress.current_daily_water = int(avg_water)
+                    
+                    # Calcular diferencia de agua (positivo = exceso, negativo = déficit)
+                    progress.water_progress_difference = int(avg_water - goal.target_milliliters)
+                    
+                    # Verificar si se alcanzó el objetivo de agua (con tolerancia del 10%)
+                    tolerance = goal.target_milliliters * 0.10
+                    progress.is_water_achieved = abs(avg_water - goal.target_milliliters) <= tolerance
+        
+        # Verificar si el objetivo está completamente alcanzado
+        if goal.goal_type == GoalType.WEIGHT:
+            progress.is_fully_achieved = progress.is_weight_achieved or False
+        elif goal.goal_type == GoalType.CALORIES:
+            progress.is_fully_achieved = progress.is_calories_achieved or False
+        elif goal.goal_type == GoalType.WATER:
+            progress.is_fully_achieved = progress.is_water_achieved or False
+
+
+        # Si el objetivo está completamente alcanzado y aún está activo, marcar como completado
+        # Excepto si es de hidratación
+        if progress.is_fully_achieved and goal.status == GoalStatus.ACTIVE and not goal.goal_type == GoalType.WATER:
+            goal.status = GoalStatus.COMPLETED
+            goal.achieved_at = datetime.now()
+            goal.updated_at = datetime.now()
+            session.add(goal)
+            
+            # Crear notificación para el paciente
+            goal_type_messages = {
+                GoalType.WEIGHT: f"🎯 ¡Felicidades! Alcanzaste tu peso objetivo de {goal.target_weight} kg.",
+                GoalType.CALORIES: f"🎯 ¡Felicidades! Lograste tu meta de {goal.target_calories} kcal/día.",
+                GoalType.WATER: f"💧 ¡Felicidades! Cumpliste tu meta de hidratación de {goal.target_milliliters} ml/día.",
+            }
+
+            message = goal_type_messages.get(goal.goal_type, "🎯 ¡Felicidades! Alcanzaste tu objetivo.")
+            create_notification(session, goal.patient_id, message, NotificationKind.GOAL)
+            session.commit()
+            session.refresh(goal)
+            invalidate_active_goals(session, goal.patient_id)
+
+        # Calcular días restantes
+        if goal.target_date:
+            days_remaining = (goal.target_date - date.today()).days
+            progress.days_remaining = max(days_remaining, 0)
+        
+        progress_list.append(progress)
+    
+    return progress_list
+
+
+def load_active_goals(session: Session, patient_id: int) -> List[Goal]:
+    return session.exec(
+        select(Goal).where(
+            Goal.patient_id == patient_id,
+            Goal.status == GoalStatus.ACTIVE
+        )
+    ).all()
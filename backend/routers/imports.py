@@ -0,0 +1,296 @@
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Path, Query, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from config.database import get_session
+from models.import_jobs import ImportJob, ImportJobRead, ImportKind, ImportFormat, ImportStatus
+from models.meals import Meal, MealBase
+from models.patients import Patient
+from models.water_intake import WaterIntake, WaterIntakeBase
+from models.weight_logs import WeightLog, WeightLogBase
+from routers.meals import search_foods_by_names
+from utils.food_profiles import get_food_profiles
+from utils.water_totals import recount_daily_water_totals
+from utils.security import get_current_patient
+from utils.weekly_summary_cache import invalidate_patient_weekly_summaries
+
+router_imports = APIRouter(
+    prefix="/imports",
+    tags=["Imports"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Filas que se validan e insertan por transacción
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Cantidad máxima de errores de validación que se guardan por importación
+MAX_STORED_ERRORS = 100
+# Tamaño de lectura para archivos JSON
+JSON_READ_SIZE = 64 * 1024
+# Tamaño máximo de un objeto JSON: si no se puede leer una fila en ese espacio el archivo está
+# mal formado, y se corta en lugar de seguir cargándolo en memoria
+MAX_JSON_ROW_BYTES = int(os.getenv("MAX_JSON_ROW_BYTES", str(1024 * 1024)))
+
+
+@router_imports.post("/{kind}", response_model=ImportJobRead)
+def import_history(
+    *,
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient),
+    kind: ImportKind = Path(..., description="Tipo de datos a importar: meals, weights o water"),
+    file_format: ImportFormat = Query(ImportFormat.CSV, description="Formato del archivo: csv o json"),
+    job_id: Optional[int] = Query(None, description="ID de una importación interrumpida para retomarla"),
+    file: UploadFile = File(..., description="Archivo con el historial a importar"),
+):
+    """Importar historial de comidas, pesos o consumo de agua desde un archivo CSV o JSON.
+
+    El archivo se procesa por bloques: cada bloque se valida y se inserta en su propia
+    transacción junto con el progreso de la importación. Si la importación se interrumpe,
+    se puede volver a subir el mismo archivo indicando job_id para continuar desde la
+    última fila confirmada.
+    """
+    if job_id is not None:
+        job = session.get(ImportJob, job_id)
+        if not job or job.patient_id != current_patient.id:
+            raise HTTPException(status_code=404, detail="Importación no encontrada")
+        if job.kind != kind or job.file_format != file_format:
+            raise HTTPException(status_code=400, detail="El tipo y formato deben coincidir con la importación original")
+        if job.status == ImportStatus.COMPLETED:
+            raise HTTPException(status_code=400, detail="La importación ya fue completada")
+        job.status = ImportStatus.PROCESSING
+    else:
+        job = ImportJob(kind=kind, file_format=file_format, patient_id=current_patient.id)
+
+    job.updated_at = datetime.now()
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    try:
+        process_import(session, job, current_patient, file.file)
+    except Exception as e:
+        # Las filas de los bloques ya confirmados se conservan; se puede retomar con job_id
+        session.rollback()
+        job.status = ImportStatus.FAILED
+        job.errors = _append_errors(job.errors, [f"Error al procesar el archivo: {e}"])
+        job.updated_at = datetime.now()
+        session.add(job)
+        session.commit()
+    finally:
+        invalidate_patient_weekly_summaries(current_patient.id)
+
+    session.refresh(job)
+    return job
+
+
+@router_imports.get("/", response_model=List[ImportJobRead])
+def get_my_imports(
+    *,
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient),
+):
+    """Obtener las importaciones del paciente actual"""
+    return session.exec(
+        select(ImportJob)
+        .where(ImportJob.patient_id == current_patient.id)
+        .order_by(ImportJob.created_at.desc())
+    ).all()
+
+
+@router_imports.get("/{job_id}", response_model=ImportJobRead)
+def get_import(
+    *,
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient),
+    job_id: int,
+):
+    """Obtener el progreso de una importación"""
+    job = session.get(ImportJob, job_id)
+    if not job or job.patient_id != current_patient.id:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+
+    return job
+
+
+def process_import(session: Session, job: ImportJob, patient: Patient, binary_file):
+    """Leer, validar e insertar las filas del archivo por bloques, guardando el progreso"""
+    rows = enumerate(iter_file_rows(binary_file, job.file_format), start=1)
+    # Saltear las filas ya confirmadas en una ejecución anterior
+    rows = islice(rows, job.rows_processed, None)
+
+    food_cache = {}
+    while True:
+        chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+        if not chunk:
+            break
+
+        if job.kind == ImportKind.MEALS:
+            records, errors = build_meal_records(session, chunk, patient, food_cache)
+        elif job.kind == ImportKind.WEIGHTS:
+            records, errors = build_simple_records(chunk, WeightLogBase, patient)
+        else:
+            records, errors = build_simple_records(chunk, WaterIntakeBase, patient)
+
+        if records:
+            session.execute(insert(IMPORT_MODELS[job.kind]), records)
+            if job.kind == ImportKind.WATER:
+                # El insert masivo no actualiza los totales diarios de agua
+                recount_daily_water_totals(session, patient.id, [record["intake_time"].date() for record in records])
+
+        job.rows_processed += len(chunk)
+        job.rows_imported += len(records)
+        job.rows_failed += len(errors)
+        job.errors = _append_errors(job.errors, errors)
+        job.updated_at = datetime.now()
+        session.add(job)
+        session.commit()
+
+    if job.kind == ImportKind.WEIGHTS:
+        # El peso actual del paciente es el último registrado
+        latest_weight = session.exec(
+            select(WeightLog)
+            .where(WeightLog.patient_id == patient.id)
+            .order_by(WeightLog.timestamp.desc())
+            .limit(1)
+        ).first()
+        if latest_weight:
+            patient.weight = latest_weight.weight
+            session.add(patient)
+
+    job.status = ImportStatus.COMPLETED
+    job.updated_at = datetime.now()
+    session.add(job)
+    session.commit()
+
+
+IMPORT_MODELS = {
+    ImportKind.MEALS: Meal,
+    ImportKind.WEIGHTS: WeightLog,
+    ImportKind.WATER: WaterIntake,
+}
+
+
+def build_meal_records(session: Session, chunk: list, patient: Patient, food_cache: dict):
+    """Validar filas de comidas y calcular sus calorías, resolviendo las comidas del bloque en bloque"""
+    errors = []
+    validated = []
+    for row_number, row in chunk:
+        try:
+            validated.append((row_number, MealBase.model_validate(_clean_row(row))))
+        except (ValidationError, TypeError) as e:
+            errors.append(f"Fila {row_number}: {_describe_error(e)}")
+
+    # Resolver solo los nombres que no aparecieron en bloques anteriores
+    unknown_names = {meal.meal_name for _, meal in validated if meal.meal_name not in food_cache}
+    if unknown_names:
+        foods_by_name = search_foods_by_names(session=session, food_names=unknown_names, current_patient=patient)
+        profiles = get_food_profiles(session, {food.id for food in foods_by_name.values()})
+        for name in unknown_names:
+            food = foods_by_name.get(name)
+            profile = profiles.get(food.id) if food else None
+            if profile and profile["total_grams"] > 0:
+                food_cache[name] = (food.id, profile["calories_kcal"])
+            else:
+                food_cache[name] = None
+
+    records = []
+    for row_number, meal in validated:
+        resolved_food = food_cache[meal.meal_name]
+        if not resolved_food:
+            errors.append(f"Fila {row_number}: la comida '{meal.meal_name}' no existe o no tiene ingredientes asociados")
+            continue
+
+        food_id, calories_per_gram = resolved_food
+        records.append({
+            **meal.model_dump(),
+            "food_id": food_id,
+            "patient_id": patient.id,
+            "calories": calories_per_gram * meal.grams,
+        })
+
+    return records, errors
+
+
+def build_simple_records(chunk: list, base_model, patient: Patient):
+    """Validar filas de pesos o de consumo de agua con los validadores del modelo base"""
+    errors = []
+    records = []
+    for row_number, row in chunk:
+        try:
+            record = base_model.model_validate(_clean_row(row)).model_dump()
+        except (ValidationError, TypeError) as e:
+            errors.append(f"Fila {row_number}: {_describe_error(e)}")
+            continue
+
+        record["patient_id"] = patient.id
+        records.append(record)
+
+    return records, errors
+
+
+def iter_file_rows(binary_file, file_format: ImportFormat):
+    """Recorrer las filas del archivo sin cargarlo completo en memoria"""
+    text_file = codecs.getreader("utf-8-sig")(binary_file)
+
+    if file_format == ImportFormat.CSV:
+        yield from csv.DictReader(text_file)
+        return
+
+    # JSON: se aceptan tanto un arreglo de objetos como un objeto por línea
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    row_number = 1
+    while True:
+        # Descartar separadores entre objetos (espacios, comas y corchetes del arreglo)
+        buffer = buffer.lstrip(" \t\r\n,[]")
+        if buffer:
+            try:
+                row, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"Fila {row_number}: JSON inválido ({e.msg})")
+                if len(buffer) > MAX_JSON_ROW_BYTES:
+                    raise ValueError(
+                        f"Fila {row_number}: JSON inválido o fila de más de {MAX_JSON_ROW_BYTES} bytes ({e.msg})"
+                    )
+            else:
+                yield row
+                row_number += 1
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            return
+
+        data = text_file.read(JSON_READ_SIZE)
+        if not data:
+            eof = True
+        buffer += data
+
+
+def _clean_row(row: dict) -> dict:
+    """Normalizar una fila: las celdas vacías de un CSV se interpretan como valores nulos"""
+    if not isinstance(row, dict):
+        raise TypeError("cada fila debe ser un objeto con los campos del registro")
+    return {key: (None if value == "" else value) for key, value in row.items() if key}
+
+
+def _describe_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in error.errors())
+    return str(error)
+
+
+def _append_errors(stored_errors: Optional[str], new_errors: list) -> Optional[str]:
+    """Agregar errores al registro de la importación, conservando solo los primeros"""
+    lines = stored_errors.split("\n") if stored_errors else []
+    lines.extend(new_errors[:max(MAX_STORED_ERRORS - len(lines), 0)])
+    return "\n".join(lines) if lines else None
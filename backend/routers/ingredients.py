@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session
 from config.database import get_session
 
 from models.patients import Patient
 from models.ingredients import Ingredient, IngredientCreate, IngredientRead
 from models.ingredient_food import IngredientFood, IngredientFoodCreate, IngredientFoodRead
 from models.foods import Food, FoodCreate, FoodRead, FoodUpdate, FoodReadWithIngredients
+from utils.fast_json import select_read_columns, stream_rows_response
 from utils.security import get_current_patient
 
 router_ingredients = APIRouter(
@@ -34,8 +35,4 @@ def get_all_ingredients(
     session: Session = Depends(get_session),
 ):
     """Obtener todos los ingredientes existentes"""
-    ingredients = session.exec(
-        select(Ingredient)
-    ).all()
-    
-    return ingredients
\ No newline at end of file
+    return stream_rows_response(select_read_columns(Ingredient, IngredientRead).order_by(Ingredient.id))
\ No newline at end of file
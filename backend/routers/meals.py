@@ -1,16 +1,23 @@
 from typing import Optional, List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 
 from config.database import get_session
-from models.meals import Meal, MealCreate, MealRead, MealUpdate
+from models.meals import (
+    Meal, MealCreate, MealRead, MealUpdate,
+    MealBatchCreate, MealBatchItemResult, MealBatchResponse
+)
 from models.patients import Patient
 from models.foods import Food
 from models.ingredient_food import IngredientFood
 from models.ingredients import Ingredient
 from utils.security import get_current_patient
 from utils.calories import calculate_meal_calories
+from utils.fast_json import select_read_columns, stream_rows_response
+from utils.field_selection import FIELDS_DESCRIPTION, parse_fields, rows_to_dicts, select_fields, sparse_response
+from utils.food_profiles import get_food_profiles
+from utils.weekly_summary_cache import invalidate_weekly_summaries
 
 router_meals = APIRouter(
     prefix="/meals",
@@ -22,13 +29,21 @@ router_meals = APIRouter(
 def get_meals(
     session: Session = Depends(get_session),
     current_patient: Patient = Depends(get_current_patient),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """Obtener todas las comidas del usuario actual"""
-    meals = session.exec(
-        select(Meal).where(Meal.patient_id == current_patient.id)
-    ).all()
-    
-    return meals
+    selected = parse_fields(fields, MealRead)
+    if selected is not None:
+        # Solo las columnas pedidas, p. ej. ?fields=id,meal_name,calories para el listado
+        rows = session.execute(
+            select_fields(Meal, selected).where(Meal.patient_id == current_patient.id)
+        ).all()
+        return sparse_response(rows_to_dicts(rows, selected))
+
+    # El historial puede ser largo: se envía por partes
+    return stream_rows_response(
+        select_read_columns(Meal, MealRead).where(Meal.patient_id == current_patient.id).order_by(Meal.id)
+    )
 
 @router_meals.post("/", response_model=MealRead)
 def create_meal(
@@ -65,8 +80,86 @@ def create_meal(
     session.add(new_meal)
     session.commit()
     session.refresh(new_meal)
+    invalidate_weekly_summaries(current_patient.id, new_meal.timestamp)
     return new_meal
 
+@router_meals.post("/batch", response_model=MealBatchResponse)
+def create_meals_batch(
+    *,
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient),
+    meals_batch: MealBatchCreate,
+):
+    """Registrar varias comidas del usuario actual en una sola transacción.
+    Las comidas que no se pueden registrar se informan en el resultado sin afectar al resto."""
+    # Resolver todos los nombres de comida y calcular sus calorías por gramo de una sola vez
+    foods_by_name = search_foods_by_names(
+        session=session,
+        food_names={meal.meal_name for meal in meals_batch.meals},
+        current_patient=current_patient,
+    )
+    profiles = get_food_profiles(session, {food.id for food in foods_by_name.values()})
+
+    results = []
+    new_meals = []
+    for index, meal_create in enumerate(meals_batch.meals):
+        food = foods_by_name.get(meal_create.meal_name)
+        if not food:
+            results.append(MealBatchItemResult(
+                index=index,
+                success=False,
+                error="Food not found. Please create this food with its ingredients first.",
+            ))
+            continue
+
+        profile = profiles.get(food.id)
+        if not profile:
+            results.append(MealBatchItemResult(
+                index=index,
+                success=False,
+                error="La comida existe pero no tiene ingredientes asociados.",
+            ))
+            continue
+        if profile["total_grams"] == 0:
+            results.append(MealBatchItemResult(
+                index=index,
+                success=False,
+                error="El total de gramos de los ingredientes no puede ser cero.",
+            ))
+            continue
+
+        new_meal = Meal(
+            meal_name=meal_create.meal_name,
+            grams=meal_create.grams,
+            meal_of_the_day=meal_create.meal_of_the_day,
+            timestamp=meal_create.timestamp,
+            calories=profile["calories_kcal"] * meal_create.grams,
+            food_id=food.id,
+            patient_id=current_patient.id,
+        )
+        new_meals.append(new_meal)
+        results.append(MealBatchItemResult(index=index, success=True))
+
+    if new_meals:
+        session.add_all(new_meals)
+        session.flush()
+
+        # Completar los resultados exitosos con las comidas ya insertadas (en orden)
+        created_meals = iter(new_meals)
+        for result in results:
+            if result.success:
+                result.meal = MealRead.model_validate(next(created_meals))
+
+        logged_timestamps = [meal.timestamp for meal in new_meals]
+        session.commit()
+        invalidate_weekly_summaries(current_patient.id, *logged_timestamps)
+
+    return MealBatchResponse(
+        created_count=len(new_meals),
+        failed_count=len(results) - len(new_meals),
+        results=results,
+    )
+
 @router_meals.get("/{meal_id}", response_model=MealRead)
 def get_meal(
     *,
@@ -107,6 +200,7 @@ def update_meal(
         )
     
     meal_data = meal_update.model_dump(exclude_unset=True)
+    previous_timestamp = meal.timestamp
     
     for key, value in meal_data.items():
         setattr(meal, key, value)
@@ -126,6 +220,7 @@ def update_meal(
     session.add(meal)
     session.commit()
     session.refresh(meal)
+    invalidate_weekly_summaries(current_patient.id, previous_timestamp, meal.timestamp)
     
     return meal
 
@@ -147,8 +242,10 @@ def delete_meal(
             detail="Meal not found",
         )
     
+    meal_timestamp = meal.timestamp
     session.delete(meal)
     session.commit()
+    invalidate_weekly_summaries(current_patient.id, meal_timestamp)
     
     return {"message": "Meal deleted successfully"}
 
@@ -157,13 +254,8 @@ def search_food_by_name(
     food_name: str,
     current_patient: Patient,
 ):
-    """Buscar comida por nombre"""
-    food = session.exec(
-        select(Food).where(
-            (Food.food_name == food_name) &
-            ((Food.patient_id == None) | (Food.patient_id == current_patient.id))
-        )
-    ).first()
+    """Buscar comida por nombre (con la misma prioridad que search_foods_by_names)"""
+    food = search_foods_by_names(session, {food_name}, current_patient).get(food_name)
     
     if not food:
         raise HTTPException(
@@ -171,4 +263,28 @@ def search_food_by_name(
             detail="Food not found. Please create this food with its ingredients first.",
         )
     
-    return food
\ No newline at end of file
+    return food
+
+def search_foods_by_names(
+    session: Session,
+    food_names: set,
+    current_patient: Patient,
+) -> dict:
+    """Buscar varias comidas por nombre en una sola consulta.
+    Si existe una comida personalizada del paciente con el mismo nombre, se prioriza sobre la precargada."""
+    if not food_names:
+        return {}
+
+    foods = session.exec(
+        select(Food).where(
+            Food.food_name.in_(food_names) &
+            ((Food.patient_id == None) | (Food.patient_id == current_patient.id))
+        )
+    ).all()
+
+    foods_by_name = {}
+    for food in foods:
+        if food.food_name not in foods_by_name or food.patient_id is not None:
+            foods_by_name[food.food_name] = food
+
+    return foods_by_name
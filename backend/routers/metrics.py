@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from utils.metrics import render_metrics
+
+router_metrics = APIRouter(tags=["Metrics"])
+
+
+@router_metrics.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Latencia por ruta y consultas SQL en formato de Prometheus"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,24 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
 from models.notification import Notification
 from config.database import get_session
-from utils.security import get_current_patient
-from sqlalchemy import func
+from utils.fast_json import rows_response, select_read_columns
+from utils.notification_bus import subscribe, unsubscribe
+from utils.notification_counters import get_unread_count, set_unread_count
+from utils.security import STREAM_TOKEN_EXPIRE_SECONDS, create_stream_token, get_current_patient, get_current_patient_for_stream
+from sqlalchemy import update
 
 router_notifications = APIRouter(prefix="/notifications", tags=["notifications"])
 
+# Intervalo de los mensajes de keep-alive para que los proxies no corten la conexión
+STREAM_HEARTBEAT_SECONDS = int(os.getenv("NOTIFICATIONS_STREAM_HEARTBEAT_SECONDS", "25"))
+# Duración máxima de un stream; al reconectarse el cliente vuelve a validar su token
+STREAM_MAX_SECONDS = int(os.getenv("NOTIFICATIONS_STREAM_MAX_SECONDS", "3600"))
+
 # Obtener notificaciones
 @router_notifications.get("/", response_model=list[Notification])
 def get_my_notifications(
     *,
     session: Session = Depends(get_session),
-    current_patient = Depends(get_current_patient)
+    current_patient = Depends(get_current_patient),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Cantidad máxima de notificaciones"),
+    offset: int = Query(0, ge=0, description="Cantidad de notificaciones a saltear"),
 ):
-    return session.exec(
-        select(Notification)
+    query = (
+        select_read_columns(Notification, Notification)
         .where(Notification.patient_id == current_patient.id)
         .order_by(Notification.created_at.desc())
-    ).all()
+        .offset(offset)
+    )
+    if limit:
+        query = query.limit(limit)
+    return rows_response(session.execute(query).all())
 
 # Marcar notifiacion como leida
 @router_notifications.post("/{id}/read")
@@ -57,11 +77,61 @@ def get_unread_notifications_count(
     session: Session = Depends(get_session),
     current_patient = Depends(get_current_patient)
 ):
-    count = session.exec(
-    select(func.count()).select_from(Notification).where(
-        Notification.patient_id == current_patient.id,
-        Notification.is_read == False
+    return {"unread_count": get_unread_count(session, current_patient.id)}
+
+# Marcar todas las notificaciones como leidas
+@router_notifications.post("/read-all")
+def mark_all_notifications_as_read(
+    session: Session = Depends(get_session),
+    current_patient = Depends(get_current_patient)
+):
+    result = session.exec(
+        update(Notification)
+        .where(
+            Notification.patient_id == current_patient.id,
+            Notification.is_read == False
+        )
+        .values(is_read=True)
     )
-    ).one()
+    # La actualización masiva no pasa por los eventos de la sesión: el contador se fija a mano
+    set_unread_count(session, current_patient.id, 0)
+    session.commit()
+    return {"message": "Notificaciones marcadas como leídas", "updated_count": result.rowcount}
+
+# Token para abrir el stream (el de acceso no se pone en la URL: quedaría en los logs)
+@router_notifications.post("/stream-token")
+def get_stream_token(
+    current_patient = Depends(get_current_patient)
+):
+    """Emitir un token de corta duración que solo sirve para /notifications/stream"""
+    return {"token": create_stream_token(current_patient), "expires_in": STREAM_TOKEN_EXPIRE_SECONDS}
+
+# Recibir notificaciones nuevas en tiempo real (server-sent events)
+@router_notifications.get("/stream")
+async def stream_notifications(
+    current_patient = Depends(get_current_patient_for_stream)
+):
+    """Mantener abierta una conexión SSE que envía cada notificación nueva del paciente.
+    El token se valida una sola vez al conectarse: mientras la conexión está inactiva no se hacen consultas."""
+    patient_id = current_patient.id
+
+    async def event_stream():
+        queue = subscribe(patient_id)
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        try:
+            yield "retry: 5000\n\n"
+            while time.monotonic() < deadline:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        finally:
+            unsubscribe(patient_id, queue)
 
-    return {"unread_count": count}
\ No newline at end of file
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
@@ -2,15 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from typing import List, Callable
 from config.database import get_session
-from models.nutrient_summary import NutrientSummaryResponse, MacroSummary, MicroSummary, Alerts
+from models.nutrient_summary import NutrientSummaryResponse, DailyNutrientSummary, MacroSummary, MicroSummary, Alerts, NutrientTargets
 from models.patients import Patient
 from utils.security import get_current_patient
 from models.ingredient_food import IngredientFood
 from models.ingredients import Ingredient
 from models.foods import Food
 from models.meals import Meal
-from utils.nutrients import calculate_adjusted_nutrient, classify_nutrient, get_meal_nutrients
-from datetime import date, datetime, time
+from utils.nutrients import calculate_adjusted_nutrient, get_meal_nutrients, get_meals_nutrients
+from utils.nutrient_targets import TARGET_NUTRIENTS, classify_nutrient_days, get_nutrient_targets, meal_targets
+from datetime import date, datetime, time, timedelta
 
 router_nutrient_summary = APIRouter(
     prefix="/nutrient-summary",
@@ -18,6 +19,9 @@ router_nutrient_summary = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Período máximo de /range
+MAX_RANGE_DAYS = 92
+
 @router_nutrient_summary.get("/daily", response_model=NutrientSummaryResponse)
 def daily_nutrient_summary(
     date: date = Query(default_factory=date.today, description="Date in YYYY-MM-DD format"),
@@ -36,40 +40,56 @@ def daily_nutrient_summary(
     if not meals:
         raise HTTPException(status_code=404, detail="No meals found for the specified date.")
 
-    total_nutrients = {
-        "protein_g": 0.0,
-        "carbs_g": 0.0,
-        "fat_g": 0.0,
-        "calcium_mg": 0.0,
-        "iron_mg": 0.0,
-        "vitamin_c_mg": 0.0
-    }
+    return build_daily_nutrient_summary(session, meals, get_nutrient_targets(current_patient))
 
+@router_nutrient_summary.get("/range", response_model=List[DailyNutrientSummary])
+def nutrient_summary_range(
+    start_date: date = Query(..., description="Fecha de inicio (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="Fecha de fin (YYYY-MM-DD)"),
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """Obtener el resumen de nutrientes de cada día con comidas en un período, clasificados en una sola pasada."""
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin")
+    if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"El período no puede superar los {MAX_RANGE_DAYS} días")
+
+    meals = session.exec(
+        select(Meal)
+        .where(
+            Meal.patient_id == current_patient.id,
+            Meal.timestamp >= datetime.combine(start_date, time.min),
+            Meal.timestamp < datetime.combine(end_date + timedelta(days=1), time.min),
+        )
+        .order_by(Meal.timestamp)
+    ).all()
+
+    # Una comida sin ingredientes no invalida todo el período: se omite y se informa por día
+    totals_by_day = {}
+    without_ingredients = {}
+    nutrients_by_meal = get_meals_nutrients(session, meals, skip_missing=True)
     for meal in meals:
-        meal_nutrients = get_meal_nutrients(session, meal)
-        for key in total_nutrients:
-            total_nutrients[key] += meal_nutrients[key]
+        day = meal.timestamp.date()
+        day_totals = totals_by_day.setdefault(day, dict.fromkeys(TARGET_NUTRIENTS, 0.0))
+        meal_nutrients = nutrients_by_meal.get(meal.id)
+        if meal_nutrients is None:
+            without_ingredients[day] = without_ingredients.get(day, 0) + 1
+            continue
+        for nutrient in TARGET_NUTRIENTS:
+            day_totals[nutrient] += meal_nutrients[nutrient]
 
-    return NutrientSummaryResponse(
-        total_macros=MacroSummary(
-            protein_g=total_nutrients["protein_g"],
-            carbs_g=total_nutrients["carbs_g"],
-            fat_g=total_nutrients["fat_g"]
-        ),
-        total_micros=MicroSummary(
-            iron_mg=total_nutrients["iron_mg"],
-            vitamin_c_mg=total_nutrients["vitamin_c_mg"],
-            calcium_mg=total_nutrients["calcium_mg"]
-        ),
-        alerts=Alerts(
-            protein=classify_nutrient(total_nutrients["protein_g"], 10, 30),
-            carbs=classify_nutrient(total_nutrients["carbs_g"], 20, 60),
-            fat=classify_nutrient(total_nutrients["fat_g"], 10, 30),
-            iron=classify_nutrient(total_nutrients["iron_mg"], 1, 10),
-            vitamin_c=classify_nutrient(total_nutrients["vitamin_c_mg"], 15, 90),
-            calcium=classify_nutrient(total_nutrients["calcium_mg"], 200, 1000)
+    targets = get_nutrient_targets(current_patient)
+    days = list(totals_by_day)
+    alerts = classify_nutrient_days([totals_by_day[day] for day in days], targets)
+    return [
+        DailyNutrientSummary(
+            date=day,
+            meals_without_ingredients=without_ingredients.get(day, 0),
+            **build_summary(totals_by_day[day], day_alerts, targets).model_dump(),
         )
-    )
+        for day, day_alerts in zip(days, alerts)
+    ]
 
 @router_nutrient_summary.get("/{meal_id}", response_model=NutrientSummaryResponse)
 def nutrient_summary(meal_id: int, session: Session = Depends(get_session), current_patient: Patient = Depends(get_current_patient)):
@@ -81,7 +101,25 @@ def nutrient_summary(meal_id: int, session: Session = Depends(get_session), curr
         raise HTTPException(status_code=404, detail="Meal not found.")
 
     nutrients = get_meal_nutrients(session, meal)
+    # Una comida se compara con la parte del día que le corresponde
+    targets = meal_targets(get_nutrient_targets(current_patient))
+    return build_summary(nutrients, classify_nutrient_days([nutrients], targets)[0], targets)
 
+
+# Función auxiliar para sumar los nutrientes del día (también la usa el dashboard del paciente)
+def build_daily_nutrient_summary(session: Session, meals: List[Meal], targets: NutrientTargets) -> NutrientSummaryResponse:
+    """Totales de macro y micronutrientes de las comidas con sus alertas"""
+    total_nutrients = dict.fromkeys(TARGET_NUTRIENTS, 0.0)
+
+    nutrients_by_meal = get_meals_nutrients(session, meals)
+    for meal_nutrients in nutrients_by_meal.values():
+        for key in total_nutrients:
+            total_nutrients[key] += meal_nutrients[key]
+
+    return build_summary(total_nutrients, classify_nutrient_days([total_nutrients], targets)[0], targets)
+
+
+def build_summary(nutrients: dict, alerts: Alerts, targets: NutrientTargets) -> NutrientSummaryResponse:
     return NutrientSummaryResponse(
         total_macros=MacroSummary(
             protein_g=nutrients["protein_g"],
@@ -93,12 +131,6 @@ def nutrient_summary(meal_id: int, session: Session = Depends(get_session), curr
             vitamin_c_mg=nutrients["vitamin_c_mg"],
             calcium_mg=nutrients["calcium_mg"]
         ),
-        alerts=Alerts(
-            protein=classify_nutrient(nutrients["protein_g"], 10, 30),
-            carbs=classify_nutrient(nutrients["carbs_g"], 20, 60),
-            fat=classify_nutrient(nutrients["fat_g"], 10, 30),
-            iron=classify_nutrient(nutrients["iron_mg"], 1, 10),
-            vitamin_c=classify_nutrient(nutrients["vitamin_c_mg"], 15, 90),
-            calcium=classify_nutrient(nutrients["calcium_mg"], 200, 1000)
-        )
-    )
\ No newline at end of file
+        alerts=alerts,
+        targets=targets,
+    )
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
@@ -19,6 +20,10 @@ from models.weekly_diet_meals import WeeklyDietMeals
 from models.foods import Food
 from models.ingredients import Ingredient
 from models.ingredient_food import IngredientFood
+from utils.field_selection import (
+    FIELDS_DESCRIPTION, INCLUDE_DESCRIPTION, group_by_key, parse_fields, parse_include,
+    rows_to_dicts, select_fields, sparse_response
+)
 from utils.security import get_current_patient
 
 router_shopping_lists = APIRouter(
@@ -35,17 +40,35 @@ def get_my_shopping_lists(
     session: Session = Depends(get_session),
     current_patient: Patient = Depends(get_current_patient),
     status: Optional[ShoppingListStatus] = Query(None, description="Filtrar por estado"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=f"{INCLUDE_DESCRIPTION}: items"),
 ):
     """Obtener todas las listas de compras del usuario actual"""
-    query = select(ShoppingList).where(ShoppingList.patient_id == current_patient.id)
+    selected = parse_fields(fields, ShoppingListRead)
+    included = parse_include(include, ["items"])
+    if selected is not None or included:
+        selected = selected or list(ShoppingListRead.model_fields)
+        query = select_fields(ShoppingList, selected, required=["id"])
+    else:
+        query = select(ShoppingList)
+
+    query = query.where(ShoppingList.patient_id == current_patient.id)
     
     if status:
         query = query.where(ShoppingList.status == status)
     
     query = query.order_by(ShoppingList.created_at.desc())
-    shopping_lists = session.exec(query).all()
-    
-    return shopping_lists
+    if selected is None:
+        shopping_lists = session.exec(query).all()
+        return shopping_lists
+
+    rows = session.execute(query).all()
+    shopping_lists = rows_to_dicts(rows, selected)
+    if "items" in included:
+        items_by_list = get_items_by_list(session, [row.id for row in rows])
+        for row, shopping_list in zip(rows, shopping_lists):
+            shopping_list["items"] = items_by_list.get(row.id, [])
+    return sparse_response(shopping_lists)
 
 @router_shopping_lists.get("/{list_id}", response_model=ShoppingListReadWithItems)
 def get_shopping_list_with_items(
@@ -53,8 +76,10 @@ def get_shopping_list_with_items(
     session: Session = Depends(get_session),
     current_patient: Patient = Depends(get_current_patient),
     list_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """Obtener una lista de compras específica con todos sus items"""
+    selected = parse_fields(fields, ShoppingListReadWithItems)
     shopping_list = session.get(ShoppingList, list_id)
     
     if not shopping_list:
@@ -63,6 +88,13 @@ def get_shopping_list_with_items(
     if shopping_list.patient_id != current_patient.id:
         raise HTTPException(status_code=403, detail="Not authorized to access this shopping list")
     
+    if selected is not None:
+        # Los items solo se cargan si se piden en ?fields=
+        content = {name: getattr(shopping_list, name) for name in selected if name != "items"}
+        if "items" in selected:
+            content["items"] = get_items_by_list(session, [list_id]).get(list_id, [])
+        return sparse_response(content)
+    
     # Obtener items de la lista
     items = session.exec(
         select(ShoppingListItem)
@@ -337,24 +369,22 @@ def add_items_from_weekly_diet(
         raise HTTPException(status_code=404, detail="No meals found for the specified criteria")
     
     # Generar items basados en los ingredientes de las comidas
-    created_items = []
     ingredient_quantities = {}  # Para agrupar ingredientes similares
-    
+
+    # Ingredientes de todas las comidas de la dieta en una sola consulta
+    ingredients_by_food = {}
+    ingredient_rows = session.exec(
+        select(IngredientFood, Ingredient)
+        .join(Ingredient, Ingredient.id == IngredientFood.ingredient_id)
+        .join(Food, Food.id == IngredientFood.food_id)
+        .where(IngredientFood.food_id.in_({meal.food_id for meal in meals}))
+        .order_by(IngredientFood.id)
+    ).all()
+    for ing_food, ingredient in ingredient_rows:
+        ingredients_by_food.setdefault(ing_food.food_id, []).append((ing_food, ingredient))
+
     for meal in meals:
-        food = session.get(Food, meal.food_id)
-        if not food:
-            continue
-        
-        # Obtener ingredientes de la comida
-        ingredient_foods = session.exec(
-            select(IngredientFood).where(IngredientFood.food_id == meal.food_id)
-        ).all()
-        
-        for ing_food in ingredient_foods:
-            ingredient = session.get(Ingredient, ing_food.ingredient_id)
-            if not ingredient:
-                continue
-            
+        for ing_food, ingredient in ingredients_by_food.get(meal.food_id, []):
             # Agrupar ingredientes por nombre
             ing_key = ingredient.name.lower()
             if ing_key in ingredient_quantities:
@@ -369,6 +399,7 @@ def add_items_from_weekly_diet(
                 }
     
     # Crear items en la lista de compras
+    item_rows = []
     for ing_data in ingredient_quantities.values():
         item = ShoppingListItem(
             name=ing_data['name'],
@@ -381,19 +412,20 @@ def add_items_from_weekly_diet(
             notes=f"Generado desde dieta semanal (semana del {weekly_diet.week_start_date})",
             created_at=datetime.now()
         )
-        
-        session.add(item)
-        created_items.append(item)
+        item_rows.append(item.model_dump(exclude={"id"}))
     
-    if not created_items:
+    if not item_rows:
         raise HTTPException(status_code=400, detail="No ingredients found to add to shopping list")
     
+    # Un solo INSERT ... RETURNING para todos los items en lugar de uno por item
+    created_items = session.scalars(
+        insert(ShoppingListItem).returning(ShoppingListItem), item_rows
+    ).all()
+    # Convertir antes del commit, que expira los objetos y forzaría releerlos uno por uno
+    response = [ShoppingListItemRead.model_validate(item) for item in created_items]
     session.commit()
     
-    for item in created_items:
-        session.refresh(item)
-    
-    return created_items
+    return response
 
 # ===== ENDPOINTS DE ESTADÍSTICAS =====
 
@@ -437,4 +469,16 @@ def get_shopping_list_stats(
         "completion_percentage": round((purchased_items / total_items * 100) if total_items > 0 else 0, 2),
         "items_by_source": items_by_source,
         "last_updated": shopping_list.updated_at
-    }
\ No newline at end of file
+    }
+
+# Función auxiliar para incluir los items de varias listas
+def get_items_by_list(session: Session, list_ids: List[int]):
+    """Items de varias listas en una sola consulta, agrupados por lista"""
+    if not list_ids:
+        return {}
+    items = session.exec(
+        select(ShoppingListItem)
+        .where(ShoppingListItem.shopping_list_id.in_(list_ids))
+        .order_by(ShoppingListItem.created_at.desc())
+    ).all()
+    return group_by_key(items, "shopping_list_id", ShoppingListItemRead)
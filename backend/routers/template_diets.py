@@ -10,11 +10,15 @@ from models.weekly_diet_meals import DayOfWeek, MealOfDay
 from models.foods import Food
 from models.professionals import Professional
 from models.patients import Patient
+from models.notification import NotificationKind
 from utils.notifications import create_notification
-from utils.email_notifications import send_full_diet_email
+from utils.jobs import enqueue_diet_email
 from models.weekly_diets import WeeklyDiets
 from models.weekly_diet_meals import WeeklyDietMeals
 from datetime import date
+from utils.diet_nutrition import summarize_planned_meals
+from utils.diet_adherence import invalidate_diet_adherence
+from schemas.diet_nutrition import DietNutrition
 
 router_template_diets = APIRouter(prefix="/template-diets", tags=["Template Diets"])
 
@@ -90,17 +94,11 @@ def get_template_diets(
     current_professional: Professional = Depends(get_current_professional)
 ):
     """Obtener todas las plantillas de dieta del profesional actual"""
+    # La respuesta (TemplateDiet) no incluye las comidas: se obtienen con /{template_diet_id}/meals
     templates = session.exec(
         select(TemplateDiet).where(TemplateDiet.professional_id == current_professional.id)
     ).all()
     
-    # Para cada plantilla, obtener sus comidas
-    for template in templates:
-        meals = session.exec(
-            select(TemplateDietMeal).where(TemplateDietMeal.template_diet_id == template.id)
-        ).all()
-        template.meals = meals
-    
     return templates
 
 
@@ -149,6 +147,31 @@ def get_meals_from_template(
     return meals
 
 
+# Calorías y macronutrientes planificados de una plantilla
+@router_template_diets.get("/{template_diet_id}/nutrition", response_model=DietNutrition)
+def get_template_nutrition(
+    template_diet_id: int,
+    session: Session = Depends(get_session),
+    current_professional: Professional = Depends(get_current_professional)
+):
+    """Totales por día y de la semana de las comidas de la plantilla"""
+    template = session.exec(
+        select(TemplateDiet).where(
+            TemplateDiet.id == template_diet_id,
+            TemplateDiet.professional_id == current_professional.id
+        )
+    ).first()
+
+    if not template:
+        raise HTTPException(status_code=404, detail="Template diet not found")
+
+    meals = session.exec(
+        select(TemplateDietMeal).where(TemplateDietMeal.template_diet_id == template_diet_id)
+    ).all()
+
+    return summarize_planned_meals(session, meals)
+
+
 # Asignar una plantilla de dieta a un paciente
 @router_template_diets.post("/{template_diet_id}/assign-to-patient")
 def assign_template_to_patient(
@@ -186,6 +209,7 @@ def assign_template_to_patient(
         session.add(new_meal)
 
     session.commit()
+    invalidate_diet_adherence(new_diet.professional_id)
     
     # Notificar al paciente
     patient = session.get(Patient, request.patient_id)
@@ -202,17 +226,15 @@ def assign_template_to_patient(
             "meal_of_the_day": meal.meal_of_the_day.value,
         })
 
-    # Enviar email
-    try:
-        send_full_diet_email(patient.first_name, patient.email, request.week_start_date, meals_by_day)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error sending diet email: {str(e)}")
+    # Encolar el email (se envía en segundo plano, con reintentos si falla)
+    enqueue_diet_email(session, patient, request.week_start_date, meals_by_day)
 
     # Crear notificación interna
     create_notification(
         session=session,
         patient_id=patient.id,
-        message="Se te ha asignado una nueva dieta semanal."
+        message="Se te ha asignado una nueva dieta semanal.",
+        kind=NotificationKind.DIET
     )
     session.commit()
 
@@ -0,0 +1,133 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import Optional
+from datetime import date, timedelta
+
+from config.database import get_session
+from models.goals import GoalType
+from models.patients import Patient
+from schemas.trends import TrendsResponse, TrendSummary, DailyTrendPoint, WeeklyTrendPoint
+from utils.goal_resolver import get_active_goals
+from utils.security import get_current_patient
+
+router_trends = APIRouter(
+    prefix="/patients",
+    tags=["Trends"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Período máximo que se puede analizar en una consulta
+MAX_TREND_DAYS = 3 * 366
+
+
+@router_trends.get("/trends", response_model=TrendsResponse)
+def get_nutrition_trends(
+    *,
+    session: Session = Depends(get_session),
+    current_patient: Patient = Depends(get_current_patient),
+    start_date: Optional[date] = Query(None, description="Fecha de inicio. Por defecto, 12 semanas antes de la fecha de fin"),
+    end_date: Optional[date] = Query(None, description="Fecha de fin. Por defecto, hoy"),
+    include_daily: bool = Query(True, description="Incluir la serie diaria en la respuesta"),
+):
+    """Obtener tendencias de calorías, hidratación y peso del paciente en un período arbitrario"""
+    # numpy (vía utils.analytics) tarda en importarse: se carga en la primera consulta y no al iniciar la API
+    import numpy as np
+    from utils.analytics import (
+        CALORIES_TOLERANCE,
+        load_daily_series,
+        rolling_mean,
+        weekly_means,
+        weekly_slope,
+        adherence_percentage,
+        to_optional,
+    )
+
+    if not end_date:
+        end_date = date.today()
+    if not start_date:
+        start_date = end_date - timedelta(weeks=12) + timedelta(days=1)
+
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin")
+    if (end_date - start_date).days + 1 > MAX_TREND_DAYS:
+        raise HTTPException(status_code=400, detail=f"El período no puede superar los {MAX_TREND_DAYS} días")
+
+    series = load_daily_series(session, current_patient.id, start_date, end_date)
+    calories, water, weight = series["calories"], series["water_ml"], series["weight"]
+
+    # Metas activas de calorías y agua para medir la adherencia
+    active_goals = get_active_goals(session, current_patient.id)
+    calories_goal = active_goals.get(GoalType.CALORIES)
+    water_goal = active_goals.get(GoalType.WATER)
+    target_calories = calories_goal.target_calories if calories_goal else None
+    target_water = water_goal.target_milliliters if water_goal else None
+
+    calories_adherence = None
+    if target_calories:
+        with np.errstate(invalid="ignore"):
+            within_goal = np.abs(calories - target_calories) <= target_calories * CALORIES_TOLERANCE
+        calories_adherence = adherence_percentage(calories, within_goal)
+
+    water_adherence = None
+    if target_water:
+        with np.errstate(invalid="ignore"):
+            within_goal = water >= target_water
+        water_adherence = adherence_percentage(water, within_goal)
+
+    summary = TrendSummary(
+        days_with_meals=int((~np.isnan(calories)).sum()),
+        days_with_water=int((~np.isnan(water)).sum()),
+        days_with_weight=int((~np.isnan(weight)).sum()),
+        calories_slope_per_week=to_optional(weekly_slope(calories)),
+        water_ml_slope_per_week=to_optional(weekly_slope(water)),
+        weight_slope_per_week=to_optional(weekly_slope(weight)),
+        target_calories=target_calories,
+        target_water_ml=target_water,
+        calories_adherence_percentage=calories_adherence,
+        water_adherence_percentage=water_adherence,
+    )
+
+    # ========== SERIE SEMANAL ==========
+    weekly_calories = weekly_means(calories, start_date)
+    weekly_water = weekly_means(water, start_date)
+    weekly_weight = weekly_means(weight, start_date)
+    first_week_start = start_date - timedelta(days=start_date.weekday())
+
+    weekly = []
+    for index in range(len(weekly_calories)):
+        point = WeeklyTrendPoint(
+            week_start_date=first_week_start + timedelta(weeks=index),
+            average_daily_calories=to_optional(weekly_calories[index]),
+            average_daily_water_ml=to_optional(weekly_water[index]),
+            average_weight=to_optional(weekly_weight[index]),
+        )
+        if index > 0:
+            point.calories_delta = to_optional(weekly_calories[index] - weekly_calories[index - 1])
+            point.water_ml_delta = to_optional(weekly_water[index] - weekly_water[index - 1])
+            point.weight_delta = to_optional(weekly_weight[index] - weekly_weight[index - 1])
+        weekly.append(point)
+
+    # ========== SERIE DIARIA ==========
+    daily = []
+    if include_daily:
+        calories_avg = rolling_mean(calories)
+        water_avg = rolling_mean(water)
+        weight_avg = rolling_mean(weight)
+        for offset in range(len(calories)):
+            daily.append(DailyTrendPoint(
+                date=start_date + timedelta(days=offset),
+                calories=to_optional(calories[offset]),
+                water_ml=to_optional(water[offset]),
+                weight=to_optional(weight[offset]),
+                calories_7d_avg=to_optional(calories_avg[offset]),
+                water_ml_7d_avg=to_optional(water_avg[offset]),
+                weight_7d_avg=to_optional(weight_avg[offset]),
+            ))
+
+    return TrendsResponse(
+        start_date=start_date,
+        end_date=end_date,
+        summary=summary,
+        weekly=weekly,
+        daily=daily,
+    )
@@ -7,6 +7,7 @@ from datetime import datetime
 
 from config.database import get_session
 from models.water_reminders import WaterReminder, WaterReminderCreate, WaterReminderRead, WaterReminderUpdate
+from models.notification import NotificationKind
 from utils.notifications import create_notification
 from utils.security import get_current_patient
 
@@ -130,7 +131,7 @@ def send_water_reminder_now(
     
     message = reminder.custom_message or "💧 ¡Recuerda beber agua! Tu cuerpo te lo agradecerá."
     
-    create_notification(session, current_patient.id, message)
+    create_notification(session, current_patient.id, message, NotificationKind.WATER_REMINDER)
     session.commit()
     
     return {"message": "Recordatorio enviado exitosamente"}
@@ -173,7 +174,7 @@ def send_scheduled_water_reminders():
             if should_send_reminder(reminder, current_time):
                 try:
                     message = reminder.custom_message or "💧 ¡Recuerda beber agua! Tu cuerpo te lo agradecerá."
-                    create_notification(session, reminder.patient_id, message)
+                    create_notification(session, reminder.patient_id, message, NotificationKind.WATER_REMINDER)
                     notifications_sent += 1
                 except Exception as e:
                     logging.error(f"Error enviando recordatorio para paciente {reminder.patient_id}: {e}")
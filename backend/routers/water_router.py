@@ -5,10 +5,13 @@ from datetime import date, datetime, timezone, timedelta
 
 from config.database import get_session
 from models.water_intake import WaterIntake, WaterIntakeCreate, WaterIntakeRead, WaterIntakeUpdate
-from models.goals import Goal, GoalType, GoalStatus
+from models.goals import GoalType
 from models.patients import Patient
 from utils.security import get_current_patient, get_current_professional
+from models.notification import NotificationKind
+from utils.goal_resolver import get_active_goal
 from utils.notifications import create_notification
+from utils.water_totals import get_daily_water_total, mark_goal_notified
 
 
 router_water = APIRouter(
@@ -33,11 +36,13 @@ def create_water_intake(
     # Crear la nueva ingesta
     db_water_intake = WaterIntake(**water_intake.model_dump())
     session.add(db_water_intake)
-    session.commit()
-    session.refresh(db_water_intake)
+    # El flush actualiza el total del día (utils.water_totals), que se usa para verificar la meta
+    session.flush()
     
     # Verificar si se alcanzó la meta diaria de agua
     check_daily_water_goal(session, current_patient.id, water_intake.intake_time.date())
+    session.commit()
+    session.refresh(db_water_intake)
     
     return db_water_intake
 
@@ -79,60 +84,7 @@ def get_daily_water_summary(
     if not target_date:
         target_date = date.today()
     
-    # Obtener todas las ingestas del día
-    daily_intakes = session.exec(
-        select(WaterIntake)
-        .where(
-            WaterIntake.patient_id == current_patient.id,
-            func.date(WaterIntake.intake_time) == target_date
-        )
-        .order_by(WaterIntake.intake_time)
-    ).all()
-    
-    total_ml = sum(intake.amount_ml for intake in daily_intakes)
-    total_glasses = round(total_ml / 250, 1)  # Asumiendo 250ml por vaso
-    
-    # Obtener meta de agua activa
-    water_goal = session.exec(
-        select(Goal)
-        .where(
-            Goal.patient_id == current_patient.id,
-            Goal.goal_type == GoalType.WATER,
-            Goal.status == GoalStatus.ACTIVE
-        )
-        .order_by(Goal.created_at.desc())
-        .limit(1)
-    ).first()
-    
-    goal_ml = water_goal.target_milliliters if water_goal else 2000  # Meta por defecto: 2L
-    goal_glasses = round(goal_ml / 250, 1)
-    
-    progress_percentage = min(round((total_ml / goal_ml) * 100, 1), 100) if goal_ml > 0 else 0
-    remaining_ml = max(goal_ml - total_ml, 0)
-    remaining_glasses = round(remaining_ml / 250, 1)
-    
-    return {
-        "date": target_date,
-        "total_consumed_ml": total_ml,
-        "total_consumed_glasses": total_glasses,
-        "goal_ml": goal_ml,
-        "goal_glasses": goal_glasses,
-        "progress_percentage": progress_percentage,
-        "remaining_ml": remaining_ml,
-        "remaining_glasses": remaining_glasses,
-        "is_goal_achieved": total_ml >= goal_ml,
-        "intakes_count": len(daily_intakes),
-        "intakes": [
-            {
-                "id": intake.id,
-                "amount_ml": intake.amount_ml,
-                "amount_glasses": round(intake.amount_ml / 250, 1),
-                "time": intake.intake_time.strftime("%H:%M"),
-                "notes": intake.notes
-            }
-            for intake in daily_intakes
-        ]
-    }
+    return build_daily_water_summary(session, current_patient.id, target_date)
 
 
 @router_water.get("/weekly-summary")
@@ -173,16 +125,7 @@ def get_weekly_water_summary(
             daily_totals[intake_date] += intake.amount_ml
     
     # Obtener meta de agua activa
-    water_goal = session.exec(
-        select(Goal)
-        .where(
-            Goal.patient_id == current_patient.id,
-            Goal.goal_type == GoalType.WATER,
-            Goal.status == GoalStatus.ACTIVE
-        )
-        .order_by(Goal.created_at.desc())
-        .limit(1)
-    ).first()
+    water_goal = get_active_goal(session, current_patient.id, GoalType.WATER)
     
     goal_ml = water_goal.target_milliliters if water_goal else 2000
     
@@ -336,16 +279,7 @@ def get_patient_daily_water_summary(
     total_ml = sum(intake.amount_ml for intake in daily_intakes)
     
     # Obtener meta de agua activa
-    water_goal = session.exec(
-        select(Goal)
-        .where(
-            Goal.patient_id == patient_id,
-            Goal.goal_type == GoalType.WATER,
-            Goal.status == GoalStatus.ACTIVE
-        )
-        .order_by(Goal.created_at.desc())
-        .limit(1)
-    ).first()
+    water_goal = get_active_goal(session, patient_id, GoalType.WATER)
     
     goal_ml = water_goal.target_milliliters if water_goal else 2000
     progress_percentage = min(round((total_ml / goal_ml) * 100, 1), 100) if goal_ml > 0 else 0
@@ -363,35 +297,72 @@ def get_patient_daily_water_summary(
     }
 
 
+# Función auxiliar para el resumen diario (también la usa el dashboard del paciente)
+def build_daily_water_summary(session: Session, patient_id: int, target_date: date) -> dict:
+    """Resumen de consumo de agua del día con el progreso respecto de la meta activa"""
+    # Obtener todas las ingestas del día
+    daily_intakes = session.exec(
+        select(WaterIntake)
+        .where(
+            WaterIntake.patient_id == patient_id,
+            func.date(WaterIntake.intake_time) == target_date
+        )
+        .order_by(WaterIntake.intake_time)
+    ).all()
+    
+    total_ml = sum(intake.amount_ml for intake in daily_intakes)
+    total_glasses = round(total_ml / 250, 1)  # Asumiendo 250ml por vaso
+    
+    # Obtener meta de agua activa
+    water_goal = get_active_goal(session, patient_id, GoalType.WATER)
+    
+    goal_ml = water_goal.target_milliliters if water_goal else 2000  # Meta por defecto: 2L
+    goal_glasses = round(goal_ml / 250, 1)
+    
+    progress_percentage = min(round((total_ml / goal_ml) * 100, 1), 100) if goal_ml > 0 else 0
+    remaining_ml = max(goal_ml - total_ml, 0)
+    remaining_glasses = round(remaining_ml / 250, 1)
+    
+    return {
+        "date": target_date,
+        "total_consumed_ml": total_ml,
+        "total_consumed_glasses": total_glasses,
+        "goal_ml": goal_ml,
+        "goal_glasses": goal_glasses,
+        "progress_percentage": progress_percentage,
+        "remaining_ml": remaining_ml,
+        "remaining_glasses": remaining_glasses,
+        "is_goal_achieved": total_ml >= goal_ml,
+        "intakes_count": len(daily_intakes),
+        "intakes": [
+            {
+                "id": intake.id,
+                "amount_ml": intake.amount_ml,
+                "amount_glasses": round(intake.amount_ml / 250, 1),
+                "time": intake.intake_time.strftime("%H:%M"),
+                "notes": intake.notes
+            }
+            for intake in daily_intakes
+        ]
+    }
+
+
 # Función auxiliar para verificar metas diarias
 def check_daily_water_goal(session: Session, patient_id: int, target_date: date):
-    """Verificar si se alcanzó la meta diaria de agua y crear notificación"""
+    """Verificar si se alcanzó la meta diaria de agua y crear la notificación una sola vez por día.
+    Usa el total del día mantenido al registrar ingestas; el commit queda a cargo de quien llama."""
+    daily_total, goal_notified = get_daily_water_total(session, patient_id, target_date)
+    if goal_notified:
+        # La meta de este día ya se notificó: no hace falta buscar la meta ni sumar
+        return
+
     # Obtener meta de agua activa
-    water_goal = session.exec(
-        select(Goal)
-        .where(
-            Goal.patient_id == patient_id,
-            Goal.goal_type == GoalType.WATER,
-            Goal.status == GoalStatus.ACTIVE
-        )
-        .order_by(Goal.created_at.desc())
-        .limit(1)
-    ).first()
+    water_goal = get_active_goal(session, patient_id, GoalType.WATER)
     
     if not water_goal:
         return
     
-    # Calcular total del día
-    daily_total = session.exec(
-        select(func.sum(WaterIntake.amount_ml))
-        .where(
-            WaterIntake.patient_id == patient_id,
-            func.date(WaterIntake.intake_time) == target_date
-        )
-    ).first() or 0
-    
-    # Si se alcanzó la meta, crear notificación
-    if daily_total >= water_goal.target_milliliters:
+    # Si se alcanzó la meta, crear notificación (solo la petición que marca el día la crea)
+    if daily_total >= water_goal.target_milliliters and mark_goal_notified(session, patient_id, target_date):
         message = f"💧 ¡Excelente! Alcanzaste tu meta diaria de hidratación: {water_goal.target_milliliters}ml"
-        create_notification(session, patient_id, message)
-        session.commit()
\ No newline at end of file
+        create_notification(session, patient_id, message, NotificationKind.WATER_GOAL)
@@ -1,20 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlmodel import Session, select
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 
 from config.database import get_session 
 from models.weekly_diets import WeeklyDiets
 from models.weekly_diet_meals import WeeklyDietMeals, DayOfWeek, MealOfDay
 from models.foods import Food
-from models.meals import Meal, MealCreate
+from models.meals import Meal, MealCreate, MealRead
 from models.patients import Patient
-from utils.calories import calculate_meal_calories
-from utils.email_notifications import send_full_diet_email
+from models.professionals import Professional
+from schemas.diet_adherence import DietAdherenceResponse
+from utils.food_profiles import get_food_profiles
+from utils.diet_nutrition import summarize_planned_meals
+from schemas.diet_nutrition import DietNutrition
+from utils.jobs import enqueue_diet_email
+from models.notification import NotificationKind
 from utils.notifications import create_notification
+from utils.weekly_summary_cache import invalidate_weekly_summaries
+from utils.diet_adherence import get_diet_adherence, invalidate_diet_adherence
+from utils.security import get_current_professional
 
 router_weekly_diets = APIRouter(prefix="/weekly-diets", tags=["Weekly Diets"])
 
+# Hora con la que se registra cada momento del día al completar un día entero de la dieta
+MEAL_SLOT_TIMES = {
+    MealOfDay.breakfast: time(8),
+    MealOfDay.lunch: time(13),
+    MealOfDay.snack: time(17),
+    MealOfDay.dinner: time(21),
+}
+
 # Crear dieta semanal
 @router_weekly_diets.post("/", response_model=WeeklyDiets)
 def create_weekly_diet(
@@ -78,6 +95,7 @@ def add_meal_to_weekly_diet(
 
     session.add(meal)
     session.commit()
+    invalidate_diet_adherence(diet.professional_id)
     session.refresh(meal)
     return meal
 
@@ -122,6 +140,20 @@ def get_professional_weekly_diets(
     
     return weekly_diets
 
+# Cumplimiento de las dietas de todos los pacientes del profesional actual
+@router_weekly_diets.get("/adherence", response_model=DietAdherenceResponse)
+def get_professional_diet_adherence(
+    start_week: Optional[date] = Query(None, description="Incluir dietas desde esta semana (YYYY-MM-DD)"),
+    end_week: Optional[date] = Query(None, description="Incluir dietas hasta esta semana (YYYY-MM-DD)"),
+    session: Session = Depends(get_session),
+    current_professional: Professional = Depends(get_current_professional)
+):
+    """Porcentaje de comidas completadas por paciente, semana, día y momento del día"""
+    if start_week and end_week and start_week > end_week:
+        raise HTTPException(status_code=400, detail="start_week must be before end_week")
+
+    return get_diet_adherence(session, current_professional.id, start_week, end_week)
+
 #Para ver las comidas de la dieta semanal específica, con opción de pedirle completadas en true o false
 @router_weekly_diets.get("/{weekly_diet_id}/meals")
 def get_weekly_diet_meals_with_status(
@@ -143,6 +175,24 @@ def get_weekly_diet_meals_with_status(
 
     return meals
 
+# Calorías y macronutrientes planificados de la dieta, por día y de la semana
+@router_weekly_diets.get("/{weekly_diet_id}/nutrition", response_model=DietNutrition)
+def get_weekly_diet_nutrition(
+    weekly_diet_id: int,
+    session: Session = Depends(get_session),
+    current_professional: Professional = Depends(get_current_professional)
+):
+    """Totales por día y de la semana de las comidas de una dieta creada por el profesional actual"""
+    weekly_diet = session.get(WeeklyDiets, weekly_diet_id)
+    if not weekly_diet or weekly_diet.professional_id != current_professional.id:
+        raise HTTPException(status_code=404, detail="Weekly diet not found")
+
+    meals = session.exec(
+        select(WeeklyDietMeals).where(WeeklyDietMeals.weekly_diet_id == weekly_diet_id)
+    ).all()
+
+    return summarize_planned_meals(session, meals)
+
 # Borrar una comida específica de una dieta semanal
 @router_weekly_diets.delete("/{weekly_diet_id}/meals/{meal_id}", status_code=204)
 def delete_meal_from_weekly_diet(
@@ -154,8 +204,10 @@ def delete_meal_from_weekly_diet(
     if not meal or meal.weekly_diet_id != weekly_diet_id:
         raise HTTPException(status_code=404, detail="Meal not found in the specified weekly diet")
 
+    diet = session.get(WeeklyDiets, weekly_diet_id)
     session.delete(meal)
     session.commit()
+    invalidate_diet_adherence(diet.professional_id)
     return  
 
 # Borrar una dieta semanal completa
@@ -174,6 +226,7 @@ def delete_weekly_diet(
 
     session.delete(diet)
     session.commit()
+    invalidate_diet_adherence(diet.professional_id)
     return
 
 # Marcar una comida como completada y agregarla a las meals del paciente
@@ -185,64 +238,78 @@ def complete_weekly_diet_meal(
     timestamp: datetime = Query(default_factory=datetime.now),
     session: Session = Depends(get_session)
 ):
-    # Verificar que existe la comida en la dieta semanal
-    weekly_meal = session.get(WeeklyDietMeals, meal_id)
-    if not weekly_meal or weekly_meal.weekly_diet_id != weekly_diet_id:
+    # Comida y dieta en una sola consulta. La comida queda bloqueada hasta el commit para que
+    # dos pedidos simultáneos no la registren dos veces
+    row = session.exec(
+        select(WeeklyDietMeals, WeeklyDiets)
+        .join(WeeklyDiets, WeeklyDiets.id == WeeklyDietMeals.weekly_diet_id)
+        .where(WeeklyDietMeals.id == meal_id, WeeklyDietMeals.weekly_diet_id == weekly_diet_id)
+        .with_for_update(of=WeeklyDietMeals)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Meal not found in the specified weekly diet")
+    weekly_meal, weekly_diet = row
 
     # Verificar si ya está completada
     if weekly_meal.completed:
         raise HTTPException(status_code=400, detail="Meal is already marked as completed")
 
-    # Verificar que la dieta semanal existe y obtener el patient_id
-    weekly_diet = session.get(WeeklyDiets, weekly_diet_id)
-    if not weekly_diet:
-        raise HTTPException(status_code=404, detail="Weekly diet not found")
+    new_meal = complete_planned_meals(session, weekly_diet, [weekly_meal], grams, [timestamp])[0]
 
-    # Obtener información del food para calcular calorías
-    food = session.get(Food, weekly_meal.food_id)
-    if not food:
-        raise HTTPException(status_code=404, detail="Food not found")
-
-    # Calcular calorías basado en los gramos usando la función existente
-    calories = calculate_meal_calories(
-        session=session,
-        food_id=weekly_meal.food_id,
-        meal_grams=grams
-    )
+    # Armar la respuesta antes del commit, que expira los objetos y forzaría releerlos
+    response = {"message": "Meal completed successfully", "meal": MealRead.model_validate(new_meal).model_dump(), "weekly_meal": weekly_meal.model_dump()}
+    patient_id, professional_id = weekly_diet.patient_id, weekly_diet.professional_id
+    session.commit()
+    invalidate_weekly_summaries(patient_id, timestamp)
+    invalidate_diet_adherence(professional_id)
 
-    try:
-        # Validar datos usando MealCreate
-        meal_data = MealCreate(
-            meal_name=weekly_meal.meal_name,
-            grams=grams,
-            meal_of_the_day=weekly_meal.meal_of_the_day.value,
-            timestamp=timestamp
-        )
+    return response
 
-        # Crear nueva meal en la tabla meals usando los datos validados
-        new_meal = Meal(
-            meal_name=meal_data.meal_name,
-            grams=meal_data.grams,
-            meal_of_the_day=meal_data.meal_of_the_day,
-            timestamp=meal_data.timestamp,
-            food_id=weekly_meal.food_id,
-            patient_id=weekly_diet.patient_id,
-            calories=calories
+# Completar de una vez todas las comidas pendientes de un día de la dieta
+@router_weekly_diets.patch("/{weekly_diet_id}/days/{day_of_week}/complete")
+def complete_weekly_diet_day(
+    weekly_diet_id: int,
+    day_of_week: DayOfWeek,
+    grams: float = Query(..., description="Gramos consumidos de cada comida (el mismo valor para todas)"),
+    meal_date: Optional[date] = Query(None, description="Fecha de consumo (por defecto, la de ese día en la semana de la dieta)"),
+    session: Session = Depends(get_session)
+):
+    """Registra todas las comidas pendientes del día con los mismos gramos. Cada comida se
+    registra a la hora de su momento del día (MEAL_SLOT_TIMES), no todas en el mismo instante."""
+    rows = session.exec(
+        select(WeeklyDietMeals, WeeklyDiets)
+        .join(WeeklyDiets, WeeklyDiets.id == WeeklyDietMeals.weekly_diet_id)
+        .where(
+            WeeklyDietMeals.weekly_diet_id == weekly_diet_id,
+            WeeklyDietMeals.day_of_week == day_of_week,
+            WeeklyDietMeals.completed == False,
         )
+        .order_by(WeeklyDietMeals.id)
+        .with_for_update(of=WeeklyDietMeals)
+    ).all()
+    if not rows:
+        if not session.get(WeeklyDiets, weekly_diet_id):
+            raise HTTPException(status_code=404, detail="Weekly diet not found")
+        raise HTTPException(status_code=400, detail="No pending meals for that day")
+
+    weekly_diet = rows[0][1]
+    weekly_meals = [weekly_meal for weekly_meal, _ in rows]
+    if meal_date is None:
+        meal_date = weekly_diet.week_start_date + timedelta(days=list(DayOfWeek).index(day_of_week))
+    timestamps = [datetime.combine(meal_date, MEAL_SLOT_TIMES[weekly_meal.meal_of_the_day]) for weekly_meal in weekly_meals]
+    new_meals = complete_planned_meals(session, weekly_diet, weekly_meals, grams, timestamps)
+
+    response = {
+        "message": f"{len(new_meals)} meals completed successfully",
+        "meals": [MealRead.model_validate(meal).model_dump() for meal in new_meals],
+        "weekly_meals": [weekly_meal.model_dump() for weekly_meal in weekly_meals],
+    }
+    patient_id, professional_id = weekly_diet.patient_id, weekly_diet.professional_id
+    session.commit()
+    invalidate_weekly_summaries(patient_id, meal_date)
+    invalidate_diet_adherence(professional_id)
 
-        # Marcar la comida de la dieta semanal como completada
-        weekly_meal.completed = True
-
-        session.add(new_meal)
-        session.commit()
-        session.refresh(new_meal)
-        session.refresh(weekly_meal)
-
-        return {"message": "Meal completed successfully", "meal": new_meal, "weekly_meal": weekly_meal}
-
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return response
 
 # Endpoint para desmarcar una comida como completada y eliminar el registro de meals
 @router_weekly_diets.patch("/{weekly_diet_id}/meals/{meal_id}/uncomplete")
@@ -251,20 +318,21 @@ def uncomplete_weekly_diet_meal(
     meal_id: int,
     session: Session = Depends(get_session)
 ):
-    # Verificar que existe la comida en la dieta semanal
-    weekly_meal = session.get(WeeklyDietMeals, meal_id)
-    if not weekly_meal or weekly_meal.weekly_diet_id != weekly_diet_id:
+    # Comida y dieta en una sola consulta, bloqueando la comida hasta el commit
+    row = session.exec(
+        select(WeeklyDietMeals, WeeklyDiets)
+        .join(WeeklyDiets, WeeklyDiets.id == WeeklyDietMeals.weekly_diet_id)
+        .where(WeeklyDietMeals.id == meal_id, WeeklyDietMeals.weekly_diet_id == weekly_diet_id)
+        .with_for_update(of=WeeklyDietMeals)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Meal not found in the specified weekly diet")
+    weekly_meal, weekly_diet = row
     
     # Verificar que la comida está marcada como completada
     if not weekly_meal.completed:
         raise HTTPException(status_code=400, detail="Meal is not marked as completed")
     
-    # Verificar que la dieta semanal existe y obtener el patient_id
-    weekly_diet = session.get(WeeklyDiets, weekly_diet_id)
-    if not weekly_diet:
-        raise HTTPException(status_code=404, detail="Weekly diet not found")
-    
     # Buscar y eliminar el registro correspondiente en la tabla meals
     # Buscamos por los campos que relacionan ambas tablas
     meal_to_delete = session.exec(
@@ -276,23 +344,30 @@ def uncomplete_weekly_diet_meal(
         ).order_by(Meal.timestamp.desc())  # Obtener el más reciente
     ).first()
     
+    deleted_meal_id = None
+    deleted_meal_timestamp = None
     if meal_to_delete:
+        deleted_meal_id = meal_to_delete.id
+        deleted_meal_timestamp = meal_to_delete.timestamp
         session.delete(meal_to_delete)
     
     # Marcar la comida de la dieta semanal como no completada
     weekly_meal.completed = False
-    
-    session.commit()
-    session.refresh(weekly_meal)
-    
-    return {
+
+    response = {
         "message": "Meal unmarked as completed successfully", 
-        "weekly_meal": weekly_meal,
-        "deleted_meal_id": meal_to_delete.id if meal_to_delete else None
+        "weekly_meal": weekly_meal.model_dump(),
+        "deleted_meal_id": deleted_meal_id
     }
+    patient_id, professional_id = weekly_diet.patient_id, weekly_diet.professional_id
+    session.commit()
+    invalidate_weekly_summaries(patient_id, deleted_meal_timestamp)
+    invalidate_diet_adherence(professional_id)
+    
+    return response
 
 # Endpoint para enviar un email de notificación al paciente
-@router_weekly_diets.post("/{weekly_diet_id}/send-diet-email")
+@router_weekly_diets.post("/{weekly_diet_id}/send-diet-email", status_code=202)
 def send_full_diet_email_to_patient(
     weekly_diet_id: int,
     session: Session = Depends(get_session)
@@ -324,18 +399,63 @@ def send_full_diet_email_to_patient(
             "meal_of_the_day": meal.meal_of_the_day.value,
         })
 
-    # Enviar el email de notificación
-    try:
-        send_full_diet_email(patient.first_name, patient.email, weekly_diet.week_start_date, meals_by_day)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error sending diet email: {str(e)}")
+    # El email se envía en segundo plano (utils.jobs), con reintentos si falla
+    job = enqueue_diet_email(session, patient, weekly_diet.week_start_date, meals_by_day)
     
     # Crear una notificación para el paciente
     create_notification(
         session=session,
         patient_id=patient.id,
-        message="Se te ha asignado una nueva dieta semanal."
+        message="Se te ha asignado una nueva dieta semanal.",
+        kind=NotificationKind.DIET
     )
     session.commit()
     
-    return {"message": "Diet email sent successfully to the patient", "patient_email": patient.email}
\ No newline at end of file
+    return {"message": "Diet email queued for delivery to the patient", "patient_email": patient.email, "job_id": job.id}
+
+
+# Función auxiliar para registrar como consumidas comidas de la dieta (sin commit)
+def complete_planned_meals(
+    session: Session,
+    weekly_diet: WeeklyDiets,
+    weekly_meals: List[WeeklyDietMeals],
+    grams: float,
+    timestamps: List[datetime]
+) -> List[Meal]:
+    """Crea las meals del paciente (una por comida, con su timestamp) y marca las comidas como completadas.
+    Las calorías salen de los perfiles por gramo (en caché) en lugar de recorrer los ingredientes."""
+    profiles = get_food_profiles(session, {weekly_meal.food_id for weekly_meal in weekly_meals})
+
+    meal_rows = []
+    for weekly_meal, timestamp in zip(weekly_meals, timestamps):
+        profile = profiles.get(weekly_meal.food_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="La comida existe pero no tiene ingredientes asociados.")
+        if profile["total_grams"] == 0:
+            raise HTTPException(status_code=400, detail="El total de gramos de los ingredientes no puede ser cero.")
+
+        try:
+            # Validar datos usando MealCreate
+            meal_data = MealCreate(
+                meal_name=weekly_meal.meal_name,
+                grams=grams,
+                meal_of_the_day=weekly_meal.meal_of_the_day.value,
+                timestamp=timestamp
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        meal_rows.append({
+            "meal_name": meal_data.meal_name,
+            "grams": meal_data.grams,
+            "meal_of_the_day": meal_data.meal_of_the_day,
+            "timestamp": meal_data.timestamp,
+            "food_id": weekly_meal.food_id,
+            "patient_id": weekly_diet.patient_id,
+            "calories": profile["calories_kcal"] * meal_data.grams,
+        })
+        weekly_meal.completed = True
+
+    # Un solo INSERT ... RETURNING para todas las comidas, en el orden de weekly_meals (la respuesta
+    # las empareja por posición); el UPDATE de completed sale en el commit
+    return session.scalars(insert(Meal).returning(Meal, sort_by_parameter_order=True), meal_rows).all()
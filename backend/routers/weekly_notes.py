@@ -6,6 +6,7 @@ from config.database import get_session
 from models.weekly_notes import WeeklyNote, WeeklyNoteCreate, WeeklyNoteRead
 from utils.security import get_current_patient
 from utils.security import get_current_user_universal
+from utils.weekly_summary_cache import invalidate_weekly_note_summaries
 
 router_weekly_notes = APIRouter(
     prefix="/patients",
@@ -47,6 +48,7 @@ def create_or_update_weekly_note(
         session.add(existing_note)
         session.commit()
         session.refresh(existing_note)
+        invalidate_weekly_note_summaries(patient_id, existing_note.week_start_date)
         return existing_note
     else:
         db_note = WeeklyNote(
@@ -56,6 +58,7 @@ def create_or_update_weekly_note(
         session.add(db_note)
         session.commit()
         session.refresh(db_note)
+        invalidate_weekly_note_summaries(patient_id, db_note.week_start_date)
         return db_note
 
 
@@ -107,5 +110,6 @@ def delete_weekly_note(
     
     session.delete(note)
     session.commit()
+    invalidate_weekly_note_summaries(current_patient.id, week_start_date)
     
     return {"message": "Notas eliminadas exitosamente"}
\ No newline at end of file
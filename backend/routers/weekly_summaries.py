@@ -17,6 +17,7 @@ from schemas.weekly_summary import (
     MealTrends
 )
 from utils.security import get_current_patient
+from utils.weekly_summary_cache import get_cached_weekly_summary, cache_weekly_summary
 
 router_weekly_summaries = APIRouter(
     prefix="/patients",
@@ -54,6 +55,15 @@ def get_weekly_summary(
     if not end_date:
         end_date = get_week_end_date(start_date)
     
+    # Para las notas, seguimos usando la semana actual si no se especifica un período
+    week_start_for_notes = start_date if start_date == get_week_start_date(start_date) else get_week_start_date(date.today())
+    
+    # Los resúmenes ya calculados se reutilizan hasta que se registre una comida,
+    # un peso o una nota dentro del período
+    cached_summary = get_cached_weekly_summary(current_patient.id, start_date, end_date, week_start_for_notes)
+    if cached_summary is not None:
+        return cached_summary
+    
     # Convertir a datetime para las consultas
     start_datetime = datetime.combine(start_date, datetime.min.time())
     end_datetime = datetime.combine(end_date, datetime.max.time())
@@ -153,8 +163,6 @@ def get_weekly_summary(
     )
     
     # ========== NOTAS SEMANALES ==========
-    # Para las notas, seguimos usando la semana actual si no se especifica un período
-    week_start_for_notes = start_date if start_date == get_week_start_date(start_date) else get_week_start_date(date.today())
     weekly_note = session.exec(
         select(WeeklyNote).where(
             WeeklyNote.patient_id == current_patient.id,
@@ -164,7 +172,7 @@ def get_weekly_summary(
     
     notes = weekly_note.notes if weekly_note else None
     
-    return WeeklySummaryResponse(
+    summary = WeeklySummaryResponse(
         week_start_date=start_date,
         week_end_date=end_date,
         weight_data=weight_data,
@@ -172,6 +180,9 @@ def get_weekly_summary(
         meal_trends=meal_trends,
         notes=notes
     )
+    cache_weekly_summary(current_patient.id, start_date, end_date, week_start_for_notes, summary)
+    
+    return summary
 
 
 @router_weekly_summaries.get("/weekly-summary/history", response_model=WeeklySummaryHistoryResponse)
@@ -7,6 +7,7 @@ from config.database import get_session
 from models.weight_logs import WeightLog, WeightLogCreate, WeightLogRead
 from models.patients import Patient
 from utils.security import get_current_patient
+from utils.weekly_summary_cache import invalidate_weekly_summaries
 
 router_weight_logs = APIRouter(
     prefix="/patients",
@@ -33,6 +34,7 @@ def create_weight_log(
     session.add(current_patient)
     session.commit()
     session.refresh(db_weight_log)
+    invalidate_weekly_summaries(current_patient.id, db_weight_log.timestamp)
     
     return db_weight_log
 
@@ -0,0 +1,17 @@
+from typing import List, Optional
+from datetime import date
+from pydantic import BaseModel
+
+from models.meals import MealRead
+from models.nutrient_summary import NutrientSummaryResponse
+from schemas.goal_progress import GoalProgress
+
+
+class PatientDashboard(BaseModel):
+    """Datos de la pantalla de inicio del paciente en una sola respuesta"""
+    date: date
+    water: dict  # mismo formato que /water/daily-summary
+    nutrients: Optional[NutrientSummaryResponse] = None  # None si no hay comidas con ingredientes en el día
+    goals: List[GoalProgress]  # mismo formato que /goals/my-goals/progress
+    unread_notifications: int
+    meals: List[MealRead]  # comidas del día
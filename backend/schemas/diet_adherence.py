@@ -0,0 +1,37 @@
+from typing import List
+from datetime import date
+from pydantic import BaseModel
+
+from models.weekly_diet_meals import DayOfWeek, MealOfDay
+
+
+class AdherenceRate(BaseModel):
+    planned_meals: int
+    completed_meals: int
+    completion_rate: float  # porcentaje de comidas completadas (0-100)
+
+
+class PatientAdherence(AdherenceRate):
+    patient_id: int
+
+
+class WeekAdherence(AdherenceRate):
+    patient_id: int
+    week_start_date: date
+
+
+class DayAdherence(AdherenceRate):
+    day_of_week: DayOfWeek
+
+
+class MealSlotAdherence(AdherenceRate):
+    meal_of_the_day: MealOfDay
+
+
+class DietAdherenceResponse(BaseModel):
+    """Cumplimiento de las dietas semanales de todos los pacientes de un profesional"""
+    overall: AdherenceRate
+    patients: List[PatientAdherence]
+    weeks: List[WeekAdherence]  # por paciente y semana
+    days: List[DayAdherence]  # de lunes a domingo, sumando todas las semanas
+    meal_slots: List[MealSlotAdherence]  # desayuno, almuerzo, merienda y cena
@@ -0,0 +1,24 @@
+from typing import List
+from pydantic import BaseModel
+
+from models.weekly_diet_meals import DayOfWeek
+
+
+class NutritionTotals(BaseModel):
+    calories_kcal: float = 0.0
+    protein_g: float = 0.0
+    carbs_g: float = 0.0
+    fat_g: float = 0.0
+
+
+class DayNutrition(NutritionTotals):
+    day_of_week: DayOfWeek
+    meals_count: int = 0
+
+
+class DietNutrition(BaseModel):
+    """Calorías y macronutrientes planificados de una dieta (semanal o plantilla)"""
+    days: List[DayNutrition]  # los 7 días, de lunes a domingo
+    week: NutritionTotals
+    average_daily_calories: float  # promedio de los días con comidas
+    meals_without_ingredients: int  # comidas cuya receta no tiene ingredientes (no suman)
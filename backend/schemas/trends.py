@@ -0,0 +1,44 @@
+from typing import Optional, List
+from datetime import date
+from pydantic import BaseModel
+
+
+class DailyTrendPoint(BaseModel):
+    date: date
+    calories: Optional[float] = None
+    water_ml: Optional[float] = None
+    weight: Optional[float] = None
+    calories_7d_avg: Optional[float] = None
+    water_ml_7d_avg: Optional[float] = None
+    weight_7d_avg: Optional[float] = None
+
+
+class WeeklyTrendPoint(BaseModel):
+    week_start_date: date
+    average_daily_calories: Optional[float] = None
+    average_daily_water_ml: Optional[float] = None
+    average_weight: Optional[float] = None
+    calories_delta: Optional[float] = None  # diferencia con la semana anterior
+    water_ml_delta: Optional[float] = None
+    weight_delta: Optional[float] = None
+
+
+class TrendSummary(BaseModel):
+    days_with_meals: int
+    days_with_water: int
+    days_with_weight: int
+    calories_slope_per_week: Optional[float] = None  # pendiente de la recta de tendencia
+    water_ml_slope_per_week: Optional[float] = None
+    weight_slope_per_week: Optional[float] = None
+    target_calories: Optional[int] = None
+    target_water_ml: Optional[int] = None
+    calories_adherence_percentage: Optional[float] = None  # días registrados dentro de la meta
+    water_adherence_percentage: Optional[float] = None
+
+
+class TrendsResponse(BaseModel):
+    start_date: date
+    end_date: date
+    summary: TrendSummary
+    weekly: List[WeeklyTrendPoint] = []
+    daily: List[DailyTrendPoint] = []
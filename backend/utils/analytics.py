@@ -0,0 +1,108 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+from sqlmodel import Session, select, func
+from sqlalchemy import literal, union_all
+
+from models.meals import Meal
+from models.water_intake import WaterIntake
+from models.weight_logs import WeightLog
+
+# Series diarias que se analizan
+METRICS = ["calories", "water_ml", "weight"]
+
+# Tolerancia para considerar un día dentro de la meta de calorías (igual que el progreso de objetivos)
+CALORIES_TOLERANCE = 0.10
+
+
+def load_daily_series(session: Session, patient_id: int, start_date: date, end_date: date) -> Dict[str, np.ndarray]:
+    """Obtiene en una sola consulta los totales diarios del paciente y los devuelve como arreglos
+    de un valor por día del período (NaN en los días sin registros)."""
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    meals_by_day = (
+        select(func.date(Meal.timestamp).label("day"), literal("calories").label("metric"), func.sum(Meal.calories).label("value"))
+        .where(Meal.patient_id == patient_id, Meal.timestamp >= start, Meal.timestamp < end)
+        .group_by(func.date(Meal.timestamp))
+    )
+    water_by_day = (
+        select(func.date(WaterIntake.intake_time), literal("water_ml"), func.sum(WaterIntake.amount_ml))
+        .where(WaterIntake.patient_id == patient_id, WaterIntake.intake_time >= start, WaterIntake.intake_time < end)
+        .group_by(func.date(WaterIntake.intake_time))
+    )
+    weight_by_day = (
+        select(func.date(WeightLog.timestamp), literal("weight"), func.avg(WeightLog.weight))
+        .where(WeightLog.patient_id == patient_id, WeightLog.timestamp >= start, WeightLog.timestamp < end)
+        .group_by(func.date(WeightLog.timestamp))
+    )
+    rows = session.execute(union_all(meals_by_day, water_by_day, weight_by_day)).all()
+
+    days = (end_date - start_date).days + 1
+    series = {metric: np.full(days, np.nan) for metric in METRICS}
+    if not rows:
+        return series
+
+    row_days, row_metrics, row_values = zip(*rows)
+    # Algunos motores devuelven la fecha como texto
+    offsets = np.array([
+        ((date.fromisoformat(day) if isinstance(day, str) else day) - start_date).days
+        for day in row_days
+    ])
+    metrics = np.array(row_metrics)
+    values = np.array(row_values, dtype=float)
+    for metric in METRICS:
+        mask = metrics == metric
+        series[metric][offsets[mask]] = values[mask]
+
+    return series
+
+
+def rolling_mean(values: np.ndarray, window: int = 7) -> np.ndarray:
+    """Promedio móvil de los últimos `window` días ignorando los días sin datos"""
+    valid = ~np.isnan(values)
+    kernel = np.ones(window)
+    sums = np.convolve(np.where(valid, values, 0.0), kernel)[:len(values)]
+    counts = np.convolve(valid.astype(float), kernel)[:len(values)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def weekly_means(values: np.ndarray, start_date: date) -> np.ndarray:
+    """Promedio por semana (de lunes a domingo) ignorando los días sin datos"""
+    leading_days = start_date.weekday()
+    padded = np.concatenate([np.full(leading_days, np.nan), values])
+    trailing_days = -len(padded) % 7
+    weeks = np.concatenate([padded, np.full(trailing_days, np.nan)]).reshape(-1, 7)
+
+    valid = ~np.isnan(weeks)
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, weeks, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def weekly_slope(values: np.ndarray) -> Optional[float]:
+    """Pendiente de la recta de mínimos cuadrados, expresada en unidades por semana"""
+    valid = ~np.isnan(values)
+    if valid.sum() < 2:
+        return None
+    day_offsets = np.arange(len(values))[valid]
+    slope_per_day = np.polyfit(day_offsets, values[valid], 1)[0]
+    return float(slope_per_day * 7)
+
+
+def adherence_percentage(values: np.ndarray, within_goal: np.ndarray) -> Optional[float]:
+    """Porcentaje de días registrados que cumplen la meta"""
+    logged = ~np.isnan(values)
+    if not logged.any():
+        return None
+    return float(np.round(within_goal[logged].mean() * 100, 1))
+
+
+def to_optional(value) -> Optional[float]:
+    """Convertir un valor de numpy a float para la respuesta (NaN se devuelve como None)"""
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), 2)
@@ -0,0 +1,91 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin el paquete solo se ofrece gzip
+    brotli = None
+
+# Respuestas más chicas que esto se envían sin comprimir (no compensa el costo)
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Calidad 4-5 comprime mejor que gzip con un costo de CPU parecido (11 es demasiado lento por petición)
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+
+class CompressionMiddleware:
+    """Comprime las respuestas con brotli o gzip según Accept-Encoding.
+
+    Las respuestas por partes (StreamingResponse) se comprimen bloque a bloque y cada bloque se
+    envía apenas se comprime, así el cliente recibe los primeros bytes sin esperar al resto.
+    No se comprimen los streams de eventos (text/event-stream) ni las respuestas que ya
+    traen Content-Encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif encoding == "gzip":
+            responder = GZipStreamResponder(self.app, self.minimum_size)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Codificación a usar según Accept-Encoding (respeta q=0). Se prefiere brotli si está disponible."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    candidates = ["br", "gzip"] if brotli else ["gzip"]
+    best = max(candidates, key=lambda name: accepted.get(name, accepted.get("*", 0.0)))
+    return best if accepted.get(best, accepted.get("*", 0.0)) > 0 else None
+
+
+class GZipStreamResponder(IdentityResponder):
+    content_encoding = "gzip"
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        super().__init__(app, minimum_size)
+        # wbits=31: formato gzip (encabezado y CRC), no zlib crudo
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.compress(body)
+        # En los bloques intermedios se vacía el compresor para que el bloque salga de inmediato
+        return data + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
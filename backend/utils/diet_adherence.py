@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlmodel import Session, select
+
+from models.weekly_diet_meals import DayOfWeek, MealOfDay, WeeklyDietMeals
+from models.weekly_diets import WeeklyDiets
+from schemas.diet_adherence import (
+    AdherenceRate, DayAdherence, DietAdherenceResponse, MealSlotAdherence, PatientAdherence, WeekAdherence
+)
+
+# Segundos que se reutiliza un cálculo de cumplimiento. Completar, desmarcar, agregar o borrar
+# comidas desde los routers de dietas invalida la caché del proceso; el límite de tiempo
+# cubre los cambios hechos en otros procesos (workers de gunicorn)
+ADHERENCE_CACHE_TTL_SECONDS = float(os.getenv("ADHERENCE_CACHE_TTL_SECONDS", "300"))
+# Cantidad máxima de cálculos guardados en memoria (se descarta el menos usado)
+ADHERENCE_CACHE_SIZE = int(os.getenv("ADHERENCE_CACHE_SIZE", "512"))
+
+# Clave: (professional_id, semana inicial, semana final)
+CacheKey = Tuple[int, Optional[date], Optional[date]]
+# Comidas planificadas y completadas de un grupo
+Counts = List[int]
+
+_results: "OrderedDict[CacheKey, Tuple[float, DietAdherenceResponse]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_diet_adherence(
+    session: Session,
+    professional_id: int,
+    start_week: Optional[date] = None,
+    end_week: Optional[date] = None,
+) -> DietAdherenceResponse:
+    """Porcentaje de comidas completadas por paciente, semana, día y momento del día de todas
+    las dietas del profesional, con una sola consulta agrupada"""
+    key = (professional_id, start_week, end_week)
+    now = time.monotonic()
+    with _lock:
+        cached = _results.get(key)
+        if cached is not None and cached[0] > now:
+            _results.move_to_end(key)
+            return cached[1]
+
+    adherence = _compute_adherence(session, professional_id, start_week, end_week)
+
+    with _lock:
+        _results[key] = (now + ADHERENCE_CACHE_TTL_SECONDS, adherence)
+        _results.move_to_end(key)
+        while len(_results) > ADHERENCE_CACHE_SIZE:
+            _results.popitem(last=False)
+    return adherence
+
+
+def invalidate_diet_adherence(professional_id: int):
+    """Descartar los cálculos del profesional. Llamar después del commit que modifica sus dietas."""
+    with _lock:
+        stale_keys = [key for key in _results if key[0] == professional_id]
+        for key in stale_keys:
+            del _results[key]
+
+
+def _compute_adherence(
+    session: Session, professional_id: int, start_week: Optional[date], end_week: Optional[date]
+) -> DietAdherenceResponse:
+    statement = (
+        select(
+            WeeklyDiets.patient_id,
+            WeeklyDiets.week_start_date,
+            WeeklyDietMeals.day_of_week,
+            WeeklyDietMeals.meal_of_the_day,
+            func.count(WeeklyDietMeals.id),
+            func.sum(case((WeeklyDietMeals.completed, 1), else_=0)),
+        )
+        .join(WeeklyDiets, WeeklyDiets.id == WeeklyDietMeals.weekly_diet_id)
+        .where(WeeklyDiets.professional_id == professional_id)
+        .group_by(
+            WeeklyDiets.patient_id,
+            WeeklyDiets.week_start_date,
+            WeeklyDietMeals.day_of_week,
+            WeeklyDietMeals.meal_of_the_day,
+        )
+    )
+    if start_week:
+        statement = statement.where(WeeklyDiets.week_start_date >= start_week)
+    if end_week:
+        statement = statement.where(WeeklyDiets.week_start_date <= end_week)
+
+    # Los grupos de la consulta se acumulan en cada corte: [planificadas, completadas]
+    overall = [0, 0]
+    patients: Dict[int, Counts] = defaultdict(lambda: [0, 0])
+    weeks: Dict[Tuple[int, date], Counts] = defaultdict(lambda: [0, 0])
+    days: Dict[DayOfWeek, Counts] = defaultdict(lambda: [0, 0])
+    slots: Dict[MealOfDay, Counts] = defaultdict(lambda: [0, 0])
+    for patient_id, week_start_date, day_of_week, meal_of_the_day, planned, completed in session.exec(statement):
+        completed = completed or 0
+        for counts in (overall, patients[patient_id], weeks[(patient_id, week_start_date)],
+                       days[day_of_week], slots[meal_of_the_day]):
+            counts[0] += planned
+            counts[1] += completed
+
+    return DietAdherenceResponse(
+        overall=AdherenceRate(**_rate(overall)),
+        patients=[PatientAdherence(patient_id=patient_id, **_rate(patients[patient_id])) for patient_id in sorted(patients)],
+        weeks=[
+            WeekAdherence(patient_id=patient_id, week_start_date=week_start_date, **_rate(weeks[(patient_id, week_start_date)]))
+            for patient_id, week_start_date in sorted(weeks)
+        ],
+        days=[DayAdherence(day_of_week=day, **_rate(days[day])) for day in DayOfWeek if day in days],
+        meal_slots=[MealSlotAdherence(meal_of_the_day=slot, **_rate(slots[slot])) for slot in MealOfDay if slot in slots],
+    )
+
+
+def _rate(counts: Counts) -> dict:
+    planned, completed = counts
+    return {
+        "planned_meals": planned,
+        "completed_meals": completed,
+        "completion_rate": round(completed / planned * 100, 1) if planned else 0.0,
+    }
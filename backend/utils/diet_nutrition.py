@@ -0,0 +1,50 @@
+from typing import List, Sequence, Union
+
+from sqlmodel import Session
+
+from models.template_diets import TemplateDietMeal
+from models.weekly_diet_meals import DayOfWeek, WeeklyDietMeals
+from schemas.diet_nutrition import DayNutrition, DietNutrition, NutritionTotals
+from utils.food_profiles import get_food_profiles
+
+# Valores que se suman por día y por semana
+DIET_NUTRIENTS = ["calories_kcal", "protein_g", "carbs_g", "fat_g"]
+
+PlannedMeal = Union[WeeklyDietMeals, TemplateDietMeal]
+
+
+def summarize_planned_meals(session: Session, meals: Sequence[PlannedMeal]) -> DietNutrition:
+    """Totales por día y de la semana de las comidas planificadas.
+
+    Las comidas de una dieta no tienen gramos: cada una cuenta como una porción de su
+    receta completa (la suma de los gramos de sus ingredientes). Los perfiles de todas las
+    comidas se obtienen juntos (una consulta, o ninguna si están en caché).
+    """
+    profiles = get_food_profiles(session, {meal.food_id for meal in meals})
+
+    days = {day: DayNutrition(day_of_week=day) for day in DayOfWeek}
+    week = NutritionTotals()
+    without_ingredients = 0
+    for meal in meals:
+        profile = profiles.get(meal.food_id)
+        if not profile:
+            without_ingredients += 1
+            continue
+        day = days[meal.day_of_week]
+        day.meals_count += 1
+        for nutrient in DIET_NUTRIENTS:
+            value = profile[nutrient] * profile["total_grams"]
+            setattr(day, nutrient, getattr(day, nutrient) + value)
+            setattr(week, nutrient, getattr(week, nutrient) + value)
+
+    planned_days: List[DayNutrition] = [day for day in days.values() if day.meals_count]
+    return DietNutrition(
+        days=[_rounded(day) for day in days.values()],
+        week=_rounded(week),
+        average_daily_calories=round(week.calories_kcal / len(planned_days), 1) if planned_days else 0.0,
+        meals_without_ingredients=without_ingredients,
+    )
+
+
+def _rounded(totals: NutritionTotals) -> NutritionTotals:
+    return totals.model_copy(update={nutrient: round(getattr(totals, nutrient), 1) for nutrient in DIET_NUTRIENTS})
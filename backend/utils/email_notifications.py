@@ -1,3 +1,4 @@
+import logging
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -53,4 +54,6 @@ def send_email(to: str, subject: str, body: str):
             server.login(sender_email, sender_password)
             server.sendmail(sender_email, to, msg.as_string())
     except Exception as e:
-        print(f"Error al enviar email: {e}")
\ No newline at end of file
+        # Se propaga para que la tarea en segundo plano lo reintente
+        logging.error(f"Error al enviar email: {e}")
+        raise
\ No newline at end of file
@@ -0,0 +1,49 @@
+import os
+from typing import Type
+
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+
+from config.database import create_session
+
+# Camino rápido para listados grandes: las filas se leen por columnas y se convierten a JSON
+# con orjson, sin volver a validar cada fila con Pydantic. Solo para datos leídos de la base,
+# que ya cumplen el esquema del modelo de respuesta.
+
+# Filas que se leen y se envían por bloque en las respuestas por partes
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "1000"))
+
+
+def select_read_columns(table_model, read_model: Type[BaseModel]) -> Select:
+    """Consulta de las columnas del modelo de respuesta, en el mismo orden.
+    Todos los campos del modelo de respuesta deben ser columnas de la tabla."""
+    columns = table_model.__table__.columns
+    missing = [name for name in read_model.model_fields if name not in columns]
+    if missing:
+        raise ValueError(f"{read_model.__name__} tiene campos que no son columnas: {', '.join(missing)}")
+    return select(*[getattr(table_model, name) for name in read_model.model_fields])
+
+
+def rows_response(rows) -> ORJSONResponse:
+    """Respuesta JSON de filas de select_read_columns (fechas en ISO 8601 y enums por su valor,
+    igual que la serialización de FastAPI)"""
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+def stream_rows_response(statement: Select) -> StreamingResponse:
+    """Respuesta JSON (un arreglo) que se envía por bloques de STREAM_BATCH_ROWS filas a medida
+    que se leen, para que los primeros bytes salgan antes de terminar de leer el listado"""
+    return StreamingResponse(_stream_rows(statement), media_type="application/json")
+
+
+def _stream_rows(statement: Select):
+    # Sesión propia: la respuesta se sigue enviando después de cerrar la de la petición
+    with create_session() as session:
+        result = session.execute(statement.execution_options(yield_per=STREAM_BATCH_ROWS))
+        prefix = b"["
+        for rows in result.partitions():
+            yield prefix + b",".join(orjson.dumps(row._asdict()) for row in rows)
+            prefix = b","
+        yield b"[]" if prefix == b"[" else b"]"
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Type
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+
+# Selección de campos en las lecturas (?fields= y ?include=), para que las pantallas que usan
+# pocos datos no descarguen los objetos completos. Sin estos parámetros las respuestas no cambian.
+FIELDS_DESCRIPTION = "Campos a devolver separados por coma (por defecto, todos)"
+INCLUDE_DESCRIPTION = "Relaciones a incluir separadas por coma"
+
+
+def parse_fields(fields: Optional[str], read_model: Type[BaseModel]) -> Optional[List[str]]:
+    """Campos pedidos en ?fields=, validados contra el modelo de respuesta. None si no se pidió ninguno."""
+    if fields is None:
+        return None
+    selected = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    if not selected:
+        raise HTTPException(status_code=400, detail="fields no puede estar vacío")
+    unknown = [name for name in selected if name not in read_model.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(read_model.model_fields)}",
+        )
+    return selected
+
+
+def parse_include(include: Optional[str], allowed: Iterable[str]) -> Set[str]:
+    """Relaciones pedidas en ?include="""
+    if not include:
+        return set()
+    allowed = list(allowed)
+    selected = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = selected - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No se puede incluir: {', '.join(sorted(unknown))}. Disponibles: {', '.join(allowed)}",
+        )
+    return selected
+
+
+def select_fields(table_model, fields: List[str], required: Iterable[str] = ()) -> Select:
+    """Consulta solo de las columnas pedidas más las necesarias para armar la respuesta (por
+    ejemplo el id para agrupar relaciones). Los campos que no son columnas se ignoran.
+    Ejecutar con session.execute y convertir con rows_to_dicts."""
+    names = list(dict.fromkeys([*required, *fields]))
+    return select(*[getattr(table_model, name) for name in names if name in table_model.__table__.columns])
+
+
+def rows_to_dicts(rows, fields: List[str]) -> List[dict]:
+    """Filas de select_fields convertidas a diccionarios con solo los campos pedidos"""
+    return [{name: row._mapping[name] for name in fields if name in row._mapping} for row in rows]
+
+
+def group_by_key(objects, key: str, read_model: Type[BaseModel]) -> Dict[int, List[dict]]:
+    """Agrupar los hijos cargados en una sola consulta según su clave foránea"""
+    grouped = defaultdict(list)
+    for obj in objects:
+        grouped[getattr(obj, key)].append(read_model.model_validate(obj).model_dump())
+    return grouped
+
+
+def sparse_response(content) -> ORJSONResponse:
+    """Respuesta con campos parciales: no se valida contra el response_model completo del endpoint.
+    orjson convierte directamente fechas y enums, sin pasar por jsonable_encoder."""
+    return ORJSONResponse(content)
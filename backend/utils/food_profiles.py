@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+from sqlmodel import Session, select, func
+
+from models.ingredients import Ingredient
+from models.ingredient_food import IngredientFood
+
+# Nutrientes que se calculan por gramo de comida a partir de sus ingredientes
+PROFILE_NUTRIENTS = ["calories_kcal", "protein_g", "carbs_g", "fat_g", "calcium_mg", "iron_mg", "vitamin_c_mg"]
+
+# Segundos que se reutiliza el perfil de una comida. Agregar ingredientes desde el router de
+# comidas invalida la caché del proceso; el límite de tiempo cubre los cambios de otros procesos
+FOOD_PROFILE_CACHE_TTL_SECONDS = float(os.getenv("FOOD_PROFILE_CACHE_TTL_SECONDS", "300"))
+# Cantidad máxima de perfiles guardados en memoria (se descarta el menos usado)
+FOOD_PROFILE_CACHE_SIZE = int(os.getenv("FOOD_PROFILE_CACHE_SIZE", "8192"))
+
+_profiles: "OrderedDict[int, Tuple[float, Dict[str, float]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_food_profiles(session: Session, food_ids: Iterable[int]) -> Dict[int, Dict[str, float]]:
+    """Obtiene en una sola consulta el perfil nutricional por gramo de varias comidas.
+
+    Para cada food_id devuelve "total_grams" (gramos totales de la receta) y el valor
+    por gramo de cada nutriente de PROFILE_NUTRIENTS. Las comidas sin ingredientes
+    no aparecen en el resultado. Los perfiles se guardan en memoria: solo se consultan
+    las comidas que no están en la caché.
+    """
+    food_ids = set(food_ids)
+    if not food_ids:
+        return {}
+
+    profiles = {}
+    now = time.monotonic()
+    with _lock:
+        for food_id in food_ids:
+            cached = _profiles.get(food_id)
+            if cached is not None and cached[0] > now:
+                _profiles.move_to_end(food_id)
+                profiles[food_id] = dict(cached[1])
+
+    missing = food_ids - profiles.keys()
+    if missing:
+        loaded = _load_food_profiles(session, missing)
+        with _lock:
+            for food_id, profile in loaded.items():
+                _profiles[food_id] = (now + FOOD_PROFILE_CACHE_TTL_SECONDS, profile)
+                _profiles.move_to_end(food_id)
+            while len(_profiles) > FOOD_PROFILE_CACHE_SIZE:
+                _profiles.popitem(last=False)
+        profiles.update({food_id: dict(profile) for food_id, profile in loaded.items()})
+
+    return profiles
+
+
+def invalidate_food_profiles(*food_ids: int):
+    """Descartar los perfiles guardados de las comidas cuya receta cambió"""
+    with _lock:
+        for food_id in food_ids:
+            _profiles.pop(food_id, None)
+
+
+def _load_food_profiles(session: Session, food_ids: Iterable[int]) -> Dict[int, Dict[str, float]]:
+    # Una sola consulta que une la receta con sus ingredientes y suma por comida
+    nutrient_sums = [
+        func.sum(func.coalesce(getattr(Ingredient, nutrient), 0) * IngredientFood.grams / 100)
+        for nutrient in PROFILE_NUTRIENTS
+    ]
+    rows = session.exec(
+        select(IngredientFood.food_id, func.sum(IngredientFood.grams), *nutrient_sums)
+        .join(Ingredient, Ingredient.id == IngredientFood.ingredient_id)
+        .where(IngredientFood.food_id.in_(food_ids))
+        .group_by(IngredientFood.food_id)
+    ).all()
+
+    profiles = {}
+    for food_id, total_grams, *totals in rows:
+        total_grams = total_grams or 0.0
+        profile = {"total_grams": total_grams}
+        for nutrient, total in zip(PROFILE_NUTRIENTS, totals):
+            profile[nutrient] = (total or 0.0) / total_grams if total_grams else 0.0
+        profiles[food_id] = profile
+
+    return profiles
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from models.goals import Goal, GoalRead, GoalStatus, GoalType
+
+# Segundos que se reutilizan las metas activas de un paciente. Las modificaciones desde el
+# router de objetivos invalidan la caché del proceso; el límite de tiempo cubre los cambios
+# hechos en otros procesos (workers de gunicorn)
+GOAL_CACHE_TTL_SECONDS = float(os.getenv("GOAL_CACHE_TTL_SECONDS", "60"))
+# Cantidad máxima de pacientes con metas guardadas en memoria (se descarta el menos usado)
+GOAL_CACHE_SIZE = int(os.getenv("GOAL_CACHE_SIZE", "4096"))
+
+# Clave de session.info con las metas ya resueltas en la petición actual
+SESSION_GOALS_KEY = "active_goals"
+
+ActiveGoals = Dict[GoalType, GoalRead]
+
+_goals: "OrderedDict[int, Tuple[float, ActiveGoals]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_active_goals(session: Session, patient_id: int) -> ActiveGoals:
+    """Meta activa más reciente de cada tipo del paciente (copias de solo lectura, sin sesión)"""
+    request_goals = session.info.setdefault(SESSION_GOALS_KEY, {})
+    if patient_id in request_goals:
+        return request_goals[patient_id]
+
+    now = time.monotonic()
+    with _lock:
+        cached = _goals.get(patient_id)
+        if cached is not None and cached[0] > now:
+            _goals.move_to_end(patient_id)
+            request_goals[patient_id] = cached[1]
+            return cached[1]
+
+    goals = session.exec(
+        select(Goal).where(Goal.patient_id == patient_id, Goal.status == GoalStatus.ACTIVE)
+    ).all()
+    return prime_active_goals(session, patient_id, goals)
+
+
+def prime_active_goals(session: Session, patient_id: int, goals: Iterable[Goal]) -> ActiveGoals:
+    """Guardar como metas activas del paciente objetivos ya consultados (todos los activos),
+    para no volver a leerlos en la misma petición"""
+    active_goals = {}
+    for goal in sorted(goals, key=lambda goal: goal.created_at, reverse=True):
+        active_goals.setdefault(goal.goal_type, GoalRead.model_validate(goal))
+
+    with _lock:
+        _goals[patient_id] = (time.monotonic() + GOAL_CACHE_TTL_SECONDS, active_goals)
+        _goals.move_to_end(patient_id)
+        while len(_goals) > GOAL_CACHE_SIZE:
+            _goals.popitem(last=False)
+    session.info.setdefault(SESSION_GOALS_KEY, {})[patient_id] = active_goals
+    return active_goals
+
+
+def get_active_goal(session: Session, patient_id: int, goal_type: GoalType) -> Optional[GoalRead]:
+    """Meta activa más reciente de un tipo, o None si el paciente no tiene"""
+    return get_active_goals(session, patient_id).get(goal_type)
+
+
+def invalidate_active_goals(session: Session, patient_id: int):
+    """Descartar las metas guardadas del paciente. Llamar después del commit que las modifica,
+    para que otra petición no vuelva a guardar los valores anteriores."""
+    session.info.get(SESSION_GOALS_KEY, {}).pop(patient_id, None)
+    with _lock:
+        _goals.pop(patient_id, None)
@@ -0,0 +1,243 @@
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, delete, or_
+from sqlmodel import Session, select
+
+from config.database import create_session
+from models.jobs import Job, JobStatus
+from models.patients import Patient
+from models.weekly_diet_meals import DayOfWeek
+from utils.email_notifications import send_full_diet_email
+
+# Dónde se ejecutan las tareas programadas y la cola: "api" (dentro de cada proceso de la API)
+# o "worker" (solo en los procesos de worker.py, la API únicamente encola)
+JOB_RUNNER = os.getenv("JOB_RUNNER", "api").lower()
+# Tareas simultáneas por proceso
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+# Espera entre consultas a la cola cuando no hay tareas listas
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Espera antes del primer reintento; se duplica en cada intento fallido
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+# Una tarea en ejecución sin terminar después de este tiempo se considera abandonada (worker caído)
+JOB_LOCK_TIMEOUT_MINUTES = int(os.getenv("JOB_LOCK_TIMEOUT_MINUTES", "15"))
+# Días que se conservan las tareas terminadas
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+
+# ========== HANDLERS ==========
+
+def send_diet_email_job(session: Session, payload: dict):
+    meals_by_day = {DayOfWeek(day): meals for day, meals in payload["meals_by_day"].items()}
+    send_full_diet_email(
+        payload["patient_name"],
+        payload["patient_email"],
+        date.fromisoformat(payload["week_start_date"]),
+        meals_by_day,
+    )
+
+
+# Tipo de tarea -> función que la ejecuta. Reciben una sesión propia y el payload de la tarea
+# y deben lanzar una excepción si fallan, para que se reintenten.
+JOB_HANDLERS: Dict[str, Callable[[Session, dict], None]] = {
+    "send_diet_email": send_diet_email_job,
+}
+
+
+# ========== ENCOLAR ==========
+
+def enqueue_job(
+    session: Session,
+    kind: str,
+    payload: dict,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Agregar una tarea a la sesión. Se encola al hacer commit, junto con el resto de los cambios."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Tipo de tarea desconocido: {kind}")
+    job = Job(
+        kind=kind,
+        payload=payload,
+        run_at=run_at or datetime.now(),
+        max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+    )
+    session.add(job)
+    return job
+
+
+def enqueue_diet_email(session: Session, patient: Patient, week_start_date: date, meals_by_day: dict) -> Job:
+    """Encolar el email con la dieta semanal (meals_by_day agrupado por DayOfWeek)"""
+    return enqueue_job(session, "send_diet_email", {
+        "patient_name": patient.first_name,
+        "patient_email": patient.email,
+        "week_start_date": week_start_date.isoformat(),
+        "meals_by_day": {day.value: meals for day, meals in meals_by_day.items()},
+    })
+
+
+# ========== EJECUCIÓN ==========
+
+def claim_jobs(session: Session, worker_id: str, limit: int) -> List[int]:
+    """Reservar hasta `limit` tareas listas para este worker. Con FOR UPDATE SKIP LOCKED varios
+    workers pueden reclamar a la vez sin bloquearse ni tomar la misma tarea."""
+    now = datetime.now()
+    abandoned_before = now - timedelta(minutes=JOB_LOCK_TIMEOUT_MINUTES)
+    jobs = session.exec(
+        select(Job)
+        .where(or_(
+            and_(Job.status == JobStatus.PENDING, Job.run_at <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.locked_at < abandoned_before),
+        ))
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    claimed = []
+    for job in jobs:
+        job.updated_at = now
+        if job.status == JobStatus.RUNNING and job.attempts >= job.max_attempts:
+            # Abandonada en su último intento: no se vuelve a ejecutar
+            job.status = JobStatus.FAILED
+            job.last_error = f"Sin respuesta del worker {job.locked_by}"
+            job.locked_at = job.locked_by = None
+            continue
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.locked_at = now
+        job.locked_by = worker_id
+        claimed.append(job.id)
+
+    session.commit()
+    return claimed
+
+
+def run_job(job_id: int, worker_id: str):
+    """Ejecutar una tarea reservada y registrar el resultado, programando un reintento si falló"""
+    with create_session() as session:
+        job = session.get(Job, job_id)
+        if not job:
+            return
+        handler = JOB_HANDLERS.get(job.kind)
+        error = None
+        try:
+            if handler is None:
+                raise ValueError(f"Tipo de tarea desconocido: {job.kind}")
+            handler(session, job.payload)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            error = f"{type(e).__name__}: {e}"
+            logging.error(f"Error en la tarea {job_id} ({job.kind}), intento {job.attempts}: {error}")
+
+        session.refresh(job)
+        if job.locked_by != worker_id:
+            # Se consideró abandonada y la tomó otro worker: el resultado lo registra ese worker
+            return
+
+        now = datetime.now()
+        if error is None:
+            job.status = JobStatus.COMPLETED
+        elif job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+        else:
+            job.status = JobStatus.PENDING
+            job.run_at = now + timedelta(seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        job.last_error = error[:2000] if error else job.last_error
+        job.locked_at = job.locked_by = None
+        job.updated_at = now
+        session.add(job)
+        session.commit()
+
+
+class JobRunner:
+    """Consume la cola de tareas con hasta `concurrency` tareas simultáneas en este proceso"""
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+        self._running = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="job-runner", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Dejar de reclamar tareas y esperar a que terminen las que están en ejecución"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                free_slots = self.concurrency - self._running
+
+            claimed = []
+            if free_slots > 0:
+                try:
+                    with create_session() as session:
+                        claimed = claim_jobs(session, self.worker_id, free_slots)
+                except Exception as e:
+                    logging.error(f"Error al reclamar tareas: {e}")
+
+            for job_id in claimed:
+                with self._lock:
+                    self._running += 1
+                self._executor.submit(self._execute, job_id)
+
+            # Si se llenaron todos los lugares libres puede haber más tareas listas: no esperar
+            if len(claimed) < max(free_slots, 1):
+                self._stop.wait(JOB_POLL_SECONDS)
+
+    def _execute(self, job_id: int):
+        try:
+            run_job(job_id, self.worker_id)
+        except Exception as e:
+            logging.error(f"Error al ejecutar la tarea {job_id}: {e}")
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+# ========== RETENCIÓN ==========
+
+def run_job_retention():
+    """Tarea programada: eliminar las tareas terminadas más antiguas que JOB_RETENTION_DAYS"""
+    session = None
+    try:
+        session = create_session()
+        deleted = purge_finished_jobs(session)
+        if deleted:
+            logging.info(f"Retención de tareas: {deleted} eliminadas")
+    except Exception as e:
+        logging.error(f"Error en run_job_retention: {e}")
+        if session:
+            session.rollback()
+    finally:
+        if session:
+            session.close()
+
+
+def purge_finished_jobs(session: Session, now: Optional[datetime] = None) -> int:
+    now = now or datetime.now()
+    result = session.exec(
+        delete(Job).where(
+            Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED]),
+            Job.updated_at < now - timedelta(days=JOB_RETENTION_DAYS),
+        )
+    )
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.query_log import QUERY_LOG, check_query_budget
+
+# En modo debug cada respuesta incluye el encabezado Server-Timing con el tiempo total y el de SQL
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestStats:
+    """Consultas SQL ejecutadas durante una petición"""
+    __slots__ = ("query_count", "query_seconds", "statements", "parent")
+
+    def __init__(self, record_statements: bool = False, parent: Optional["RequestStats"] = None):
+        self.query_count = 0
+        self.query_seconds = 0.0
+        # (sentencia, duración) de cada consulta, solo si se pidió registrarlas
+        self.statements = [] if record_statements else None
+        # Bloque que contiene a este (p. ej. track_queries alrededor de una petición): también acumula
+        self.parent = parent
+
+
+# Estadísticas de la petición en curso. El objeto se comparte con los hilos del threadpool
+# (que copian el contexto), por eso se modifica en lugar de reasignarse.
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def collect_request_stats(record_statements: bool = False):
+    """Acumular en un RequestStats las consultas ejecutadas dentro del bloque"""
+    stats = RequestStats(record_statements, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        # Por cada combinación de etiquetas: conteos por bucket (no acumulados), suma y cantidad
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float):
+        with self._lock:
+            bucket_counts, totals = self._values.setdefault(label_values, ([0] * len(self.buckets), [0.0, 0]))
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[index] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (bucket_counts, (total_sum, total_count)) in sorted(self._values.items()):
+                cumulative = 0
+                for upper_bound, count in zip(self.buckets, bucket_counts):
+                    cumulative += count
+                    labels = _format_labels(self.label_names + ("le",), label_values + (_format_value(upper_bound),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names + ("le",), label_values + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {total_count}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+                lines.append(f"{self.name}_count{labels} {total_count}")
+        return lines
+
+
+REQUESTS_TOTAL = Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP", ("method", "route"), LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Sentencias SQL ejecutadas por petición", ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Tiempo total en SQL por petición", ("method", "route"), LATENCY_BUCKETS,
+)
+DB_STATEMENTS_TOTAL = Counter(
+    "db_statements_total", "Sentencias SQL ejecutadas (incluye tareas programadas)", (),
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds", "Duración de cada sentencia SQL", (), LATENCY_BUCKETS,
+)
+
+METRICS = [
+    REQUESTS_TOTAL,
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUEST_DB_DURATION,
+    DB_STATEMENTS_TOTAL,
+    DB_STATEMENT_DURATION,
+]
+
+
+def render_metrics() -> str:
+    """Métricas en el formato de texto de Prometheus"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ========== EVENTOS DE SQLALCHEMY ==========
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+    DB_STATEMENTS_TOTAL.inc()
+    DB_STATEMENT_DURATION.observe((), elapsed)
+
+    stats = _current_stats.get()
+    while stats is not None:
+        stats.query_count += 1
+        stats.query_seconds += elapsed
+        if stats.statements is not None:
+            stats.statements.append((statement, elapsed))
+        stats = stats.parent
+
+
+# ========== MIDDLEWARE ==========
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide la latencia y las consultas SQL de cada petición por ruta"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if DEBUG:
+                    app_ms = (time.perf_counter() - start) * 1000
+                    server_timing = (
+                        f'app;dur={app_ms:.1f}, '
+                        f'db;dur={stats.query_seconds * 1000:.1f};desc="{stats.query_count} queries"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", server_timing.encode())]
+            await send(message)
+
+        with collect_request_stats(record_statements=QUERY_LOG) as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                # La plantilla de la ruta (no la URL) para no crear una serie por cada ID
+                route = scope.get("route")
+                route_label = getattr(route, "path", None) or "unmatched"
+                labels = (scope["method"], route_label)
+
+                REQUESTS_TOTAL.inc(labels + (str(status_code),))
+                REQUEST_DURATION.observe(labels, elapsed)
+                REQUEST_QUERIES.observe(labels, stats.query_count)
+                REQUEST_DB_DURATION.observe(labels, stats.query_seconds)
+                if QUERY_LOG:
+                    check_query_budget(f"{scope['method']} {route_label}", stats)
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Dict, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from config.database import engine
+from models.notification import Notification
+
+# "postgres" reparte las notificaciones entre todos los procesos con LISTEN/NOTIFY;
+# "memory" solo entre las conexiones del proceso actual (un único worker o SQLite)
+NOTIFICATIONS_BACKEND = os.getenv(
+    "NOTIFICATIONS_BACKEND",
+    "postgres" if engine.dialect.name == "postgresql" else "memory",
+)
+PG_CHANNEL = "notifications"
+# Notificaciones pendientes por conexión antes de descartar las más nuevas
+SUBSCRIBER_QUEUE_SIZE = 100
+# Espera entre reintentos del listener de Postgres
+LISTENER_RETRY_SECONDS = 5
+
+_PENDING_KEY = "pending_notifications"
+
+_subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+_subscribers_lock = threading.Lock()
+_listener_thread = None
+
+
+def subscribe(patient_id: int) -> asyncio.Queue:
+    """Registrar una conexión del paciente; debe llamarse desde el event loop que la atiende"""
+    queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _subscribers_lock:
+        _subscribers.setdefault(patient_id, set()).add((asyncio.get_running_loop(), queue))
+
+    if NOTIFICATIONS_BACKEND == "postgres":
+        _start_postgres_listener()
+    return queue
+
+
+def unsubscribe(patient_id: int, queue: asyncio.Queue):
+    """Dar de baja una conexión del paciente"""
+    with _subscribers_lock:
+        subscriptions = _subscribers.get(patient_id, set())
+        subscriptions.difference_update({item for item in subscriptions if item[1] is queue})
+        if not subscriptions:
+            _subscribers.pop(patient_id, None)
+
+
+def dispatch(payload: dict):
+    """Entregar una notificación a las conexiones abiertas del paciente en este proceso.
+    Se puede llamar desde cualquier hilo (endpoints, tareas programadas o el listener)."""
+    with _subscribers_lock:
+        subscriptions = list(_subscribers.get(payload["patient_id"], ()))
+
+    for loop, queue in subscriptions:
+        try:
+            loop.call_soon_threadsafe(_put_nowait, queue, payload)
+        except RuntimeError:
+            # El event loop ya se cerró
+            pass
+
+
+def _put_nowait(queue: asyncio.Queue, payload: dict):
+    try:
+        queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        # El cliente no consume: al reconectarse vuelve a pedir la lista completa
+        pass
+
+
+def _notification_payload(notification: Notification) -> dict:
+    return notification.model_dump(mode="json")
+
+
+# ========== PUBLICACIÓN AL CONFIRMAR LA TRANSACCIÓN ==========
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_notifications(session, flush_context):
+    """Tomar las notificaciones insertadas en el flush; se publican recién al hacer commit"""
+    payloads = [_notification_payload(obj) for obj in session.new if isinstance(obj, Notification)]
+    if not payloads:
+        return
+
+    if NOTIFICATIONS_BACKEND == "postgres":
+        # NOTIFY dentro de la transacción: Postgres lo entrega solo si se confirma
+        connection = session.connection()
+        for payload in payloads:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": PG_CHANNEL, "payload": json.dumps(payload)},
+            )
+    else:
+        session.info.setdefault(_PENDING_KEY, []).extend(payloads)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_notifications(session):
+    for payload in session.info.pop(_PENDING_KEY, []):
+        dispatch(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_notifications(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ========== LISTENER DE POSTGRES ==========
+
+def _start_postgres_listener():
+    """Iniciar (una vez por proceso) el hilo que recibe las notificaciones de todos los workers"""
+    global _listener_thread
+    with _subscribers_lock:
+        if _listener_thread is not None:
+            return
+        _listener_thread = threading.Thread(target=_listen_forever, name="notifications-listener", daemon=True)
+    _listener_thread.start()
+
+
+def _listen_forever():
+    """Escuchar el canal con una conexión dedicada (fuera del pool) y reconectar si se corta"""
+    while True:
+        connection = None
+        try:
+            cargs, cparams = engine.dialect.create_connect_args(engine.url)
+            connection = engine.dialect.connect(*cargs, **cparams)
+            connection.autocommit = True
+            connection.cursor().execute(f"LISTEN {PG_CHANNEL}")
+
+            while True:
+                if select.select([connection], [], [], 60) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    dispatch(json.loads(connection.notifies.pop(0).payload))
+        except Exception as e:
+            logging.error(f"Error en el listener de notificaciones: {e}")
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        time.sleep(LISTENER_RETRY_SECONDS)
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, func
+
+from models.notification import Notification, NotificationCounter
+
+
+def get_unread_count(session: Session, patient_id: int) -> int:
+    """Obtener la cantidad de notificaciones sin leer del paciente (lectura por clave primaria)"""
+    counter = session.get(NotificationCounter, patient_id)
+    if counter is None:
+        # Pacientes con notificaciones anteriores al contador: se calcula una única vez
+        session.connection().execute(_upsert_counter(session, patient_id))
+        session.commit()
+        counter = session.get(NotificationCounter, patient_id)
+
+    return max(counter.unread_count, 0)
+
+
+def set_unread_count(session: Session, patient_id: int, unread_count: Optional[int] = None):
+    """Fijar el contador del paciente en la transacción actual (o recalcularlo si no se indica el valor).
+    Necesario después de operaciones masivas, que no pasan por los eventos de la sesión."""
+    session.connection().execute(_upsert_counter(session, patient_id, unread_count=unread_count, replace=True))
+
+
+@event.listens_for(Session, "after_flush")
+def _update_unread_counters(session, flush_context):
+    """Ajustar los contadores en la misma transacción que inserta, modifica o elimina notificaciones"""
+    deltas = defaultdict(int)
+    recount = set()
+
+    for obj in session.new:
+        if isinstance(obj, Notification) and not obj.is_read:
+            deltas[obj.patient_id] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Notification):
+            was_read = _previous_is_read(obj)
+            if was_read is None:
+                recount.add(obj.patient_id)
+            elif not was_read:
+                deltas[obj.patient_id] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Notification) and obj not in session.deleted:
+            history = inspect(obj).attrs.is_read.history
+            if not history.added:
+                continue
+            was_read = _previous_is_read(obj)
+            if was_read is None:
+                recount.add(obj.patient_id)
+            else:
+                deltas[obj.patient_id] += int(was_read) - int(bool(obj.is_read))
+
+    if not deltas and not recount:
+        return
+
+    connection = session.connection()
+    for patient_id in recount:
+        connection.execute(_upsert_counter(session, patient_id, replace=True))
+    for patient_id, delta in deltas.items():
+        if delta and patient_id not in recount:
+            connection.execute(_upsert_counter(session, patient_id, delta=delta))
+
+
+def _previous_is_read(notification: Notification) -> Optional[bool]:
+    """Valor de is_read antes de los cambios pendientes (None si no se llegó a cargar)"""
+    history = inspect(notification).attrs.is_read.history
+    if history.deleted:
+        return bool(history.deleted[0])
+    if history.unchanged:
+        return bool(history.unchanged[0])
+    return None
+
+
+def _upsert_counter(session: Session, patient_id: int, delta: int = 0, unread_count: Optional[int] = None, replace: bool = False):
+    """Sentencia que crea el contador del paciente o lo actualiza si ya existe.
+
+    Si la fila no existe se inicializa con un conteo real (que ya incluye los cambios del flush);
+    si existe se le suma `delta`, o se reemplaza por el valor indicado o por el conteo real.
+    """
+    if unread_count is None:
+        initial_value = (
+            select(func.count())
+            .select_from(Notification)
+            .where(Notification.patient_id == patient_id, Notification.is_read == False)
+            .scalar_subquery()
+        )
+    else:
+        initial_value = unread_count
+
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(NotificationCounter).values(patient_id=patient_id, unread_count=initial_value)
+    if replace:
+        new_value = statement.excluded.unread_count
+    else:
+        new_value = NotificationCounter.unread_count + delta
+
+    return statement.on_conflict_do_update(
+        index_elements=[NotificationCounter.patient_id],
+        set_={"unread_count": new_value},
+    )
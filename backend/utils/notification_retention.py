@@ -0,0 +1,123 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, select, func
+
+from config.database import create_session
+from models.notification import Notification, NotificationArchive, NotificationKind
+from utils.notification_counters import set_unread_count
+
+# Días que se conserva cada tipo de notificación (0 = sin vencimiento)
+NOTIFICATION_TTL_DAYS = {
+    NotificationKind.WATER_REMINDER: int(os.getenv("NOTIFICATION_TTL_WATER_REMINDER_DAYS", "7")),
+    NotificationKind.WATER_GOAL: int(os.getenv("NOTIFICATION_TTL_WATER_GOAL_DAYS", "30")),
+    NotificationKind.GOAL: int(os.getenv("NOTIFICATION_TTL_GOAL_DAYS", "180")),
+    NotificationKind.DIET: int(os.getenv("NOTIFICATION_TTL_DIET_DAYS", "180")),
+    NotificationKind.GENERAL: int(os.getenv("NOTIFICATION_TTL_GENERAL_DAYS", "90")),
+}
+# Tipos que al vencer se mueven al archivo en lugar de eliminarse
+ARCHIVED_KINDS = {NotificationKind.GOAL, NotificationKind.DIET}
+# Tipos cuyos avisos idénticos sin leer se agrupan en una sola fila
+COMPACTED_KINDS = {NotificationKind.WATER_REMINDER}
+# Cada cuánto se ejecuta la tarea de retención
+RETENTION_INTERVAL_MINUTES = int(os.getenv("NOTIFICATION_RETENTION_INTERVAL_MINUTES", "60"))
+
+ARCHIVE_COLUMNS = ["id", "patient_id", "message", "is_read", "created_at", "kind", "repeat_count"]
+
+
+def run_notification_retention():
+    """Tarea programada: agrupar recordatorios repetidos y eliminar o archivar las notificaciones vencidas"""
+    session = None
+    try:
+        session = create_session()
+        compacted = compact_repeated_notifications(session)
+        archived, deleted = purge_expired_notifications(session)
+        if compacted or archived or deleted:
+            logging.info(
+                f"Retención de notificaciones: {compacted} agrupadas, {archived} archivadas, {deleted} eliminadas"
+            )
+    except Exception as e:
+        logging.error(f"Error en run_notification_retention: {e}")
+        if session:
+            session.rollback()
+    finally:
+        if session:
+            session.close()
+
+
+def compact_repeated_notifications(session: Session) -> int:
+    """Agrupar los avisos idénticos sin leer de cada paciente en la fila más reciente, sumando
+    las repeticiones en repeat_count. Devuelve la cantidad de filas eliminadas."""
+    groups = session.exec(
+        select(
+            Notification.patient_id,
+            Notification.kind,
+            Notification.message,
+            func.max(Notification.id),
+            func.sum(Notification.repeat_count),
+        )
+        .where(Notification.kind.in_(COMPACTED_KINDS), Notification.is_read == False)
+        .group_by(Notification.patient_id, Notification.kind, Notification.message)
+        .having(func.count() > 1)
+    ).all()
+
+    removed = 0
+    for patient_id, kind, message, keep_id, total_repeats in groups:
+        # Solo filas hasta keep_id: las insertadas durante la compactación quedan para la próxima
+        result = session.exec(
+            delete(Notification).where(
+                Notification.patient_id == patient_id,
+                Notification.kind == kind,
+                Notification.message == message,
+                Notification.is_read == False,
+                Notification.id < keep_id,
+            )
+        )
+        session.exec(
+            update(Notification).where(Notification.id == keep_id).values(repeat_count=total_repeats)
+        )
+        removed += result.rowcount
+
+    # Las operaciones masivas no pasan por los eventos de la sesión: se recalculan los contadores
+    for patient_id in {group[0] for group in groups}:
+        set_unread_count(session, patient_id)
+    session.commit()
+    return removed
+
+
+def purge_expired_notifications(session: Session, now: Optional[datetime] = None):
+    """Archivar o eliminar las notificaciones que superaron el TTL de su tipo.
+    Devuelve la cantidad de notificaciones archivadas y eliminadas."""
+    now = now or datetime.now()
+    archived = deleted = 0
+    affected_patients = set()
+
+    for kind, ttl_days in NOTIFICATION_TTL_DAYS.items():
+        if ttl_days <= 0:
+            continue
+        expired = (Notification.kind == kind, Notification.created_at < now - timedelta(days=ttl_days))
+
+        affected_patients.update(session.exec(
+            select(Notification.patient_id).where(*expired, Notification.is_read == False).distinct()
+        ).all())
+
+        if kind in ARCHIVED_KINDS:
+            session.exec(
+                insert(NotificationArchive).from_select(
+                    ARCHIVE_COLUMNS,
+                    select(*[getattr(Notification, column) for column in ARCHIVE_COLUMNS]).where(*expired),
+                )
+            )
+        result = session.exec(delete(Notification).where(*expired))
+        if kind in ARCHIVED_KINDS:
+            archived += result.rowcount
+        else:
+            deleted += result.rowcount
+
+    for patient_id in affected_patients:
+        set_unread_count(session, patient_id)
+    session.commit()
+    return archived, deleted
@@ -1,9 +1,14 @@
 from sqlmodel import Session
-from models.notification import Notification  
+from models.notification import Notification, NotificationKind
+# Registran los eventos de sesión que publican las notificaciones nuevas en /notifications/stream
+# y que mantienen el contador de notificaciones sin leer
+import utils.notification_bus  # noqa: F401
+import utils.notification_counters  # noqa: F401
 
-def create_notification(session: Session, patient_id: int, message: str):
+def create_notification(session: Session, patient_id: int, message: str, kind: NotificationKind = NotificationKind.GENERAL):
     notification = Notification(
         patient_id=patient_id,
-        message=message
+        message=message,
+        kind=kind
     )
     session.add(notification)
\ No newline at end of file
@@ -0,0 +1,117 @@
+import os
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from models.nutrient_summary import Alerts, NutrientRange, NutrientTargets
+from models.patients import Patient
+
+# Nutrientes que se clasifican, en el orden de las columnas de classify_nutrient_days
+TARGET_NUTRIENTS = ["protein_g", "carbs_g", "fat_g", "iron_mg", "vitamin_c_mg", "calcium_mg"]
+# Campo de Alerts que corresponde a cada nutriente
+ALERT_FIELDS = {
+    "protein_g": "protein",
+    "carbs_g": "carbs",
+    "fat_g": "fat",
+    "iron_mg": "iron",
+    "vitamin_c_mg": "vitamin_c",
+    "calcium_mg": "calcium",
+}
+
+# Comidas principales del día: el rango de una comida es el diario dividido por esta cantidad
+MEALS_PER_DAY = int(os.getenv("MEALS_PER_DAY", "4"))
+# Factor de actividad sobre el metabolismo basal (1.4: actividad liviana)
+ACTIVITY_FACTOR = float(os.getenv("NUTRIENT_ACTIVITY_FACTOR", "1.4"))
+
+# Valores usados cuando el perfil del paciente está incompleto
+DEFAULT_WEIGHT_KG = 70.0
+DEFAULT_HEIGHT_CM = 170.0
+DEFAULT_AGE = 30
+
+
+def get_nutrient_targets(patient: Patient, today: Optional[date] = None) -> NutrientTargets:
+    """Rangos diarios recomendados para el paciente según edad, peso, altura y género.
+    Se calculan una vez por combinación de datos: si el paciente cambia su perfil se recalculan."""
+    age = _age(patient.birth_date, today or date.today())
+    return _daily_targets(patient.weight or DEFAULT_WEIGHT_KG, patient.height or DEFAULT_HEIGHT_CM, age, _sex(patient.gender))
+
+
+def scale_targets(targets: NutrientTargets, factor: float) -> NutrientTargets:
+    """Rangos para una fracción del día (por ejemplo, una comida: 1 / MEALS_PER_DAY)"""
+    return NutrientTargets(**{
+        nutrient: NutrientRange(
+            min=round(getattr(targets, nutrient).min * factor, 1),
+            max=round(getattr(targets, nutrient).max * factor, 1),
+        )
+        for nutrient in TARGET_NUTRIENTS
+    })
+
+
+def meal_targets(targets: NutrientTargets) -> NutrientTargets:
+    return scale_targets(targets, 1 / MEALS_PER_DAY)
+
+
+def classify_nutrient_days(days: List[Dict[str, float]], targets: NutrientTargets) -> List[Alerts]:
+    """Clasificar los nutrientes de uno o varios días contra los rangos en una sola operación vectorizada"""
+    # numpy tarda en importarse: se carga en la primera clasificación y no al iniciar la API
+    import numpy as np
+
+    if not days:
+        return []
+    values = np.array([[day.get(nutrient, 0.0) for nutrient in TARGET_NUTRIENTS] for day in days], dtype=float)
+    minimums = np.array([getattr(targets, nutrient).min for nutrient in TARGET_NUTRIENTS])
+    maximums = np.array([getattr(targets, nutrient).max for nutrient in TARGET_NUTRIENTS])
+    labels = np.where(values < minimums, "deficit", np.where(values > maximums, "excess", "within range"))
+
+    fields = [ALERT_FIELDS[nutrient] for nutrient in TARGET_NUTRIENTS]
+    return [Alerts(**dict(zip(fields, row))) for row in labels.tolist()]
+
+
+@lru_cache(maxsize=4096)
+def _daily_targets(weight: float, height: float, age: int, sex: Optional[str]) -> NutrientTargets:
+    # Gasto energético: Mifflin-St Jeor por el factor de actividad. Sin sexo informado se promedia.
+    sex_offset = {"male": 5, "female": -161}.get(sex, -78)
+    calories = (10 * weight + 6.25 * height - 5 * age + sex_offset) * ACTIVITY_FACTOR
+
+    iron_min = _by_sex(sex, male=8, female=18 if age <= 50 else 8)
+    calcium_min = 1200 if age > 70 or (sex == "female" and age > 50) else 1000
+    if sex is None and 50 < age <= 70:
+        calcium_min = 1100
+
+    ranges: Dict[str, Tuple[float, float]] = {
+        # 0.8 g/kg (requerimiento) a 2 g/kg
+        "protein_g": (0.8 * weight, 2.0 * weight),
+        # 45-65 % de las calorías (4 kcal/g)
+        "carbs_g": (0.45 * calories / 4, 0.65 * calories / 4),
+        # 20-35 % de las calorías (9 kcal/g)
+        "fat_g": (0.20 * calories / 9, 0.35 * calories / 9),
+        # Ingesta recomendada hasta el nivel máximo tolerable
+        "iron_mg": (iron_min, 45),
+        "vitamin_c_mg": (_by_sex(sex, male=90, female=75), 2000),
+        "calcium_mg": (calcium_min, 2500 if age <= 50 else 2000),
+    }
+    return NutrientTargets(**{
+        nutrient: NutrientRange(min=round(minimum, 1), max=round(maximum, 1))
+        for nutrient, (minimum, maximum) in ranges.items()
+    })
+
+
+def _by_sex(sex: Optional[str], male: float, female: float) -> float:
+    if sex == "male":
+        return male
+    if sex == "female":
+        return female
+    return (male + female) / 2
+
+
+def _sex(gender: Optional[str]) -> Optional[str]:
+    gender = (gender or "").strip().lower()
+    return gender if gender in ("male", "female") else None
+
+
+def _age(birth_date: Optional[date], today: date) -> int:
+    if not birth_date:
+        return DEFAULT_AGE
+    age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+    # Los rangos son para adultos
+    return max(age, 18)
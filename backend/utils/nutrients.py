@@ -1,18 +1,13 @@
-from typing import List, Callable
+from typing import Callable, Dict, List
 from sqlmodel import Session, select
 from fastapi import HTTPException, Depends
 from models.ingredient_food import IngredientFood
 from models.ingredients import Ingredient
 from models.meals import Meal
+from utils.food_profiles import get_food_profiles
+
+MEAL_NUTRIENTS = ["protein_g", "carbs_g", "fat_g", "calcium_mg", "iron_mg", "vitamin_c_mg"]
 
-def classify_nutrient(value: float, min_value: float, max_value: float) -> str:
-    if value < min_value:
-        return "deficit"
-    elif min_value <= value <= max_value:
-        return "within range"
-    else:
-        return "excess"
-    
 def calculate_adjusted_nutrient(
     ingredient_food_links: List[IngredientFood],
     session: Session,
@@ -41,20 +36,21 @@ def calculate_adjusted_nutrient(
     return nutrient_per_gram * meal_grams
 
 def get_meal_nutrients(session: Session, meal: Meal) -> dict:
-    ingredient_links = session.exec(
-        select(IngredientFood).where(IngredientFood.food_id == meal.food_id)
-    ).all()
-
-    if not ingredient_links:
-        raise HTTPException(status_code=404, detail="Meal has no ingredients.")
-
-    nutrients = {
-        "protein_g": calculate_adjusted_nutrient(ingredient_links, session, meal.grams, lambda i: i.protein_g),
-        "carbs_g": calculate_adjusted_nutrient(ingredient_links, session, meal.grams, lambda i: i.carbs_g),
-        "fat_g": calculate_adjusted_nutrient(ingredient_links, session, meal.grams, lambda i: i.fat_g),
-        "calcium_mg": calculate_adjusted_nutrient(ingredient_links, session, meal.grams, lambda i: i.calcium_mg),
-        "iron_mg": calculate_adjusted_nutrient(ingredient_links, session, meal.grams, lambda i: i.iron_mg),
-        "vitamin_c_mg": calculate_adjusted_nutrient(ingredient_links, session, meal.grams, lambda i: i.vitamin_c_mg),
-    }
-
-    return nutrients
\ No newline at end of file
+    return get_meals_nutrients(session, [meal])[meal.id]
+
+
+def get_meals_nutrients(session: Session, meals: List[Meal], skip_missing: bool = False) -> Dict[int, dict]:
+    """Nutrientes de varias comidas registradas, con una sola consulta a los ingredientes.
+    Con skip_missing las comidas sin ingredientes se omiten en lugar de responder 404."""
+    profiles = get_food_profiles(session, [meal.food_id for meal in meals])
+
+    nutrients_by_meal = {}
+    for meal in meals:
+        profile = profiles.get(meal.food_id)
+        if not profile:
+            if skip_missing:
+                continue
+            raise HTTPException(status_code=404, detail="Meal has no ingredients.")
+        nutrients_by_meal[meal.id] = {nutrient: profile[nutrient] * meal.grams for nutrient in MEAL_NUTRIENTS}
+
+    return nutrients_by_meal
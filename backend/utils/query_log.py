@@ -0,0 +1,106 @@
+import logging
+import os
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+# Registrar cada consulta de las peticiones y avisar cuando se exceden los límites (desarrollo/staging)
+QUERY_LOG = os.getenv("QUERY_LOG", "false").lower() == "true"
+# Límites por petición
+QUERY_BUDGET_COUNT = int(os.getenv("QUERY_BUDGET_COUNT", "30"))
+QUERY_BUDGET_MS = float(os.getenv("QUERY_BUDGET_MS", "500"))
+# Repeticiones de una misma forma de consulta a partir de las cuales se considera un N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+# Si es true, track_queries lanza QueryBudgetExceeded en lugar de solo registrar el aviso
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NAMED_PARAMETER = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Un bloque ejecutó más consultas (o tardó más en SQL) de lo permitido"""
+
+
+def normalize_sql(statement: str) -> str:
+    """Forma de una consulta sin valores concretos, para agrupar las que solo cambian en sus parámetros"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NAMED_PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def find_repeated_statements(statements: List[Tuple[str, float]], threshold: int = N_PLUS_ONE_THRESHOLD):
+    """Formas de consulta que se repiten al menos `threshold` veces: (sql normalizado, repeticiones, segundos)"""
+    shapes = defaultdict(lambda: [0, 0.0])
+    for statement, elapsed in statements:
+        shape = shapes[normalize_sql(statement)]
+        shape[0] += 1
+        shape[1] += elapsed
+
+    repeated = [(sql, count, seconds) for sql, (count, seconds) in shapes.items() if count >= threshold]
+    return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+
+def find_budget_problems(stats, max_queries: Optional[int] = None, max_ms: Optional[float] = None) -> List[str]:
+    """Límites superados y posibles N+1 en las consultas registradas, sin registrar avisos"""
+    max_queries = QUERY_BUDGET_COUNT if max_queries is None else max_queries
+    max_ms = QUERY_BUDGET_MS if max_ms is None else max_ms
+    total_ms = stats.query_seconds * 1000
+
+    problems = []
+    if stats.query_count > max_queries:
+        problems.append(f"{stats.query_count} consultas (límite {max_queries})")
+    if total_ms > max_ms:
+        problems.append(f"{total_ms:.1f} ms en SQL (límite {max_ms:.0f} ms)")
+
+    repeated = find_repeated_statements(stats.statements or [])
+    for sql, count, seconds in repeated:
+        problems.append(f"posible N+1: {count} veces ({seconds * 1000:.1f} ms) -> {sql}")
+    return problems
+
+
+def check_query_budget(
+    label: str,
+    stats,
+    max_queries: Optional[int] = None,
+    max_ms: Optional[float] = None,
+    strict: bool = False,
+) -> List[str]:
+    """Revisar las consultas registradas de una petición (o bloque) y avisar si hay N+1
+    o si se superaron los límites. Devuelve la lista de problemas encontrados."""
+    problems = find_budget_problems(stats, max_queries, max_ms)
+    if problems:
+        message = f"Consultas de {label}:\n  " + "\n  ".join(problems)
+        if strict:
+            raise QueryBudgetExceeded(message)
+        logging.warning(message)
+
+    return problems
+
+
+@contextmanager
+def track_queries(
+    label: str = "bloque",
+    max_queries: Optional[int] = None,
+    max_ms: Optional[float] = None,
+    strict: Optional[bool] = None,
+):
+    """Registrar las consultas ejecutadas dentro del bloque y revisar sus límites al salir.
+    Pensado para pruebas y scripts: con strict=True (o QUERY_BUDGET_STRICT) falla si se exceden."""
+    from utils.metrics import collect_request_stats
+
+    with collect_request_stats(record_statements=True) as stats:
+        yield stats
+    check_query_budget(
+        label,
+        stats,
+        max_queries=max_queries,
+        max_ms=max_ms,
+        strict=QUERY_BUDGET_STRICT if strict is None else strict,
+    )
@@ -0,0 +1,14 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from routers.water_reminders import send_scheduled_water_reminders
+from utils.jobs import run_job_retention
+from utils.notification_retention import run_notification_retention, RETENTION_INTERVAL_MINUTES
+
+
+def create_scheduler() -> BackgroundScheduler:
+    """Scheduler con las tareas periódicas. Lo inicia solo el proceso líder (utils.scheduler_leader)."""
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(send_scheduled_water_reminders, "interval", minutes=1)
+    scheduler.add_job(run_notification_retention, "interval", minutes=RETENTION_INTERVAL_MINUTES)
+    scheduler.add_job(run_job_retention, "interval", minutes=RETENTION_INTERVAL_MINUTES)
+    return scheduler
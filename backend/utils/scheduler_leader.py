@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import text
+
+from config.database import engine
+
+# Con varios workers (gunicorn) solo el que obtiene este advisory lock de Postgres ejecuta las tareas programadas
+SCHEDULER_LOCK_ID = int(os.getenv("SCHEDULER_LOCK_ID", "8472301"))
+# Cada cuánto los demás workers reintentan tomar el lock y el líder verifica que su conexión siga viva
+LEADER_CHECK_SECONDS = float(os.getenv("SCHEDULER_LEADER_CHECK_SECONDS", "15"))
+# Permite desactivar las tareas programadas en un proceso (por ejemplo, réplicas que solo atienden peticiones)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+
+
+class SchedulerLeader:
+    """Inicia el scheduler solo en el proceso que tiene el liderazgo.
+
+    En Postgres el liderazgo es un advisory lock de sesión tomado en una conexión dedicada:
+    si el proceso termina o pierde la conexión, el lock se libera y otro worker lo toma en
+    el siguiente intento. En otras bases (SQLite en desarrollo) hay un solo proceso y
+    siempre es líder.
+    """
+
+    def __init__(self, create_scheduler: Callable[[], BackgroundScheduler]):
+        self.create_scheduler = create_scheduler
+        self.scheduler: Optional[BackgroundScheduler] = None
+        self._connection = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.scheduler is not None
+
+    def start(self):
+        if not SCHEDULER_ENABLED:
+            logging.info("Tareas programadas desactivadas en este proceso (SCHEDULER_ENABLED=false)")
+            return
+        if engine.dialect.name != "postgresql":
+            self._become_leader()
+            return
+        self._thread = threading.Thread(target=self._run, name="scheduler-leader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=LEADER_CHECK_SECONDS)
+        self._resign()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._connection is None:
+                    self._try_acquire()
+                else:
+                    # Detectar una conexión caída (y con ella el lock) para dejar de ejecutar las tareas
+                    self._connection.execute(text("SELECT 1"))
+            except Exception as e:
+                logging.error(f"Error en la elección del líder del scheduler: {e}")
+                self._resign()
+            self._stop.wait(LEADER_CHECK_SECONDS)
+
+    def _try_acquire(self):
+        connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": SCHEDULER_LOCK_ID}
+            ).scalar()
+        except Exception:
+            connection.invalidate()
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return
+        self._connection = connection
+        self._become_leader()
+
+    def _become_leader(self):
+        self.scheduler = self.create_scheduler()
+        self.scheduler.start()
+        logging.info(f"Proceso {os.getpid()} es el líder: tareas programadas iniciadas")
+
+    def _resign(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+            logging.info(f"Proceso {os.getpid()} dejó de ser líder: tareas programadas detenidas")
+        if self._connection is not None:
+            # Cerrar la conexión real (no devolverla al pool) libera el advisory lock
+            try:
+                self._connection.invalidate()
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
 from datetime import datetime, timedelta, timezone
@@ -6,19 +6,25 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from typing import Optional, Tuple, Union
 
-from config.database import get_session
+from config.database import get_session, create_session
 from models.patients import Patient
 from models.professionals import Professional
 
 SECRET_KEY = "YOUR_SECRET_KEY"  # TODO poner una clave
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 300
+# Token para abrir el stream de notificaciones: va en la URL (EventSource no envía encabezados)
+# y puede quedar en los logs de acceso, por eso dura poco y no sirve para otros endpoints
+STREAM_TOKEN_SCOPE = "notifications_stream"
+STREAM_TOKEN_EXPIRE_SECONDS = 60
 
 # Hashing de contraseñas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Esquema OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Variante que no exige el encabezado (el token también puede venir por query)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 
 def verify_password(plain_password, hashed_password):
@@ -60,6 +66,13 @@ async def get_current_user_type_and_model(
     session: Session = Depends(get_session)
 ) -> Tuple[str, Union[Patient, Professional]]:
     """Obtener el tipo de usuario y sus datos a partir del token JWT"""
+    return resolve_token_user(token, session)
+
+
+def resolve_token_user(
+    token: str, session: Session, scope: Optional[str] = None
+) -> Tuple[str, Union[Patient, Professional]]:
+    """Validar el token (con el scope indicado, o sin scope para los tokens de acceso) y buscar al usuario"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -70,7 +83,8 @@ async def get_current_user_type_and_model(
         email: str = payload.get("sub")
         user_type: str = payload.get("user_type", "patient")  # Valor predeterminado para compatibilidad
         
-        if email is None:
+        # Los tokens con scope (p. ej. el del stream) solo valen para su endpoint
+        if email is None or payload.get("scope") != scope:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
@@ -117,6 +131,40 @@ async def get_current_professional(
     return user
 
 
+def create_stream_token(patient: Patient) -> str:
+    """Token de corta duración que solo sirve para abrir el stream de notificaciones"""
+    return create_access_token(
+        {"sub": patient.email, "user_type": "patient", "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS),
+    )
+
+
+async def get_current_patient_for_stream(
+    token: Optional[str] = Query(None, description="Token de /notifications/stream-token (EventSource no permite enviar encabezados)"),
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> Patient:
+    """Obtener el paciente actual para conexiones de larga duración (SSE).
+    Por query solo se acepta el token del stream; el token de acceso normal, solo en el encabezado.
+    Usa una sesión propia que se cierra enseguida, para no retener una conexión
+    a la base mientras el stream siga abierto."""
+    session = create_session()
+    try:
+        if token:
+            user_type, user = resolve_token_user(token, session, scope=STREAM_TOKEN_SCOPE)
+        else:
+            user_type, user = resolve_token_user(header_token or "", session)
+    finally:
+        session.close()
+
+    if user_type != "patient":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="La operación requiere un usuario con rol de paciente",
+        )
+
+    return user
+
+
 async def get_current_user_universal(
     current_user_info = Depends(get_current_user_type_and_model)
 ) -> Union[Patient, Professional]:
@@ -0,0 +1,35 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+# Registrar cuánto tarda cada paso del arranque (importar routers, iniciar tareas) y mostrarlo al terminar
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+
+_started_at = time.perf_counter()
+_steps: List[Tuple[str, float]] = []
+
+
+@contextmanager
+def startup_step(name: str):
+    """Medir un paso del arranque"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _steps.append((name, time.perf_counter() - start))
+
+
+def startup_report() -> str:
+    """Pasos del arranque ordenados por duración, con el total desde que se importó este módulo"""
+    width = max((len(name) for name, _ in _steps), default=0)
+    lines = [f"Arranque en {(time.perf_counter() - _started_at) * 1000:.0f} ms:"]
+    for name, seconds in sorted(_steps, key=lambda step: step[1], reverse=True):
+        lines.append(f"  {name.ljust(width)}  {seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+def log_startup_report():
+    if STARTUP_PROFILE:
+        logging.warning(startup_report())
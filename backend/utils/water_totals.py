@@ -0,0 +1,139 @@
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, Tuple
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, func
+
+from models.water_intake import WaterDailyTotal, WaterIntake
+
+# Clave de session.info con los totales (total_ml, goal_notified) que devolvió el último flush,
+# para que el mismo request no tenga que volver a leerlos
+SESSION_TOTALS_KEY = "water_daily_totals"
+
+
+def get_daily_water_total(session: Session, patient_id: int, day: date) -> Tuple[int, bool]:
+    """Total de agua del día y si ya se notificó la meta: (total_ml, goal_notified)"""
+    cached = session.info.get(SESSION_TOTALS_KEY, {}).get((patient_id, day))
+    if cached is not None:
+        return cached
+
+    daily_total = session.get(WaterDailyTotal, (patient_id, day))
+    if daily_total is None:
+        # Días con ingestas anteriores a la tabla de totales: se suman una única vez
+        row = session.connection().execute(_upsert_total(session, patient_id, day, replace=True)).one()
+        return row.total_ml, row.goal_notified
+    return daily_total.total_ml, daily_total.goal_notified
+
+
+def mark_goal_notified(session: Session, patient_id: int, day: date) -> bool:
+    """Marcar la meta del día como notificada. Devuelve False si ya lo estaba (otra petición
+    la marcó antes), de modo que cada logro se notifique una sola vez."""
+    result = session.exec(
+        update(WaterDailyTotal)
+        .where(
+            WaterDailyTotal.patient_id == patient_id,
+            WaterDailyTotal.day == day,
+            WaterDailyTotal.goal_notified == False,
+        )
+        .values(goal_notified=True)
+    )
+    marked = result.rowcount == 1
+    totals = session.info.get(SESSION_TOTALS_KEY, {})
+    if (patient_id, day) in totals:
+        totals[(patient_id, day)] = (totals[(patient_id, day)][0], True)
+    return marked
+
+
+def recount_daily_water_totals(session: Session, patient_id: int, days: Iterable[date]):
+    """Recalcular los totales de los días indicados en la transacción actual.
+    Necesario después de operaciones masivas, que no pasan por los eventos de la sesión."""
+    connection = session.connection()
+    for day in set(days):
+        connection.execute(_upsert_total(session, patient_id, day, replace=True))
+
+
+@event.listens_for(Session, "after_flush")
+def _update_daily_totals(session, flush_context):
+    """Ajustar los totales diarios en la misma transacción que inserta, modifica o elimina ingestas"""
+    deltas = defaultdict(int)
+    recount = set()
+
+    for obj in session.new:
+        if isinstance(obj, WaterIntake):
+            deltas[(obj.patient_id, obj.intake_time.date())] += obj.amount_ml
+
+    for obj in session.deleted:
+        if isinstance(obj, WaterIntake):
+            amount, intake_time = _previous(obj, "amount_ml"), _previous(obj, "intake_time")
+            if amount is None or intake_time is None:
+                recount.add((obj.patient_id, obj.intake_time.date()))
+            else:
+                deltas[(obj.patient_id, intake_time.date())] -= amount
+
+    for obj in session.dirty:
+        if isinstance(obj, WaterIntake) and obj not in session.deleted:
+            state = inspect(obj).attrs
+            if not state.amount_ml.history.added and not state.intake_time.history.added:
+                continue
+            amount, intake_time = _previous(obj, "amount_ml"), _previous(obj, "intake_time")
+            new_key = (obj.patient_id, obj.intake_time.date())
+            if amount is None or intake_time is None:
+                recount.add(new_key)
+                continue
+            deltas[(obj.patient_id, intake_time.date())] -= amount
+            deltas[new_key] += obj.amount_ml
+
+    if not deltas and not recount:
+        return
+
+    connection = session.connection()
+    totals = session.info.setdefault(SESSION_TOTALS_KEY, {})
+    for key in recount:
+        totals[key] = tuple(connection.execute(_upsert_total(session, *key, replace=True)).one())
+    for key, delta in deltas.items():
+        if key not in recount:
+            totals[key] = tuple(connection.execute(_upsert_total(session, *key, delta=delta)).one())
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_session_totals(session):
+    # Después de la transacción otras sesiones pueden haber cambiado los totales
+    session.info.pop(SESSION_TOTALS_KEY, None)
+
+
+def _previous(intake: WaterIntake, attribute: str):
+    """Valor del atributo antes de los cambios pendientes (None si no se llegó a cargar)"""
+    history = inspect(intake).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _upsert_total(session: Session, patient_id: int, day: date, delta: int = 0, replace: bool = False):
+    """Sentencia que crea el total del día o lo actualiza si ya existe, y devuelve (total_ml, goal_notified).
+
+    Si la fila no existe se inicializa con la suma real (que ya incluye los cambios del flush);
+    si existe se le suma `delta`, o se reemplaza por la suma real.
+    """
+    day_sum = (
+        select(func.coalesce(func.sum(WaterIntake.amount_ml), 0))
+        .where(WaterIntake.patient_id == patient_id, func.date(WaterIntake.intake_time) == day)
+        .scalar_subquery()
+    )
+
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(WaterDailyTotal).values(patient_id=patient_id, day=day, total_ml=day_sum)
+    if replace:
+        new_value = statement.excluded.total_ml
+    else:
+        new_value = WaterDailyTotal.total_ml + delta
+
+    return statement.on_conflict_do_update(
+        index_elements=[WaterDailyTotal.patient_id, WaterDailyTotal.day],
+        set_={"total_ml": new_value},
+    ).returning(WaterDailyTotal.total_ml, WaterDailyTotal.goal_notified)
@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Optional, Tuple, Union
+
+from schemas.weekly_summary import WeeklySummaryResponse
+
+# Segundos que se reutiliza un resumen. Las escrituras de este proceso lo invalidan; el
+# límite de tiempo cubre las hechas en otros workers y los cambios de nombre de las comidas
+WEEKLY_SUMMARY_CACHE_TTL_SECONDS = float(os.getenv("WEEKLY_SUMMARY_CACHE_TTL_SECONDS", "60"))
+# Cantidad máxima de resúmenes guardados en memoria (se descarta el menos usado)
+WEEKLY_SUMMARY_CACHE_SIZE = int(os.getenv("WEEKLY_SUMMARY_CACHE_SIZE", "2048"))
+
+# Clave: (patient_id, start_date, end_date, semana de la nota usada en el resumen)
+CacheKey = Tuple[int, date, date, date]
+
+_summaries: "OrderedDict[CacheKey, Tuple[float, WeeklySummaryResponse]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_cached_weekly_summary(
+    patient_id: int, start_date: date, end_date: date, notes_week: date
+) -> Optional[WeeklySummaryResponse]:
+    """Obtener un resumen semanal previamente calculado, si sigue siendo válido"""
+    key = (patient_id, start_date, end_date, notes_week)
+    with _lock:
+        cached = _summaries.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del _summaries[key]
+            return None
+        _summaries.move_to_end(key)
+        return cached[1]
+
+
+def cache_weekly_summary(
+    patient_id: int, start_date: date, end_date: date, notes_week: date, summary: WeeklySummaryResponse
+):
+    """Guardar un resumen semanal calculado"""
+    key = (patient_id, start_date, end_date, notes_week)
+    with _lock:
+        _summaries[key] = (time.monotonic() + WEEKLY_SUMMARY_CACHE_TTL_SECONDS, summary)
+        _summaries.move_to_end(key)
+        while len(_summaries) > WEEKLY_SUMMARY_CACHE_SIZE:
+            _summaries.popitem(last=False)
+
+
+def invalidate_weekly_summaries(patient_id: int, *moments: Union[date, datetime, None]):
+    """Invalidar los resúmenes del paciente cuyo período incluye alguna de las fechas escritas
+    (comidas o pesos registrados, modificados o eliminados)"""
+    days = {moment.date() if isinstance(moment, datetime) else moment for moment in moments if moment}
+    if not days:
+        return
+    with _lock:
+        stale_keys = [
+            key for key in _summaries
+            if key[0] == patient_id and any(key[1] <= day <= key[2] for day in days)
+        ]
+        for key in stale_keys:
+            del _summaries[key]
+
+
+def invalidate_weekly_note_summaries(patient_id: int, week_start_date: date):
+    """Invalidar los resúmenes del paciente que muestran la nota de esa semana"""
+    with _lock:
+        stale_keys = [
+            key for key in _summaries
+            if key[0] == patient_id and key[3] == week_start_date
+        ]
+        for key in stale_keys:
+            del _summaries[key]
+
+
+def invalidate_patient_weekly_summaries(patient_id: int):
+    """Invalidar todos los resúmenes de un paciente (por ejemplo, tras cargas masivas)"""
+    with _lock:
+        stale_keys = [key for key in _summaries if key[0] == patient_id]
+        for key in stale_keys:
+            del _summaries[key]
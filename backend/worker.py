@@ -0,0 +1,47 @@
+"""Proceso de tareas en segundo plano, separado de la API.
+
+Ejecuta la cola de tareas (utils.jobs) y, si obtiene el liderazgo, las tareas programadas
+(recordatorios de agua, retención). Para usarlo, iniciar la API con JOB_RUNNER=worker:
+
+    cd backend
+    JOB_RUNNER=worker gunicorn -c gunicorn.conf.py main:app
+    python worker.py --concurrency 8
+
+Se escala agregando procesos de worker o aumentando --concurrency (JOB_CONCURRENCY):
+los workers reclaman tareas con SELECT ... FOR UPDATE SKIP LOCKED y nunca toman la misma.
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from utils.jobs import JOB_CONCURRENCY, JobRunner
+from utils.scheduled_tasks import create_scheduler
+from utils.scheduler_leader import SchedulerLeader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de tareas en segundo plano")
+    parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY, help="Tareas simultáneas en este proceso")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    scheduler_leader = SchedulerLeader(create_scheduler)
+    job_runner = JobRunner(concurrency=args.concurrency)
+    scheduler_leader.start()
+    job_runner.start()
+    logging.info(f"Worker {job_runner.worker_id} iniciado con {args.concurrency} tareas simultáneas")
+
+    stop.wait()
+    logging.info("Deteniendo el worker: esperando a que terminen las tareas en ejecución")
+    job_runner.stop()
+    scheduler_leader.stop()
+
+
+if __name__ == "__main__":
+    main()
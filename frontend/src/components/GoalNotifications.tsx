@@ -4,6 +4,10 @@ import { Notifications as NotificationsIcon } from '@mui/icons-material';
 import { notificationsService, Notification } from '../services/notifications';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
+import { getUserTypeFromToken } from '../services/api';
+
+// Espera antes de reabrir el stream de notificaciones si se corta o no hay sesión
+const STREAM_RETRY_MS = 10000;
 
 interface NotificationWithRead extends Notification {
   read: boolean;
@@ -96,11 +100,67 @@ export const NotificationsProvider: React.FC<{ children: React.ReactNode }> = ({
     }
   }, [notifications]);
 
+  const refreshRef = useRef(refreshNotifications);
+  refreshRef.current = refreshNotifications;
+
+  // Recibir las notificaciones nuevas por server-sent events en lugar de consultar periódicamente
   useEffect(() => {
-    refreshNotifications();
-    const interval = setInterval(refreshNotifications, 300000); // 1 minuto
-    return () => clearInterval(interval);
-  }, [refreshNotifications]);
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const scheduleReconnect = () => {
+      if (!closed) {
+        retryTimer = setTimeout(connect, STREAM_RETRY_MS);
+      }
+    };
+
+    async function connect() {
+      const token = localStorage.getItem('token');
+      if (!token || getUserTypeFromToken() !== 'patient') {
+        scheduleReconnect();
+        return;
+      }
+
+      let streamUrl: string;
+      try {
+        streamUrl = await notificationsService.getStreamUrl();
+      } catch {
+        scheduleReconnect();
+        return;
+      }
+      if (closed) {
+        return;
+      }
+
+      source = new EventSource(streamUrl);
+      // Al (re)conectarse se sincroniza la lista por si llegó algo mientras estaba desconectado
+      source.onopen = () => refreshRef.current();
+      source.addEventListener('notification', (event) => {
+        const notification: Notification = JSON.parse((event as MessageEvent).data);
+        setNotifications(prev => prev.some(n => n.id === notification.id)
+          ? prev
+          : [{ ...notification, read: notification.is_read }, ...prev]);
+        if (!notification.is_read) {
+          setUnreadCount(prev => prev + 1);
+        }
+      });
+      // Se reabre manualmente con un token de stream nuevo (el anterior vence a los 60 s)
+      source.onerror = () => {
+        source?.close();
+        scheduleReconnect();
+      };
+    }
+
+    connect();
+    return () => {
+      closed = true;
+      source?.close();
+      if (retryTimer) {
+        clearTimeout(retryTimer);
+      }
+    };
+  }, []);
 
   return (
     <NotificationsContext.Provider value={{
@@ -317,6 +377,7 @@ export const NotificationsBell: React.FC<GoalNotificationsProps> = ({ onNotifica
                   }}
                 >
                   {notification.message}
+                  {notification.repeat_count > 1 && ` (×${notification.repeat_count})`}
                 </Typography>
                 <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
                   <Typography variant="caption" color="text.secondary">
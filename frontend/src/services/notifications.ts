@@ -5,6 +5,8 @@ export interface Notification {
   message: string;
   is_read: boolean;
   created_at: string;
+  kind: 'water_reminder' | 'water_goal' | 'goal' | 'diet' | 'general';
+  repeat_count: number; // avisos idénticos agrupados
 }
 
 export const notificationsService = {
@@ -21,12 +23,7 @@ export const notificationsService = {
 
   // Marcar todas las notificaciones como leídas
   markAllAsRead: async (): Promise<void> => {
-    const notifications = await notificationsService.getNotifications();
-    await Promise.all(
-      notifications
-        .filter(n => !n.is_read)
-        .map(n => notificationsService.markAsRead(n.id))
-    );
+    await axios.post('/notifications/read-all');
   },
 
   // Eliminar una notificación
@@ -34,6 +31,14 @@ export const notificationsService = {
     await axios.delete(`/notifications/${id}`);
   },
 
+  // URL del stream de notificaciones en tiempo real. EventSource no permite enviar encabezados:
+  // se pide un token de corta duración que solo sirve para el stream, así el token de acceso
+  // no queda en la URL (ni en los logs del servidor)
+  getStreamUrl: async (): Promise<string> => {
+    const response = await axios.post('/notifications/stream-token');
+    return `${axios.defaults.baseURL}/notifications/stream?token=${encodeURIComponent(response.data.token)}`;
+  },
+
   // Obtener el conteo de notificaciones sin leer
   getUnreadCount: async (): Promise<number> => {
     const response = await axios.get('/notifications/unread-count');